@@ -0,0 +1,41 @@
+import numpy as np
+
+from devito import Grid, SparseFunction
+
+
+class SparseRouting(object):
+
+    """
+    Time the computation of the metadata routing the sparse points to the MPI
+    ranks requiring them, i.e. the gridpoints, the support and the
+    scatter/gather masks of a SparseFunction.
+    """
+
+    params = [10**4, 10**5]
+    param_names = ['npoint']
+
+    # The metadata are cached until the coordinates change, so `setup` provides
+    # fresh coordinates before each measurement
+    number = 1
+    repeat = 5
+
+    def setup(self, npoint):
+        grid = Grid(shape=(101, 101, 101))
+        self.sf = SparseFunction(name='sf', grid=grid, npoint=npoint)
+        self.sf.coordinates.data[:] = np.random.rand(npoint, grid.dim)
+
+    def time_routing(self, npoint):
+        self.sf._dist_scatter_mask
+        self.sf._dist_gather_mask
+
+
+class SparseRoutingCached(SparseRouting):
+
+    """
+    As SparseRouting, but with unchanged coordinates, so that only the
+    validity of the cached metadata is checked.
+    """
+
+    def setup(self, npoint):
+        super(SparseRoutingCached, self).setup(npoint)
+        self.time_routing(npoint)
@@ -1,11 +1,11 @@
 from collections import OrderedDict
-import sys
 
 import numpy as np
 import click
 import os
-from devito import clear_cache, configuration, warning, set_log_level
+from devito import clear_cache, configuration, info, warning, set_log_level
 from devito.mpi import MPI
+from devito.operator import MachinePeaks, Roofline, machine_peaks
 from devito.tools import all_equal, as_tuple, sweep
 from examples.seismic.acoustic.acoustic_example import run as acoustic_run, acoustic_setup
 from examples.seismic.tti.tti_example import run as tti_run, tti_setup
@@ -17,23 +17,19 @@ from examples.seismic.viscoelastic.viscoelastic_example import run as viscoelast
 model_type = {
     'viscoelastic': {
         'run': viscoelastic_run,
-        'setup': viscoelastic_setup,
-        'default-section': 'section0'
+        'setup': viscoelastic_setup
     },
     'elastic': {
         'run': elastic_run,
-        'setup': elastic_setup,
-        'default-section': 'section0'
+        'setup': elastic_setup
     },
     'tti': {
         'run': tti_run,
-        'setup': tti_setup,
-        'default-section': 'section1'
+        'setup': tti_setup
     },
     'acoustic': {
         'run': acoustic_run,
-        'setup': acoustic_setup,
-        'default-section': 'section0'
+        'setup': acoustic_setup
     }
 }
 
@@ -44,12 +40,11 @@ def benchmark():
     Benchmarking script for seismic forward operators.
 
     \b
-    There are three main 'execution modes':
+    There are four main 'execution modes':
     run: a single run with given DSE/DLE levels
     bench: complete benchmark with multiple DSE/DLE levels
     test: tests numerical correctness with different parameters
-
-    Further, this script can generate a roofline plot from a benchmark
+    roofline: a single run whose code sections are placed on the roofline
     """
     pass
 
@@ -144,6 +139,12 @@ def option_performance(f):
             level = False
         return level
 
+    def config_autotuning_db(ctx, param, value):
+        """Store the autotuning results, so that later runs can reuse them."""
+        if value:
+            configuration['autotuning-db'] = True
+        return value
+
     options = [
         click.option('-bm', '--bench-mode', is_eager=True,
                      callback=from_preset, expose_value=False, default='O2',
@@ -161,7 +162,10 @@ def option_performance(f):
                      is_eager=True, help='Loop-blocking shape, bypass autotuning'),
         click.option('-a', '--autotune', default='aggressive', callback=config_autotuning,
                      type=click.Choice(configuration._accepted['autotuning']),
-                     help='Select autotuning mode')
+                     help='Select autotuning mode'),
+        click.option('--autotuning-db', is_flag=True, callback=config_autotuning_db,
+                     expose_value=False,
+                     help='Populate (and reuse) the persistent autotuning database')
     ]
     for option in reversed(options):
         f = option(f)
@@ -201,7 +205,7 @@ def run(problem, **kwargs):
                 options['%s%d_blk%d_size' % (d, i, n)] = s
 
     solver = setup(space_order=space_order, time_order=time_order, **kwargs)
-    solver.forward(autotune=autotune, **options)
+    return solver.forward(autotune=autotune, **options)
 
 
 @benchmark.command(name='test')
@@ -267,127 +271,74 @@ def bench(problem, **kwargs):
     clear_cache()
 
 
-@benchmark.command(name='plot')
-@click.option('--backend', default='core',
-              type=click.Choice(configuration._accepted['backend']),
-              help='Used execution backend (e.g., core, yask)')
+@benchmark.command(name='roofline')
 @click.option('-r', '--resultsdir', default='results',
-              help='Directory containing results')
+              help='Directory in which the roofline report is written')
+@click.option('--format', 'formats', type=click.Choice(['text', 'json', 'png']),
+              multiple=True, default=('text', 'json'),
+              help='Roofline report format (can be given multiple times)')
 @click.option('--max-bw', type=float,
-              help='Max GB/s of the DRAM')
-@click.option('--flop-ceil', type=(float, str), multiple=True,
-              help='Max GFLOPS/s of the CPU. A 2-tuple (float, str)'
-                   'is expected, where the float is the performance'
-                   'ceil (GFLOPS/s) and the str indicates how the'
-                   'ceil was obtained (ideal peak, linpack, ...)')
-@click.option('--point-runtime', is_flag=True, default=True,
-              help='Annotate points with runtime values')
-@click.option('--section', default=None,
-              help='Code section for which the roofline is plotted')
+              help='Max GB/s of the DRAM. Measured, and cached, if not provided')
+@click.option('--max-gflopss', type=float,
+              help='Max GFlops/s of the CPU. Measured, and cached, if not provided')
+@click.option('--refresh-peaks', is_flag=True, default=False,
+              help='Measure the machine peaks again, ignoring the cached values')
 @option_simulation
 @option_performance
-def cli_plot(problem, **kwargs):
+def cli_roofline(problem, **kwargs):
     """
-    Plotting mode to generate plots for performance analysis.
+    A single run whose code sections are placed on the roofline.
     """
-    plot(problem, **kwargs)
+    configuration['develop-mode'] = False
+
+    roofline(problem, **kwargs)
 
 
-def plot(problem, **kwargs):
+def roofline(problem, **kwargs):
     """
-    Plotting mode to generate plots for performance analysis.
+    A single run whose code sections are placed on the roofline.
     """
-    backend = kwargs.pop('backend')
     resultsdir = kwargs.pop('resultsdir')
+    formats = kwargs.pop('formats')
     max_bw = kwargs.pop('max_bw')
-    flop_ceils = kwargs.pop('flop_ceil')
-    point_runtime = kwargs.pop('point_runtime')
-    autotune = kwargs['autotune']
+    max_gflopss = kwargs.pop('max_gflopss')
+    refresh = kwargs.pop('refresh_peaks')
+
+    # The roofline needs the operational intensity of each section
+    if configuration['profiling'] not in ('advanced', 'perf'):
+        configuration['profiling'] = 'advanced'
+
+    if max_bw is None or max_gflopss is None or refresh:
+        peaks = machine_peaks(refresh=refresh)
+        peaks = MachinePeaks(max_bw or peaks.bandwidth, max_gflopss or peaks.gflopss)
+    else:
+        peaks = MachinePeaks(max_bw, max_gflopss)
+
     arch = kwargs['arch']
+    autotune = kwargs['autotune']
     space_order = "[%s]" % ",".join(str(i) for i in kwargs['space_order'])
-    time_order = kwargs['time_order']
+    time_order = "[%s]" % ",".join(str(i) for i in kwargs['time_order'])
     shape = "[%s]" % ",".join(str(i) for i in kwargs['shape'])
 
-    section = kwargs.pop('section')
-    if not section:
-        warning("No `section` provided. Using `%s`'s default `%s`"
-                % (problem, model_type[problem]['default-section']))
-        section = model_type[problem]['default-section']
+    summary = run(problem, **kwargs)[-1]
+    report = Roofline(summary, peaks)
 
-    RooflinePlotter = get_ob_plotter()
-    bench = get_ob_bench(problem, resultsdir, kwargs)
-
-    bench.load()
-    if not bench.loaded:
-        warning("Could not load any results, nothing to plot. Exiting...")
-        sys.exit(0)
-
-    gflopss = bench.lookup(params=kwargs, measure="gflopss", event=section)
-    oi = bench.lookup(params=kwargs, measure="oi", event=section)
-    time = bench.lookup(params=kwargs, measure="timings", event=section)
+    if configuration['mpi'] and MPI.COMM_WORLD.rank != 0:
+        return
 
-    # What plot am I?
-    modes = [i for i in ['dse', 'dle', 'autotune']
-             if len(set(dict(j)[i] for j in gflopss)) > 1]
+    info(report.to_text())
 
-    # Filename
-    figname = "%s_shape%s_so%s_to%s_arch[%s]_bkend[%s]_at[%s]" % (
-        problem, shape, space_order, time_order, arch, backend, autotune
+    os.makedirs(resultsdir, exist_ok=True)
+    name = "roofline_%s_shape%s_so%s_to%s_arch[%s]_at[%s]" % (
+        problem, shape, space_order, time_order, arch, autotune
     )
-
-    # Legend setup. Do not plot a legend if there's no variation in performance
-    # options (dse, dle, autotune)
-    if modes:
-        legend = {'loc': 'upper left', 'fontsize': 7, 'ncol': 4}
-    else:
-        legend = 'drop'
-
-    avail_colors = ['r', 'g', 'b', 'y', 'k', 'm']
-    avail_markers = ['o', 'x', '^', 'v', '<', '>']
-
-    used_colors = {}
-    used_markers = {}
-
-    # Find min and max runtimes for instances having the same OI
-    min_max = {v: [0, sys.maxsize] for v in oi.values()}
-    for k, v in time.items():
-        i = oi[k]
-        min_max[i][0] = v if min_max[i][0] == 0 else min(v, min_max[i][0])
-        min_max[i][1] = v if min_max[i][1] == sys.maxsize else max(v, min_max[i][1])
-
-    with RooflinePlotter(figname=figname, plotdir=resultsdir,
-                         max_bw=max_bw, flop_ceils=flop_ceils,
-                         fancycolor=True, legend=legend) as plot:
-        for k, v in gflopss.items():
-            so = dict(k)['space_order']
-
-            oi_value = oi[k]
-            time_value = time[k]
-
-            run = tuple(dict(k)[i] for i in modes)
-            label = ("<%s>" % ','.join(run)) if run else None
-
-            color = used_colors[run] if run in used_colors else avail_colors.pop(0)
-            used_colors.setdefault(run, color)
-            marker = used_markers[so] if so in used_markers else avail_markers.pop(0)
-            used_markers.setdefault(so, marker)
-
-            oi_loc = 0.076 if len(str(so)) == 1 else 0.09
-            oi_annotate = {'s': 'SO=%s' % so, 'size': 6, 'xy': (oi_value, oi_loc)}
-            if time_value in min_max[oi_value] and point_runtime:
-                # Only annotate min and max runtimes on each OI line, to avoid
-                # polluting the plot too much
-                point_annotate = {'s': "%.0fs" % time_value, 'xytext': (0.0, 5.5),
-                                  'size': 6, 'rotation': 0}
-            else:
-                point_annotate = None
-            oi_line = time_value == min_max[oi_value][0]
-            if oi_line:
-                perf_annotate = {'size': 6, 'xytext': (-4, 5)}
-
-            plot.add_point(gflops=v, oi=oi_value, marker=marker, color=color,
-                           oi_line=oi_line, label=label, perf_annotate=perf_annotate,
-                           oi_annotate=oi_annotate, point_annotate=point_annotate)
+    filename = os.path.join(resultsdir, name)
+    if 'text' in formats:
+        report.to_text('%s.txt' % filename)
+    if 'json' in formats:
+        report.to_json('%s.json' % filename)
+    if 'png' in formats:
+        report.to_png('%s.png' % filename)
 
 
 def get_ob_bench(problem, resultsdir, parameters):
@@ -459,17 +410,6 @@ def get_ob_exec(func):
     return DevitoExecutor(func)
 
 
-def get_ob_plotter():
-    try:
-        from devitobench import RooflinePlotter
-    except:
-        raise ImportError('Could not import devitobench utility package.\n'
-                          'Please install https://github.com/devitocodes/devitobench'
-                          'To plot performance results, make sure to have the'
-                          'Matplotlib package installed')
-    return RooflinePlotter
-
-
 if __name__ == "__main__":
     # If running with MPI, we emit logging messages from rank0 only
     try:
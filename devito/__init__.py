@@ -10,6 +10,7 @@ from devito.builtins import *  # noqa
 from devito.data.allocators import *  # noqa
 from devito.finite_differences import *  # noqa
 from devito.mpi import MPI  # noqa
+from devito.operator import compile_all  # noqa
 from devito.types import _SymbolCache, NODE, CELL, Buffer, SubDomain, SubDomainSet  # noqa
 from devito.types.dimension import *  # noqa
 from devito.types.equation import *  # noqa
@@ -55,6 +56,18 @@ configuration.add('log-level', 'INFO', list(logger_registry),
 # and will instead use the custom kernel
 configuration.add('jit-backdoor', 0, [0, 1], lambda i: bool(i), False)
 
+# A directory, possibly shared by several machines, in which the jit-compiled
+# binaries are stored and looked up before invoking the compiler, along with its
+# maximum size in MB (0 means unbounded). By default, binaries are only cached in
+# a temporary directory of the local machine
+configuration.add('jit-cache-dir', None, impacts_jit=False)
+configuration.add('jit-cache-size', 1024, impacts_jit=False)
+
+# Should Devito store built Operators in a persistent, on-disk cache, and reuse
+# them (thus skipping symbolic lowering) when an Operator with identical input
+# is constructed in a later session or by a different process?
+configuration.add('build-cache', 0, [0, 1], lambda i: bool(i), False)
+
 # Enable/disable automatic padding for allocated data
 configuration.add('autopadding', False, [False, True])
 
@@ -65,9 +78,19 @@ def _reinit_compiler(val):  # noqa
                                        mpi=configuration['mpi'])
     return bool(val) if isinstance(val, int) else val
 configuration.add('openmp', 0, [0, 1], callback=_reinit_compiler)  # noqa
-configuration.add('mpi', 0, [0, 1, 'basic', 'diag', 'overlap', 'overlap2', 'full'],
+configuration.add('mpi', 0, [0, 1, 'basic', 'diag', 'overlap', 'overlap2', 'full',
+                             'persistent', 'neighborhood', 'aggregated'],
                   callback=_reinit_compiler)
 
+# With OpenMP, the SparseFunctions with at least `injection-colouring` sparse points
+# inject through a colouring of the sparse points computed on the host, rather than
+# through atomic updates (0 means never)
+configuration.add('injection-colouring', 1000, callback=lambda i: int(i))
+
+# The relative cost of intra-node and inter-node links, used to select the
+# MPI process topology
+configuration.add('mpi-link-weights', {'intra': 1, 'inter': 1}, impacts_jit=False)
+
 # Autotuning setup
 at_levels = ['off', 'basic', 'aggressive', 'max']
 at_modes = ['preemptive', 'destructive', 'runtime']
@@ -85,6 +108,10 @@ def _at_callback(val):  # noqa
 configuration.add('autotuning', 'off', at_accepted, callback=_at_callback,  # noqa
                   impacts_jit=False)
 
+# Should the autotuning results be stored on disk and reused by later runs,
+# possibly in other processes?
+configuration.add('autotuning-db', 0, [0, 1], lambda i: bool(i), False)
+
 # Should Devito emit the JIT compilation commands?
 configuration.add('debug-compiler', 0, [0, 1], lambda i: bool(i), False)
 
@@ -102,9 +129,16 @@ configuration.add('dse', 'advanced', list(dse_registry))
 configuration.add('dle', 'advanced', list(targets_registry))
 configuration.add('dle-options', {})
 
-# Setup Operator profiling
+# Setup Operator profiling. With `off`, no C-level timers are generated; with
+# `mpi`, the halo exchanges are instrumented too
 configuration.add('profiling', 'basic', list(profiler_registry), impacts_jit=False)
 
+# Timeline profiling: if nonzero, the section timings are also sampled every
+# `profiling-timeline` calls (i.e., typically, timesteps) into a ring buffer with
+# `profiling-timeline-size` slots
+configuration.add('profiling-timeline', 0)
+configuration.add('profiling-timeline-size', 1024)
+
 # Initialize `configuration`. This will also trigger the backend initialization
 init_configuration()
 
@@ -2,8 +2,12 @@ from functools import partial
 from hashlib import sha1
 from os import environ, path
 from distutils import version
+from pathlib import Path
 from subprocess import DEVNULL, CalledProcessError, check_output, check_call
+from uuid import uuid4
+import os
 import platform
+import shutil
 import warnings
 import sys
 
@@ -18,7 +22,7 @@ from devito.parameters import configuration
 from devito.tools import (as_tuple, change_directory, filter_ordered,
                           memoized_meth, make_tempdir)
 
-__all__ = ['GNUCompiler']
+__all__ = ['GNUCompiler', 'JITCache', 'jit_cache']
 
 
 def sniff_compiler_version(cc):
@@ -260,6 +264,17 @@ class Compiler(GCCToolchain):
         target = str(self.get_jit_dir().joinpath(soname))
         src_file = "%s.%s" % (target, self.src_ext)
 
+        # Attempt fetching the binary from the shared jit-cache, thus skipping
+        # compilation altogether
+        shared = jit_cache.enabled and configuration['jit-backdoor'] is False
+        if shared:
+            key = jit_cache.key(self, soname)
+            if jit_cache.fetch(key, target + self.so_ext):
+                if not path.isfile(src_file):
+                    with open(src_file, 'w') as f:
+                        f.write(code)
+                return False, src_file
+
         cache_dir = self.get_codepy_dir().joinpath(soname[:7])
         if configuration['jit-backdoor'] is False:
             # Typically we end up here
@@ -296,8 +311,20 @@ class Compiler(GCCToolchain):
                 debug=configuration['debug-compiler'],
                 sleep_delay=sleep_delay)
 
+        if shared:
+            jit_cache.store(key, target + self.so_ext)
+
         return recompiled, src_file
 
+    @property
+    def identity(self):
+        """
+        A string identifying the binaries produced by this Compiler, that is
+        the compiler version and the full compilation command line.
+        """
+        return ' '.join([str(self), str(self.version), platform.machine()] +
+                        self._cmdline([]))
+
     def __lookup_cmds__(self):
         self.CC = 'unknown'
         self.CXX = 'unknown'
@@ -461,6 +488,122 @@ class CustomCompiler(Compiler):
         self.MPICXX = environ.get('MPICXX', 'mpicxx')
 
 
+class JITCache(object):
+
+    """
+    A shared, content-addressed cache of JIT-compiled binaries.
+
+    Unlike the default jit-cache, which lives in a temporary directory of the
+    local machine, the JITCache may be placed on a filesystem shared by many
+    machines (e.g., the nodes of a cluster) through
+    ``configuration['jit-cache-dir']``. Binaries are keyed by the shared object
+    name -- which depends on the generated code and on the jit-relevant
+    `configuration` entries -- and by the compiler identity, so a machine
+    finding a matching binary can load it without invoking the compiler.
+
+    Notes
+    -----
+    Binaries are written to a temporary file and then atomically renamed, so
+    concurrent readers never see a partially written binary. When the cache
+    grows beyond ``configuration['jit-cache-size']`` MB, the least recently
+    used binaries are evicted.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return configuration['jit-cache-dir'] is not None
+
+    @property
+    def path(self):
+        ret = Path(configuration['jit-cache-dir']).expanduser()
+        ret.mkdir(parents=True, exist_ok=True)
+        return ret
+
+    @classmethod
+    def key(cls, compiler, soname):
+        """The key of the binary ``soname`` produced by ``compiler``."""
+        identity = sha1(compiler.identity.encode()).hexdigest()
+        return '%s-%s%s' % (soname, identity[:12], compiler.so_ext)
+
+    def fetch(self, key, sofile):
+        """
+        Copy the binary mapped to ``key`` into ``sofile``. Return True if
+        there is such a binary, False otherwise.
+        """
+        cachefile = self.path.joinpath(key)
+        tmpfile = '%s.%s.tmp' % (sofile, uuid4().hex)
+        try:
+            shutil.copyfile(str(cachefile), tmpfile)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        os.replace(tmpfile, sofile)
+        # Mark the binary as recently used
+        try:
+            os.utime(str(cachefile))
+        except OSError:
+            pass
+        self.hits += 1
+        debug("JITCache: fetched `%s` from `%s`" % (key, self.path))
+        return True
+
+    def store(self, key, sofile):
+        """Store the binary ``sofile`` under ``key``."""
+        cachefile = self.path.joinpath(key)
+        if cachefile.is_file():
+            return
+        tmpfile = self.path.joinpath('%s.%s.tmp' % (key, uuid4().hex))
+        try:
+            shutil.copyfile(sofile, str(tmpfile))
+            os.replace(str(tmpfile), str(cachefile))
+        except OSError as e:
+            warning("JITCache: couldn't store `%s` [%s]" % (key, e))
+            if tmpfile.is_file():
+                tmpfile.unlink()
+            return
+        debug("JITCache: stored `%s` in `%s`" % (key, self.path))
+        self.evict()
+
+    def evict(self):
+        """Drop the least recently used binaries until the size bound is met."""
+        maxsize = configuration['jit-cache-size']*2**20
+        if maxsize <= 0:
+            return
+        entries = []
+        for i in self.path.iterdir():
+            if i.suffix == '.tmp':
+                continue
+            try:
+                stat = i.stat()
+            except FileNotFoundError:
+                # Concurrently evicted
+                continue
+            entries.append((stat.st_mtime, stat.st_size, i))
+        size = sum(i[1] for i in entries)
+        for _, v, i in sorted(entries, key=lambda i: i[0]):
+            if size <= maxsize:
+                break
+            try:
+                i.unlink()
+                debug("JITCache: evicted `%s`" % i.name)
+            except FileNotFoundError:
+                pass
+            size -= v
+
+    def clear(self):
+        """Drop all binaries from the cache."""
+        for i in self.path.iterdir():
+            i.unlink()
+
+
+jit_cache = JITCache()
+"""The shared jit-cache."""
+
+
 compiler_registry = {
     'custom': CustomCompiler,
     'gnu': GNUCompiler,
@@ -1,19 +1,26 @@
 from collections import OrderedDict
+from contextlib import contextmanager
 from itertools import combinations, product
 from functools import total_ordering
+from uuid import uuid4
+import fcntl
+import json
+import os
 import resource
 
+import numpy as np
+
 from devito.archinfo import KNL, KNL7210
 from devito.ir import Backward, retrieve_iteration_tree
-from devito.logger import perf, warning as _warning
+from devito.logger import debug, perf, warning as _warning
 from devito.mpi.distributed import MPI, MPINeighborhood
 from devito.mpi.routines import MPIMsgEnriched
 from devito.parameters import configuration
 from devito.symbolics import evaluate
 from devito.targets import BlockDimension
-from devito.tools import filter_ordered, flatten, prod
+from devito.tools import filter_ordered, flatten, make_tempdir, prod
 
-__all__ = ['autotune']
+__all__ = ['autotune', 'TuningDB', 'tuning_db']
 
 
 def autotune(operator, args, level, mode):
@@ -41,6 +48,19 @@ def autotune(operator, args, level, mode):
         raise ValueError("The accepted `(level, mode)` combinations are `%s`; "
                          "provided `%s` instead" % (accepted, key))
 
+    roots = [operator.body] + [i.root for i in operator._func_table.values()]
+    trees = filter_ordered(retrieve_iteration_tree(roots), key=lambda i: i.root)
+
+    # Reuse the outcome of a previous autotuning session, if any
+    if configuration['autotuning-db']:
+        dbkey = tuning_db.key(operator, args, trees, level)
+        best = tuning_db.get(dbkey)
+        if best is not None:
+            log("fetched <%s> from the database" %
+                ','.join('%s=%s' % i for i in best.items()))
+            args.update(best)
+            return args, {'runs': 0, 'tpr': 0, 'tuned': dict(best)}
+
     # We get passed all the arguments, but the cfunction only requires a subset
     at_args = OrderedDict([(p.name, args[p.name]) for p in operator.parameters])
 
@@ -67,9 +87,6 @@ def autotune(operator, args, level, mode):
                     i.fromrank = MPI.PROC_NULL
                     i.torank = MPI.PROC_NULL
 
-    roots = [operator.body] + [i.root for i in operator._func_table.values()]
-    trees = filter_ordered(retrieve_iteration_tree(roots), key=lambda i: i.root)
-
     # Detect the time-stepping Iteration; shrink its iteration range so that
     # each autotuning run only takes a few iterations
     steppers = {i for i in flatten(trees) if i.dim.is_Time}
@@ -103,7 +120,17 @@ def autotune(operator, args, level, mode):
         # Symbolic number of loop-blocking blocks per thread
         nblocks_per_thread = calculate_nblocks(tree, blockable) / operator.nthreads
 
-        for bs, nt in tunable:
+        # Search strategy
+        if options['search'] == 'model':
+            candidates = model_guided_search(operator, n, tree, blockable, tunable,
+                                             args, timings)
+        elif options['search'] == 'exhaustive':
+            candidates = tunable
+        else:
+            raise ValueError("Unknown autotuning search strategy `%s`"
+                             % options['search'])
+
+        for bs, nt in candidates:
             # Can we safely autotune over the given time range?
             if not check_time_bounds(stepper, at_args, args, mode):
                 break
@@ -128,8 +155,15 @@ def autotune(operator, args, level, mode):
                 assert stack_footprint == 0
 
             # Run the Operator
-            operator.cfunction(*list(at_args.values()))
-            elapsed = operator._profiler.timer.total
+            timer = operator._profiler.timer
+            if timer is not None:
+                operator.cfunction(*list(at_args.values()))
+                elapsed = timer.total
+            else:
+                # No C-level timers (`profiling='off'`)
+                with operator._profiler.timer_on('autotuning'):
+                    operator.cfunction(*list(at_args.values()))
+                elapsed = operator._profiler.py_timers.pop('autotuning')
 
             timings.setdefault(nt, OrderedDict()).setdefault(n, {})[bs] = elapsed
             log("run <%s> took %f (s) in %d timesteps" %
@@ -139,7 +173,8 @@ def autotune(operator, args, level, mode):
             update_time_bounds(stepper, at_args, timesteps, mode)
 
             # Reset profiling timers
-            operator._profiler.timer.reset()
+            if timer is not None:
+                timer.reset()
 
     # The best variant is the one that for a given number of threads had the minium
     # turnaround time
@@ -162,6 +197,10 @@ def autotune(operator, args, level, mode):
     # Update the argument list with the tuned arguments
     args.update(best)
 
+    # Make the tuned arguments available to future runs
+    if configuration['autotuning-db']:
+        tuning_db.put(dbkey, best)
+
     # In `runtime` mode, some timesteps have been executed already, so we must
     # adjust the time range
     finalize_time_bounds(stepper, at_args, args, mode)
@@ -175,6 +214,111 @@ def autotune(operator, args, level, mode):
     return args, summary
 
 
+class TuningDB(object):
+
+    """
+    A persistent, on-disk database of autotuning results.
+
+    The database maps an autotuning problem -- an Operator, identified through
+    the name of its shared object, the target platform, the number of threads,
+    the extent of the iteration space and the autotuning level -- to the best
+    tunable arguments found by a previous autotuning session. Thus, autotuning
+    the same Operator again, either in a later run or by a different process,
+    comes at no cost.
+
+    Parameters
+    ----------
+    path : Path, optional
+        The database file. Defaults to a file within a deterministic temporary
+        directory.
+
+    Notes
+    -----
+    The database is a JSON file, which is read and written under an advisory
+    file lock, so it can safely be shared by concurrent processes (e.g., MPI
+    ranks or independent runs).
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+
+    @property
+    def path(self):
+        if self._path is None:
+            self._path = make_tempdir('autotuning').joinpath('db.json')
+        return self._path
+
+    @classmethod
+    def key(cls, operator, args, trees, level):
+        """
+        The key of the autotuning problem for ``operator`` run with arguments
+        ``args``.
+        """
+        nthreads = operator.nthreads
+        nthreads = 1 if nthreads == 1 else args[nthreads.name]
+        extents = []
+        for d in filter_ordered(i.dim.root for i in flatten(trees)):
+            if d.is_Time or d.max_name not in args or d.min_name not in args:
+                continue
+            extents.append('%s=%d' % (d.name, args[d.max_name] - args[d.min_name] + 1))
+        return ':'.join([operator._soname, str(configuration['platform']),
+                         str(nthreads), level, ','.join(extents)])
+
+    @contextmanager
+    def _locked(self, exclusive=False):
+        lockfile = self.path.with_suffix('.lock')
+        with open(str(lockfile), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(str(self.path), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            debug("TuningDB: `%s` is corrupted; ignoring it" % self.path)
+            return {}
+
+    def get(self, key):
+        """
+        Retrieve the tuned arguments mapped to ``key``. Return None if there
+        is no such entry in the database.
+        """
+        with self._locked():
+            entry = self._read().get(key)
+        if entry is None:
+            return None
+        return OrderedDict(entry)
+
+    def put(self, key, best):
+        """Map ``key`` to the tuned arguments ``best``."""
+        entry = [(k, int(v)) for k, v in best.items()]
+        with self._locked(exclusive=True):
+            db = self._read()
+            db[key] = entry
+            # Write to a temporary file and then rename it, so that a crash
+            # can never leave behind a partially written database
+            tmpfile = self.path.with_suffix('.%s.tmp' % uuid4().hex)
+            with open(str(tmpfile), 'w') as f:
+                json.dump(db, f, indent=1)
+            os.replace(str(tmpfile), str(self.path))
+
+    def clear(self):
+        """Drop all entries from the database."""
+        with self._locked(exclusive=True):
+            if self.path.is_file():
+                self.path.unlink()
+
+
+tuning_db = TuningDB()
+"""The default TuningDB."""
+
+
 @total_ordering
 class Record(object):
 
@@ -334,6 +478,170 @@ def generate_block_shapes(blockable, args, level):
     return ret
 
 
+class CostModel(object):
+
+    """
+    A cache-aware performance model for loop blocking, used to rank the
+    candidate block shapes of an iteration tree without running them.
+
+    The predicted cost of a block shape is the compulsory memory traffic of
+    the Operator (as computed by the profiler) scaled by:
+
+        * the redundant loads due to the stencil halo of each block;
+        * the loss of temporal reuse when the working set of a block -- derived
+          from the Operator's ``_mem_summary`` -- exceeds the cache size;
+        * the load imbalance when the blocks can't be evenly distributed over
+          the threads;
+        * the vectorization inefficiency of short innermost blocks.
+
+    The model is only meant to sort candidates; its output is a relative cost,
+    not a runtime prediction.
+    """
+
+    def __init__(self, operator, tree, blockable, args):
+        self.operator = operator
+        self.tree = tree
+        self.blockable = blockable
+        # Only the scalar arguments are needed to evaluate the model
+        self.args = args = {k: v for k, v in args.items()
+                            if isinstance(v, (int, float, np.number))}
+
+        self.nblocks = calculate_nblocks(tree, blockable)
+
+        itemsize = operator._dtype().itemsize
+        sections = operator._profiler._sections.values()
+        traffic = sum(i.traffic for i in sections)
+        try:
+            self.traffic = float(traffic.subs(args))*itemsize
+        except AttributeError:
+            self.traffic = traffic*itemsize or 1.
+
+        # The stencil width along each blocked Dimension
+        roots = filter_ordered(d.root for d in blockable)
+        self.widths = {}
+        for d in roots:
+            widths = [v[d].upper - v[d].lower for v in operator._dspace.parts.values()
+                      if d in v.dimensions]
+            self.widths[d] = max(widths, default=0)
+
+        # Bytes per grid point, as given by the data actually used by the Operator
+        extents = [d for d in filter_ordered(i.dim.root for i in tree) if not d.is_Time]
+        self.extents = OrderedDict((d, int(args[d.max_name] - args[d.min_name] + 1))
+                                   for d in extents)
+        external = operator._mem_summary['external']
+        npoints = prod(v + self.widths.get(d, 0) for d, v in self.extents.items())
+        try:
+            self.bpp = int(evaluate(external, **args)) / npoints
+        except AttributeError:
+            self.bpp = external / npoints or itemsize
+
+        platform = configuration['platform']
+        self.simd = max(platform.simd_items_per_reg(operator._dtype) if
+                        platform.simd_reg_size else 1, 1)
+        self.cache_size = options['cache-size'] or detect_cache_size()
+
+    def __call__(self, bs, nt):
+        mapper = OrderedDict((k, v) for k, v in bs + nt if k is not None)
+        args = dict(self.args)
+        args.update(mapper)
+
+        # The smallest (i.e., the innermost level) block along each Dimension
+        blocks = OrderedDict()
+        for d in self.blockable:
+            blocks[d.root] = min(blocks.get(d.root, mapper[d.step.name]),
+                                 mapper[d.step.name])
+
+        # Redundant loads along the block boundaries
+        halo = prod((v + self.widths[d]) / v for d, v in blocks.items())
+
+        # Temporal reuse is lost if the working set doesn't fit in cache
+        footprint = self.bpp * prod(blocks.get(d, v) + self.widths.get(d, 0)
+                                    for d, v in self.extents.items())
+        reuse = max(self.widths.values(), default=0) + 1
+        misses = 1 if footprint <= self.cache_size else \
+            min(footprint / self.cache_size, reuse)
+
+        # Load imbalance across threads
+        nthreads = mapper.get(getattr(self.operator.nthreads, 'name', None), 1)
+        nblocks = float(self.nblocks.subs(args))
+        imbalance = (-(-nblocks // nthreads) / (nblocks / nthreads)) if nblocks else 1
+
+        # Short innermost blocks hinder vectorization
+        innermost = self.tree[-1].dim.root
+        simd = 1 + self.simd / blocks[innermost] if innermost in blocks else 1
+
+        return self.traffic * halo * misses * imbalance * simd
+
+
+def model_guided_search(operator, n, tree, blockable, tunable, args, timings):
+    """
+    Generate the candidates to be run by the autotuner, by means of a
+    model-guided hill-climbing search.
+
+    For each number of threads, the candidate block shapes are ranked by a
+    CostModel. The ``options['model-seeds']`` top-ranked candidates are run
+    first; then, starting from the fastest one, the search moves to the fastest
+    among the neighbouring block shapes -- those with the closest smaller or
+    larger size along one Dimension, all other sizes being equal -- until no
+    neighbour is faster. The measured runtimes are read back from ``timings``.
+    """
+    model = CostModel(operator, tree, blockable, args)
+
+    for nt in filter_ordered(nt for _, nt in tunable):
+        group = [bs for bs, i in tunable if i == nt]
+        ranked = sorted(group, key=lambda bs: model(bs, nt))
+
+        def neighbours(current):
+            # Along each Dimension, the candidates with the closest smaller and
+            # larger size, all other sizes being equal
+            ret = []
+            for i in range(len(current)):
+                line = [bs for bs in group
+                        if bs[:i] == current[:i] and bs[i+1:] == current[i+1:]]
+                line = sorted(line, key=lambda bs: bs[i][1])
+                index = line.index(current)
+                ret.extend(line[max(index-1, 0):index] + line[index+1:index+2])
+            return ret
+
+        visited = set()
+        for bs in ranked[:options['model-seeds']]:
+            visited.add(bs)
+            yield bs, nt
+
+        current = None
+        while True:
+            measured = timings.get(nt, {}).get(n, {})
+            if not measured:
+                break
+            best = min(measured, key=measured.get)
+            if best == current:
+                break
+            current = best
+            for bs in neighbours(current):
+                if bs not in visited:
+                    visited.add(bs)
+                    yield bs, nt
+
+        log("model-guided search ran %d out of %d candidates"
+            % (len(visited), len(group)))
+
+
+def detect_cache_size():
+    """
+    The size, in bytes, of the per-core cache targeted by loop blocking (i.e.,
+    the L2 cache). Falls back to 1 MB if autodetection fails.
+    """
+    try:
+        with open('/sys/devices/system/cpu/cpu0/cache/index2/size', 'r') as f:
+            size = f.read().strip()
+        units = {'K': 2**10, 'M': 2**20, 'G': 2**30}
+        if size[-1] in units:
+            return int(size[:-1])*units[size[-1]]
+        return int(size)
+    except (OSError, ValueError, IndexError):
+        return 2**20
+
+
 def generate_nthreads(nthreads, args, level):
     if nthreads == 1:
         return [((None, 1),)]
@@ -368,9 +676,19 @@ options = {
     'squeezer': 4,
     'blocksize-l0': (8, 16, 24, 32, 64, 96, 128),
     'blocksize-l1': (8, 16, 32),
-    'stack_limit': resource.getrlimit(resource.RLIMIT_STACK)[0] / 4
+    'stack_limit': resource.getrlimit(resource.RLIMIT_STACK)[0] / 4,
+    'search': 'exhaustive',
+    'model-seeds': 3,
+    'cache-size': None
 }
-"""Autotuning options."""
+"""
+Autotuning options.
+
+The block shapes may be searched either exhaustively (`search='exhaustive'`) or
+through a model-guided search (`search='model'`), which only runs a small subset
+of the candidates -- see ``model_guided_search``. `cache-size`, in bytes, is
+autodetected if None.
+"""
 
 
 def log(msg):
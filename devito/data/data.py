@@ -277,7 +277,7 @@ class Data(np.ndarray):
                 glb_idx, val = self._process_args(glb_idx, val)
                 val_idx = [index_dist_to_repl(i, dec) for i, dec in
                            zip(glb_idx, self._decomposition)]
-                if NONLOCAL in val_idx:
+                if any(i is NONLOCAL for i in val_idx):
                     # no-op
                     return
                 val_idx = tuple([i for i in val_idx if i is not PROJECTED])
@@ -406,7 +406,7 @@ class Data(np.ndarray):
             loc_idx.append(v)
 
         # Deal with NONLOCAL accesses
-        if NONLOCAL in loc_idx:
+        if any(i is NONLOCAL for i in loc_idx):
             if len(loc_idx) == self.ndim and index_is_basic(loc_idx):
                 # Caller expecting a scalar -- it will eventually get None
                 loc_idx = [NONLOCAL]
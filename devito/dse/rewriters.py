@@ -14,7 +14,7 @@ from devito.logger import dse_warning as warning
 from devito.symbolics import (bhaskara_cos, bhaskara_sin, estimate_cost, freeze,
                               pow_to_mul, q_leaf, q_sum_of_product, q_terminalop,
                               yreplace)
-from devito.tools import flatten
+from devito.tools import flatten, timed_pass
 from devito.types import Array, Eq, Scalar
 
 __all__ = ['BasicRewriter', 'AdvancedRewriter', 'AggressiveRewriter', 'CustomRewriter']
@@ -45,6 +45,7 @@ def dse_pass(func):
         # Profiling
         key = '%s%d' % (func.__name__, len(state.timings))
         state.timings[key] = toc - tic
+        timed_pass.record(func.__name__, tic, toc)
         if self.profile:
             candidates = [c.exprs for c in state.clusters if c.is_dense]
             state.ops[key] = estimate_cost(flatten(candidates))
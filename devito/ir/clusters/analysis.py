@@ -100,6 +100,12 @@ class Parallelism(Detector):
         # The i-th Dimension is PARALLEL_IF_ATOMIC if for all dependeces:
         # test0 OR test1 OR the write is an associative and commutative increment
 
+        # The increments performed within a colour are free of conflicts by
+        # construction (see ColouredDimension), so they may only induce
+        # dependences along the Dimensions iterating over the colours
+        colours = {i.colour for i in flatten(c.ispace.dimensions for c in clusters)
+                   if i.is_Coloured}
+
         is_parallel_atomic = False
 
         scope = self._fetch_scope(clusters)
@@ -116,6 +122,11 @@ class Parallelism(Detector):
             if not dep.is_increment:
                 return SEQUENTIAL
 
+            if d in colours:
+                return SEQUENTIAL
+            elif colours.intersection(prev):
+                continue
+
             # At this point, if it's not SEQUENTIAL, it can only be PARALLEL_IF_ATOMIC
             is_parallel_atomic = True
 
@@ -14,7 +14,8 @@ from devito.ir.equations import ClusterizedEq
 from devito.ir.support import (SEQUENTIAL, PARALLEL, PARALLEL_IF_ATOMIC, VECTORIZED,
                                WRAPPABLE, ROUNDABLE, AFFINE, TILABLE, OVERLAPPABLE,
                                Property, Forward, detect_io)
-from devito.symbolics import ListInitializer, FunctionFromPointer, as_symbol, ccode
+from devito.symbolics import (ListInitializer, FunctionFromPointer, as_symbol, ccode,
+                              retrieve_indexed)
 from devito.tools import (Signer, as_tuple, filter_ordered, filter_sorted, flatten,
                           validate_type, dtype_to_cstr)
 from devito.types import Symbol, Indexed
@@ -464,18 +465,18 @@ class Iteration(Node):
     @property
     def symbolic_bounds(self):
         """A 2-tuple representing the symbolic bounds [min, max] of the Iteration."""
-        _min = self.limits[0]
-        _max = self.limits[1]
-        try:
-            _min = as_symbol(_min)
-        except TypeError:
-            # A symbolic expression
-            pass
-        try:
-            _max = as_symbol(_max)
-        except TypeError:
-            # A symbolic expression
-            pass
+        bounds = []
+        for i in self.limits[:2]:
+            if isinstance(i, Indexed):
+                # E.g., a bound read from an array, as in indirect iteration spaces
+                bounds.append(i)
+                continue
+            try:
+                bounds.append(as_symbol(i))
+            except TypeError:
+                # A symbolic expression
+                bounds.append(i)
+        _min, _max = bounds
         return (_min + self.offsets[0], _max + self.offsets[1])
 
     @property
@@ -519,7 +520,9 @@ class Iteration(Node):
     @property
     def functions(self):
         """All Functions appearing in the Iteration header."""
-        return ()
+        indexeds = flatten(retrieve_indexed(i) for i in
+                           (self.symbolic_min, self.symbolic_max))
+        return tuple(filter_ordered(i.function for i in indexeds))
 
     @property
     def free_symbols(self):
@@ -686,6 +689,33 @@ class TimedList(List):
                                "(double)(end_%(ln)s.tv_sec-start_%(ln)s.tv_sec)+" +
                                "(double)(end_%(ln)s.tv_usec-start_%(ln)s.tv_usec)" +
                                "/1000000") % {'gn': timer.name, 'ln': lname})]
+        if getattr(timer, 'timeline', None):
+            # Sample the cumulative timing into the ring buffer every `period` calls
+            mapper = {'gn': timer.name, 'ln': lname, 'n': len(timer.sections),
+                      'i': timer.sections.index(lname)}
+            footer.extend([
+                c.Statement("%(gn)s->ncalls_%(ln)s += 1" % mapper),
+                c.If("%(gn)s->ncalls_%(ln)s %% %(gn)s->period == 0" % mapper,
+                     c.Statement(("%(gn)s->timeline[((%(gn)s->ncalls_%(ln)s / "
+                                  "%(gn)s->period - 1) %% %(gn)s->size)*%(n)d + %(i)d] = "
+                                  "%(gn)s->%(ln)s") % mapper))
+            ])
+        if getattr(timer, 'events', None):
+            # Read the hardware counters, scaled by the fraction of time they were
+            # actually running (i.e., in case of multiplexing), around the body
+            mapper = {'gn': timer.name, 'n': len(timer.events),
+                      'i': timer.sections.index(lname)}
+            read = ("(read(%(gn)s->fds[pmu], pmu_v, sizeof(pmu_v)) == sizeof(pmu_v) "
+                    "&& pmu_v[2]) ? pmu_v[0]*((double)pmu_v[1]/pmu_v[2]) : 0.0" % mapper)
+            scratch = "%(gn)s->scratch[%(i)d*(%(gn)s->nfds + 1) + pmu]" % mapper
+            counter = ("%(gn)s->counters[%(i)d*%(n)d + %(gn)s->fdevents[pmu]]"
+                       % mapper)
+            loop = lambda *stmts: c.For("int pmu = 0", "pmu < %s->nfds" % timer.name,
+                                        "pmu++", c.Block([
+                                            c.Statement("uint64_t pmu_v[3] = {0, 0, 0}")
+                                        ] + list(stmts)))
+            header.insert(0, loop(c.Statement("%s = %s" % (scratch, read))))
+            footer.append(loop(c.Statement("%s += (%s) - %s" % (counter, read, scratch))))
         super(TimedList, self).__init__(header, body, footer)
 
     @property
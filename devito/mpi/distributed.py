@@ -48,7 +48,7 @@ except ImportError:
             return None
 
 
-__all__ = ['Distributor', 'SparseDistributor', 'MPI']
+__all__ = ['Distributor', 'SparseDistributor', 'MPI', 'balanced_splits']
 
 
 class AbstractDistributor(ABC):
@@ -171,11 +171,24 @@ class Distributor(AbstractDistributor):
     comm : MPI communicator, optional
         The set of processes over which the domain is distributed. Defaults to
         MPI.COMM_WORLD.
+    topology : tuple of ints, optional
+        The number of processes along each decomposed Dimension. Defaults to
+        the topology minimizing the halo volume per rank; see ``compute_dims``.
+    decomposition : tuple or array_like or Function, optional
+        How each decomposed Dimension is split over the processes. Defaults to
+        near-equal chunks. It can be either a tuple, with one entry per
+        Dimension being None (near-equal chunks) or the sorted global indices
+        at which the second, third, ... chunks begin; or a per-point cost, as a
+        ``numpy.ndarray`` with the global domain shape or as a Function defined
+        over a Grid with the same shape, in which case each Dimension is split
+        such that all chunks carry approximately the same cost.
     """
 
-    def __init__(self, shape, dimensions, input_comm=None):
+    def __init__(self, shape, dimensions, input_comm=None, topology=None,
+                 decomposition=None):
         super(Distributor, self).__init__(shape, dimensions)
 
+        splits = [None]*len(shape)
         if configuration['mpi']:
             # First time we enter here, we make sure MPI is initialized
             if not MPI.Is_initialized():
@@ -189,14 +202,65 @@ class Distributor(AbstractDistributor):
                     self._input_comm.Free()
             atexit.register(cleanup)
 
-            # `MPI.Compute_dims` sets the dimension sizes to be as close to each other
-            # as possible, using an appropriate divisibility algorithm. Thus, in 3D:
-            # * topology[0] >= topology[1] >= topology[2]
-            # * topology[0] * topology[1] * topology[2] == self._input_comm.size
-            # However, `MPI.Compute_dims` is distro-dependent, so we have to enforce
-            # some properties through our own wrapper (e.g., OpenMPI v3 does not
-            # guarantee that 9 ranks are arranged into a 3x3 grid when shape=(9, 9))
-            self._topology = compute_dims(self._input_comm.size, len(shape))
+            # Explicit split points determine the number of processes along
+            # the corresponding Dimensions
+            cost = None
+            if isinstance(decomposition, (tuple, list)):
+                if len(decomposition) != len(shape):
+                    raise ValueError("`decomposition` must have one entry per "
+                                     "decomposed Dimension")
+                for d, (i, n) in enumerate(zip(decomposition, shape)):
+                    if i is not None:
+                        splits[d] = tuple(int(j) for j in i)
+                        points = (0,) + splits[d] + (n,)
+                        if not all(j < k for j, k in zip(points, points[1:])):
+                            raise ValueError("Illegal split points `%s` for a "
+                                             "Dimension of size %d" % (str(i), n))
+            elif decomposition is not None:
+                cost = decomposition
+            fixed = {d: len(i) + 1 for d, i in enumerate(splits) if i is not None}
+
+            if topology is None:
+                # The topology minimizing the halo volume per rank. `MPI.Compute_dims`
+                # is unaware of the domain shape, so on elongated domains it may
+                # pick decompositions that needlessly increase the halo surface
+                weights = configuration['mpi-link-weights']
+                if weights.get('intra', 1) != weights.get('inter', 1):
+                    ppn = self._compute_ppn(self._input_comm)
+                else:
+                    ppn = 1
+                nfixed = int(np.prod(list(fixed.values())))
+                free = [d for d in range(len(shape)) if d not in fixed]
+                if self._input_comm.size % nfixed or (not free and
+                                                      nfixed != self._input_comm.size):
+                    raise ValueError("The split points in `decomposition` are "
+                                     "incompatible with %d processes" %
+                                     self._input_comm.size)
+                topology = dict(fixed)
+                if free:
+                    dims = compute_dims(self._input_comm.size // nfixed, len(free),
+                                        shape=[shape[d] for d in free],
+                                        weights=weights, ppn=ppn)
+                    topology.update(zip(free, dims))
+                self._topology = tuple(topology[d] for d in range(len(shape)))
+            else:
+                topology = as_tuple(topology)
+                if (len(topology) != len(shape) or
+                        np.prod(topology) != self._input_comm.size):
+                    raise ValueError("Illegal topology `%s` for %d processes over a "
+                                     "%d-dimensional domain" %
+                                     (str(topology), self._input_comm.size, len(shape)))
+                if any(topology[d] != v for d, v in fixed.items()):
+                    raise ValueError("The split points in `decomposition` are "
+                                     "incompatible with the topology `%s`" %
+                                     str(topology))
+                self._topology = topology
+
+            if cost is not None:
+                # Split each Dimension so as to balance the cost marginal to it
+                for d, (i, t) in enumerate(zip(_cost_marginals(cost, shape),
+                                               self._topology)):
+                    splits[d] = balanced_splits(i, t)
 
             if self._input_comm is not input_comm:
                 # By default, Devito arranges processes into a cartesian topology.
@@ -213,8 +277,21 @@ class Distributor(AbstractDistributor):
             self._topology = tuple(1 for _ in range(len(shape)))
 
         # The domain decomposition
-        self._decomposition = [Decomposition(np.array_split(range(i), j), c)
-                               for i, j, c in zip(shape, self.topology, self.mycoords)]
+        self._decomposition = []
+        for i, j, s, c in zip(shape, self.topology, splits, self.mycoords):
+            if s is None:
+                items = np.array_split(range(i), j)
+            else:
+                items = np.split(np.arange(i), s)
+            self._decomposition.append(Decomposition(items, c))
+
+    @classmethod
+    def _compute_ppn(cls, comm):
+        """The (maximum) number of processes per node in ``comm``."""
+        nodecomm = comm.Split_type(MPI.COMM_TYPE_SHARED)
+        ppn = comm.allreduce(nodecomm.size, op=MPI.MAX)
+        nodecomm.Free()
+        return ppn
 
     @property
     def comm(self):
@@ -288,17 +365,44 @@ class Distributor(AbstractDistributor):
             ret[d] = tuple(v)
         return ret
 
+    @cached_property
+    def _glb_starts(self):
+        """The first global index of each subdomain, for each decomposed Dimension."""
+        return tuple(np.array([min(i) for i in d]) for d in self.decomposition)
+
+    def glb_to_coords(self, index):
+        """
+        The coordinates, in the Distributor topology, of the MPI ranks owning
+        an array of global indices.
+
+        Parameters
+        ----------
+        index : array_like of ints
+            The indices, of shape ``(n, ndim)``, for which the coordinates of
+            the owning MPI ranks are retrieved.
+        """
+        index = np.asarray(index).reshape(-1, self.ndim)
+        ret = np.empty(index.shape, dtype=int)
+        for d, (starts, i) in enumerate(zip(self._glb_starts, index.T)):
+            ret[:, d] = np.searchsorted(starts, i, side='right') - 1
+        return ret
+
     def glb_to_rank(self, index):
         """
         The MPI rank owning a given global index.
 
         Parameters
         ----------
-        index : int or list of ints
+        index : int or list of ints or numpy.ndarray
             The index, or list of indices, for which the owning MPI rank(s) is
-            retrieved.
+            retrieved. A ``numpy.ndarray`` of shape ``(n, ndim)`` is processed
+            in a vectorized fashion, and an array of ``n`` ranks is returned.
         """
-        if isinstance(index, (tuple, list)):
+        if isinstance(index, np.ndarray):
+            # The MPI ranks follow the C row-major ordering of the coordinates
+            ret = np.ravel_multi_index(self.glb_to_coords(index).T, self.topology)
+            return ret if index.ndim > 1 else int(ret[0])
+        elif isinstance(index, (tuple, list)):
             if len(index) == 0:
                 return None
             elif is_integer(index[0]):
@@ -358,6 +462,39 @@ class Distributor(AbstractDistributor):
 
         return ret
 
+    @cached_property
+    def graph_neighbors(self):
+        """
+        The face and diagonal neighbours of the calling MPI rank, as a list of
+        ``(sides, rank)`` pairs, where ``sides = (s0, s1, ..., sn)`` is a key of
+        :attr:`neighborhood`. Unlike in :attr:`neighborhood`, MPI.PROC_NULL
+        (i.e., sides beyond the grid boundary) is not included.
+        """
+        neighborhood = self.neighborhood
+        ret = []
+        for i in product([LEFT, CENTER, RIGHT], repeat=self.ndim):
+            if all(s is CENTER for s in i) or neighborhood[i] == MPI.PROC_NULL:
+                continue
+            ret.append((i, neighborhood[i]))
+        return ret
+
+    @cached_property
+    def graph_comm(self):
+        """
+        A distributed graph communicator connecting the calling MPI rank to its
+        :attr:`graph_neighbors`, in the same order, for use with neighborhood
+        collectives.
+        """
+        ranks = [i for _, i in self.graph_neighbors]
+        comm = self.comm.Create_dist_graph_adjacent(ranks, ranks, reorder=False)
+
+        # Make sure the graph communicator will be freed up upon exit
+        def cleanup():
+            comm.Free()
+        atexit.register(cleanup)
+
+        return comm
+
     @cached_property
     def _obj_comm(self):
         """An Object representing the MPI communicator."""
@@ -534,7 +671,140 @@ class MPINeighborhood(CompositeObject):
     _pickle_args = ['neighborhood']
 
 
-def compute_dims(nprocs, ndim):
+def compute_dims(nprocs, ndim, shape=None, halo=1, weights=None, ppn=1):
+    """
+    Arrange ``nprocs`` MPI processes into a Cartesian topology with ``ndim``
+    dimensions.
+
+    Parameters
+    ----------
+    nprocs : int
+        The number of MPI processes.
+    ndim : int
+        The number of dimensions of the topology.
+    shape : tuple of ints, optional
+        The shape of the domain to be decomposed. If provided, the topology is
+        chosen so as to minimize the halo volume per rank; otherwise, the
+        processes are distributed as evenly as possible over the dimensions.
+    halo : int or tuple of ints, optional
+        The halo width, possibly one per dimension. Defaults to 1. Note that
+        a uniform halo width doesn't impact the choice of the topology.
+    weights : dict, optional
+        The relative cost of ``intra``-node and ``inter``-node links. Defaults
+        to ``{'intra': 1, 'inter': 1}``.
+    ppn : int, optional
+        The number of processes per node. The processes are assumed to be
+        placed onto the nodes in blocks of consecutive ranks. Defaults to 1.
+
+    Notes
+    -----
+    Each factorisation of ``nprocs`` into ``ndim`` factors is scored by the
+    weighted halo volume that the most loaded rank sends to its face neighbours;
+    ties are broken by the total halo volume. Among equally good topologies,
+    the evenly distributed one is preferred.
+    """
+    default = _compute_dims_even(nprocs, ndim)
+    if shape is None or nprocs == 1:
+        return default
+
+    shape = as_tuple(shape)
+    halo = as_tuple(halo) if isinstance(halo, (tuple, list)) else (halo,)*ndim
+    weights = dict({'intra': 1, 'inter': 1}, **(weights or {}))
+
+    # Decomposing a Dimension into more parts than its points is not an option
+    candidates = [default] + [i for i in _factorizations(nprocs, ndim) if i != default]
+    candidates = [i for i in candidates if all(j <= k for j, k in zip(i, shape))]
+    if not candidates:
+        return default
+
+    return min(candidates, key=lambda i: _topology_cost(i, shape, halo, weights, ppn))
+
+
+def balanced_splits(cost, nparts):
+    """
+    Split a one-dimensional domain into ``nparts`` non-empty, contiguous chunks
+    carrying approximately the same cost.
+
+    Parameters
+    ----------
+    cost : array_like
+        The cost of each point of the domain.
+    nparts : int
+        The number of chunks.
+
+    Returns
+    -------
+    tuple of ints
+        The indices at which the second, third, ... chunks begin.
+
+    Examples
+    --------
+    >>> balanced_splits([1, 1, 1, 1], 2)
+    (2,)
+    >>> balanced_splits([4, 1, 1, 1, 1, 4], 3)
+    (1, 5)
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    npoint = cost.size
+    if nparts > npoint:
+        raise ValueError("Cannot split %d points into %d non-empty chunks" %
+                         (npoint, nparts))
+
+    # `prefix[i]` is the cost of the first `i` points
+    prefix = np.concatenate([[0.], np.cumsum(cost)])
+    if prefix[-1] <= 0:
+        # Nothing to balance
+        return tuple(int(i) for i in
+                     np.cumsum([len(i) for i in np.array_split(cost, nparts)])[:-1])
+    targets = prefix[-1]*np.arange(1, nparts)/nparts
+
+    # For each target, the split point whose prefix cost is the closest to it
+    hi = np.minimum(np.searchsorted(prefix, targets), npoint)
+    lo = np.maximum(hi - 1, 0)
+    points = np.where(targets - prefix[lo] <= prefix[hi] - targets, lo, hi)
+
+    # Make sure no chunk is empty
+    points = [int(i) for i in points]
+    for i in range(nparts - 1):
+        points[i] = max(points[i], (points[i-1] if i > 0 else 0) + 1)
+    for i in reversed(range(nparts - 1)):
+        points[i] = min(points[i], (points[i+1] if i < nparts - 2 else npoint) - 1)
+
+    return tuple(points)
+
+
+def _cost_marginals(cost, shape):
+    """
+    The cost of each index along each Dimension, that is the sum of ``cost``
+    over all other Dimensions.
+    """
+    ndim = len(shape)
+    if isinstance(cost, np.ndarray):
+        if cost.shape != tuple(shape):
+            raise ValueError("Expected a cost array of shape `%s`, got `%s`" %
+                             (str(tuple(shape)), str(cost.shape)))
+        return [cost.sum(axis=tuple(j for j in range(ndim) if j != d))
+                for d in range(ndim)]
+
+    # A Function, possibly distributed. Each rank contributes the marginals
+    # of the data it owns, which are then reduced
+    grid = getattr(cost, 'grid', None)
+    if grid is None or grid.shape != tuple(shape) or cost.dimensions != grid.dimensions:
+        raise ValueError("Expected a cost Function over a Grid of shape `%s`" %
+                         str(tuple(shape)))
+    distributor = grid.distributor
+    data = np.asarray(cost.data_ro_domain)
+    ret = []
+    for d, (n, numb) in enumerate(zip(shape, distributor.glb_numb)):
+        marginal = np.zeros(n)
+        marginal[numb] = data.sum(axis=tuple(j for j in range(ndim) if j != d))
+        if distributor.is_parallel:
+            distributor.comm.Allreduce(MPI.IN_PLACE, marginal, op=MPI.SUM)
+        ret.append(marginal)
+    return ret
+
+
+def _compute_dims_even(nprocs, ndim):
     # We don't do anything clever here. In fact, we do something very basic --
     # we just try to distribute `nprocs` evenly over the number of dimensions,
     # and if we can't we fallback to whatever MPI.Compute_dims gives...
@@ -548,3 +818,42 @@ def compute_dims(nprocs, ndim):
     else:
         v = int(v)
     return tuple(v for _ in range(ndim))
+
+
+def _factorizations(n, ndim):
+    """All ordered factorisations of ``n`` into ``ndim`` factors."""
+    if ndim == 1:
+        yield (n,)
+        return
+    for i in range(1, n + 1):
+        if n % i == 0:
+            for j in _factorizations(n // i, ndim - 1):
+                yield (i,) + j
+
+
+def _topology_cost(topology, shape, halo, weights, ppn):
+    """
+    The weighted halo volume sent by the most loaded rank and by all ranks, in
+    this order, if ``shape`` is decomposed over ``topology``.
+    """
+    ndim = len(topology)
+    nprocs = int(np.prod(topology))
+
+    # The ranks follow the C row-major ordering, as in MPI_Cart_create
+    ranks = np.arange(nprocs)
+    coords = np.indices(topology).reshape(ndim, -1)
+    strides = [int(np.prod(topology[i+1:])) for i in range(ndim)]
+
+    # The local shapes, as produced by the Decomposition
+    local = np.array([s // t + (c < s % t) for s, t, c in zip(shape, topology, coords)])
+
+    cost = np.zeros(nprocs)
+    for d in range(ndim):
+        area = np.prod(np.delete(local, d, axis=0), axis=0)*halo[d]
+        for shift in (-1, 1):
+            exists = (coords[d] + shift >= 0) & (coords[d] + shift < topology[d])
+            intra = ranks // ppn == (ranks + shift*strides[d]) // ppn
+            weight = np.where(intra, weights['intra'], weights['inter'])
+            cost += np.where(exists, area*weight, 0)
+
+    return cost.max(), cost.sum()
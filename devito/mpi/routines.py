@@ -1,34 +1,51 @@
 import abc
 from collections import OrderedDict
-from ctypes import POINTER, c_void_p, c_int, sizeof
+from ctypes import (POINTER, byref, c_char, c_double, c_void_p, c_int, c_long,
+                    c_ssize_t, cast, sizeof)
 from functools import reduce
 from itertools import product
 from operator import mul
 
+import numpy as np
 from sympy import Integer
+import cgen as c
 
-from devito.data import OWNED, HALO, NOPAD, LEFT, CENTER, RIGHT, default_allocator
+from devito.data import (OWNED, HALO, NOPAD, FULL, LEFT, CENTER, RIGHT,
+                         default_allocator)
+from devito.data.allocators import MemoryAllocator
 from devito.ir.equations import DummyEq
-from devito.ir.iet import (Call, Callable, Conditional, Expression, ExpressionBundle,
-                           AugmentedExpression, Iteration, List, Prodder, Return,
-                           make_efunc, FindNodes, Transformer)
+from devito.ir.iet import (Call, Callable, Conditional, Element, Expression,
+                           ExpressionBundle, AugmentedExpression, Iteration, List,
+                           Prodder, Return, make_efunc, FindNodes, Transformer)
 from devito.ir.support import PARALLEL
-from devito.mpi import MPI
+from devito.mpi.distributed import MPI, MPICommObject
 from devito.symbolics import (Byref, CondNe, FieldFromPointer, FieldFromComposite,
-                              IndexedPointer, Macro)
-from devito.tools import OrderedSet, dtype_to_mpitype, dtype_to_ctype, flatten, generator
+                              IndexedPointer, Macro, ccode)
+from devito.tools import (OrderedSet, dtype_to_cstr, dtype_to_mpitype, dtype_to_ctype,
+                          flatten, generator)
 from devito.types import Array, Dimension, Symbol, LocalObject, CompositeObject
 
-__all__ = ['HaloExchangeBuilder']
+__all__ = ['HaloExchangeBuilder', 'MPIStats']
 
 
 class HaloExchangeBuilder(object):
 
     """
     Build IET-based routines to implement MPI halo exchange.
+
+    Parameters
+    ----------
+    mode : str
+        The halo exchange scheme.
+    stats : MPIStats, optional
+        If provided, the generated routines are instrumented to accumulate,
+        for each peer, bytes and time spent in the gather/scatter copies, in
+        posting the MPI_Isend/MPI_Irecv and in the MPI_Waits.
+    **generators
+        Unique name generators.
     """
 
-    def __new__(cls, mode, **generators):
+    def __new__(cls, mode, stats=None, **generators):
         if mode is True or mode == 'basic':
             obj = object.__new__(BasicHaloExchangeBuilder)
         elif mode == 'diag':
@@ -39,6 +56,12 @@ class HaloExchangeBuilder(object):
             obj = object.__new__(Overlap2HaloExchangeBuilder)
         elif mode == 'full':
             obj = object.__new__(FullHaloExchangeBuilder)
+        elif mode == 'persistent':
+            obj = object.__new__(PersistentHaloExchangeBuilder)
+        elif mode == 'neighborhood':
+            obj = object.__new__(NeighborhoodHaloExchangeBuilder)
+        elif mode == 'aggregated':
+            obj = object.__new__(AggregatedHaloExchangeBuilder)
         else:
             assert False, "unexpected value `mode=%s`" % mode
 
@@ -54,6 +77,9 @@ class HaloExchangeBuilder(object):
         obj._msgs = OrderedDict()
         obj._efuncs = []
 
+        obj._stats = stats
+        obj._stats_offsets = OrderedDict()
+
         return obj
 
     @property
@@ -89,6 +115,10 @@ class HaloExchangeBuilder(object):
             else:
                 msg = self._msgs[(f, hse)]
 
+            # Reserve one MPIStats entry per peer
+            if self._stats is not None and (f, hse) not in self._stats_offsets:
+                self._stats_offsets[(f, hse)] = self._stats.add(f, self._npeers(hse))
+
             # Callables for send/recv/wait
             if (f.ndim, hse) not in self._cache_halo:
                 self._make_all(f, hse, msg)
@@ -120,14 +150,37 @@ class HaloExchangeBuilder(object):
         for i, (f, hse) in enumerate(hs.fmapper.items()):
             msg = self._msgs[(f, hse)]
             haloupdate, halowait = self._cache_halo[(f.ndim, hse)]
-            body.insert(i, self._call_haloupdate(haloupdate.name, f, hse, msg))
+            call = self._call_haloupdate(haloupdate.name, f, hse, msg)
+            body.insert(i, self._call_with_stats(call, f, hse))
             if halowait is not None:
-                body.append(self._call_halowait(halowait.name, f, hse, msg))
+                call = self._call_halowait(halowait.name, f, hse, msg)
+                body.append(self._call_with_stats(call, f, hse))
         if remainder is not None:
             body.append(self._call_remainder(remainder))
 
         return List(body=body)
 
+    @property
+    def _stats_params(self):
+        """The MPIStats parameter of the instrumented Callables, if any."""
+        return [] if self._stats is None else [self._stats]
+
+    def _stats_entry(self, haloid):
+        """A pointer to the MPIStats entry of the ``haloid``-th peer."""
+        return [] if self._stats is None else [Byref(IndexedPointer(self._stats, haloid))]
+
+    def _call_with_stats(self, call, f, hse):
+        """Supply ``call`` with the MPIStats entries reserved for ``f``'s halos."""
+        if self._stats is None:
+            return call
+        offset = self._stats_offsets[(f, hse)]
+        return call._rebuild(arguments=call.arguments + tuple(self._stats_entry(offset)))
+
+    def _npeers(self, hse):
+        """The number of peers involved in a halo exchange."""
+        # Only retain the halos required by the Diag scheme
+        return len([i for i in hse.halos if isinstance(i.dim, tuple)])
+
     @abc.abstractmethod
     def _make_region(self, hs, key):
         """
@@ -347,12 +400,6 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
         gather = Call('gather_%s' % key, [bufg] + list(bufg.shape) + [f] + ofsg)
         scatter = Call('scatter_%s' % key, [bufs] + list(bufs.shape) + [f] + ofss)
 
-        # The `gather` is unnecessary if sending to MPI.PROC_NULL
-        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather)
-        # The `scatter` must be guarded as we must not alter the halo values along
-        # the domain boundary, where the sender is actually MPI.PROC_NULL
-        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter)
-
         count = reduce(mul, bufs.shape, 1)
         rrecv = MPIRequestObject(name='rrecv')
         rsend = MPIRequestObject(name='rsend')
@@ -364,12 +411,27 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
         waitrecv = Call('MPI_Wait', [rrecv, Macro('MPI_STATUS_IGNORE')])
         waitsend = Call('MPI_Wait', [rsend, Macro('MPI_STATUS_IGNORE')])
 
-        iet = List(body=[recv, gather, send, waitsend, waitrecv, scatter])
-        parameters = ([f] + list(bufs.shape) + ofsg + ofss + [fromrank, torank, comm])
+        header = []
+        if self._stats is not None:
+            entry = lambda i: FieldFromPointer(i, self._stats)
+            header, gather, recv, send, waitsend, waitrecv, scatter = _instrument(
+                entry, f, count, torank, fromrank, gather, recv, send, waitsend,
+                waitrecv, scatter
+            )
+
+        # The `gather` is unnecessary if sending to MPI.PROC_NULL
+        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather)
+        # The `scatter` must be guarded as we must not alter the halo values along
+        # the domain boundary, where the sender is actually MPI.PROC_NULL
+        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter)
+
+        iet = List(body=header + [recv, gather, send, waitsend, waitrecv, scatter])
+        parameters = ([f] + list(bufs.shape) + ofsg + ofss + [fromrank, torank, comm] +
+                      self._stats_params)
         return Callable('sendrecv_%s' % key, iet, 'void', parameters, ('static',))
 
-    def _call_sendrecv(self, name, *args, **kwargs):
-        return Call(name, flatten(args))
+    def _call_sendrecv(self, name, *args, haloid=None, **kwargs):
+        return Call(name, flatten(args) + self._stats_entry(haloid))
 
     def _make_haloupdate(self, f, hse, key, **kwargs):
         distributor = f.grid.distributor
@@ -412,6 +474,7 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
                 lsizes, lofs = mapper[(d, LEFT, OWNED)]
                 rsizes, rofs = mapper[(d, RIGHT, HALO)]
                 args = [f, lsizes, lofs, rofs, rpeer, lpeer, comm]
+                kwargs['haloid'] = len(body)
                 body.append(self._call_sendrecv(sendrecv.name, *args, **kwargs))
 
             if (d, RIGHT) in hse.halos:
@@ -419,10 +482,11 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
                 rsizes, rofs = mapper[(d, RIGHT, OWNED)]
                 lsizes, lofs = mapper[(d, LEFT, HALO)]
                 args = [f, rsizes, rofs, lofs, lpeer, rpeer, comm]
+                kwargs['haloid'] = len(body)
                 body.append(self._call_sendrecv(sendrecv.name, *args, **kwargs))
 
         iet = List(body=body)
-        parameters = [f, comm, nb] + list(fixed.values())
+        parameters = [f, comm, nb] + list(fixed.values()) + self._stats_params
         return Callable('haloupdate%d' % key, iet, 'void', parameters, ('static',))
 
     def _call_haloupdate(self, name, f, hse, *args):
@@ -431,6 +495,10 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
         args = [f, comm, nb] + list(hse.loc_indices.values())
         return Call(name, flatten(args))
 
+    def _npeers(self, hse):
+        return len([i for i in hse.halos if not isinstance(i.dim, tuple) and
+                    i.dim not in hse.loc_indices])
+
     def _make_compute(self, *args):
         return
 
@@ -496,7 +564,7 @@ class DiagHaloExchangeBuilder(BasicHaloExchangeBuilder):
                                             fromrank, torank, comm, **kwargs))
 
         iet = List(body=body)
-        parameters = [f, comm, nb] + list(fixed.values())
+        parameters = [f, comm, nb] + list(fixed.values()) + self._stats_params
         return Callable('haloupdate%d' % key, iet, 'void', parameters, ('static',))
 
 
@@ -551,8 +619,6 @@ class OverlapHaloExchangeBuilder(DiagHaloExchangeBuilder):
                  for i in range(len(f._dist_dimensions))]
 
         gather = Call('gather_%s' % key, [bufg] + sizes + [f] + ofsg)
-        # The `gather` is unnecessary if sending to MPI.PROC_NULL
-        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather)
 
         count = reduce(mul, sizes, 1)
         rrecv = Byref(FieldFromPointer(msg._C_field_rrecv, msg))
@@ -562,8 +628,18 @@ class OverlapHaloExchangeBuilder(DiagHaloExchangeBuilder):
         send = Call('MPI_Isend', [bufg, count, Macro(dtype_to_mpitype(f.dtype)),
                                   torank, Integer(13), comm, rsend])
 
-        iet = List(body=[recv, gather, send])
-        parameters = ([f] + ofsg + [fromrank, torank, comm, msg])
+        header = []
+        if self._stats is not None:
+            entry = lambda i: FieldFromPointer(i, self._stats)
+            header, gather, recv, send, _, _, _ = _instrument(
+                entry, f, count, torank=torank, gather=gather, recv=recv, send=send
+            )
+
+        # The `gather` is unnecessary if sending to MPI.PROC_NULL
+        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather)
+
+        iet = List(body=header + [recv, gather, send])
+        parameters = ([f] + ofsg + [fromrank, torank, comm, msg] + self._stats_params)
         return Callable('sendrecv_%s' % key, iet, 'void', parameters, ('static',))
 
     def _call_sendrecv(self, name, *args, msg=None, haloid=None):
@@ -572,12 +648,16 @@ class OverlapHaloExchangeBuilder(DiagHaloExchangeBuilder):
         # to collect and scatter the result of an MPI_Irecv
         f, _, ofsg, _, fromrank, torank, comm = args
         msg = Byref(IndexedPointer(msg, haloid))
-        return Call(name, [f] + ofsg + [fromrank, torank, comm, msg])
+        return Call(name, [f] + ofsg + [fromrank, torank, comm, msg] +
+                    self._stats_entry(haloid))
 
     def _make_haloupdate(self, f, hse, key, msg=None):
         iet = super(OverlapHaloExchangeBuilder, self)._make_haloupdate(f, hse, key,
                                                                        msg=msg)
-        iet = iet._rebuild(parameters=iet.parameters + (msg,))
+        # The MPIStats, if any, must remain the last parameter
+        parameters = list(iet.parameters)
+        parameters.insert(len(parameters) - len(self._stats_params), msg)
+        iet = iet._rebuild(parameters=parameters)
         return iet
 
     def _call_haloupdate(self, name, f, hse, msg):
@@ -609,17 +689,26 @@ class OverlapHaloExchangeBuilder(DiagHaloExchangeBuilder):
                  for i in range(len(f._dist_dimensions))]
         scatter = Call('scatter_%s' % key, [bufs] + sizes + [f] + ofss)
 
-        # The `scatter` must be guarded as we must not alter the halo values along
-        # the domain boundary, where the sender is actually MPI.PROC_NULL
-        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter)
-
         rrecv = Byref(FieldFromPointer(msg._C_field_rrecv, msg))
         waitrecv = Call('MPI_Wait', [rrecv, Macro('MPI_STATUS_IGNORE')])
         rsend = Byref(FieldFromPointer(msg._C_field_rsend, msg))
         waitsend = Call('MPI_Wait', [rsend, Macro('MPI_STATUS_IGNORE')])
 
-        iet = List(body=[waitsend, waitrecv, scatter])
-        parameters = ([f] + ofss + [fromrank, msg])
+        header = []
+        if self._stats is not None:
+            entry = lambda i: FieldFromPointer(i, self._stats)
+            count = reduce(mul, sizes, 1)
+            header, _, _, _, waitsend, waitrecv, scatter = _instrument(
+                entry, f, count, fromrank=fromrank, waitsend=waitsend,
+                waitrecv=waitrecv, scatter=scatter
+            )
+
+        # The `scatter` must be guarded as we must not alter the halo values along
+        # the domain boundary, where the sender is actually MPI.PROC_NULL
+        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter)
+
+        iet = List(body=header + [waitsend, waitrecv, scatter])
+        parameters = ([f] + ofss + [fromrank, msg] + self._stats_params)
         return Callable('wait_%s' % key, iet, 'void', parameters, ('static',))
 
     def _make_halowait(self, f, hse, key, msg=None):
@@ -641,10 +730,11 @@ class OverlapHaloExchangeBuilder(DiagHaloExchangeBuilder):
 
             msgi = Byref(IndexedPointer(msg, len(body)))
 
-            body.append(Call(wait.name, [f] + ofss + [fromrank, msgi]))
+            body.append(Call(wait.name, [f] + ofss + [fromrank, msgi] +
+                             self._stats_entry(len(body))))
 
         iet = List(body=body)
-        parameters = [f] + list(fixed.values()) + [nb, msg]
+        parameters = [f] + list(fixed.values()) + [nb, msg] + self._stats_params
         return Callable('halowait%d' % key, iet, 'void', parameters, ('static',))
 
     def _call_halowait(self, name, f, hse, msg):
@@ -720,9 +810,7 @@ class Overlap2HaloExchangeBuilder(OverlapHaloExchangeBuilder):
                 for i in range(len(f._dist_dimensions))]
         ofsg = [fixed.get(d) or ofsg.pop(0) for d in f.dimensions]
 
-        # The `gather` is unnecessary if sending to MPI.PROC_NULL
         gather = Call('gather_%s' % key, [bufg] + sizes + [f] + ofsg)
-        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather)
 
         # Make Irecv/Isend
         count = reduce(mul, sizes, 1)
@@ -733,10 +821,21 @@ class Overlap2HaloExchangeBuilder(OverlapHaloExchangeBuilder):
         send = Call('MPI_Isend', [bufg, count, Macro(dtype_to_mpitype(f.dtype)),
                                   torank, Integer(13), comm, rsend])
 
+        header = []
+        if self._stats is not None:
+            entry = lambda i: FieldFromComposite(i, IndexedPointer(self._stats, dim))
+            header, gather, recv, send, _, _, _ = _instrument(
+                entry, f, count, torank=torank, gather=gather, recv=recv, send=send
+            )
+
+        # The `gather` is unnecessary if sending to MPI.PROC_NULL
+        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather)
+
         # The -1 below is because an Iteration, by default, generates <=
         ncomms = Symbol(name='ncomms')
-        iet = Iteration([recv, gather, send], dim, ncomms - 1)
-        parameters = ([f, comm, msg, ncomms]) + list(fixed.values())
+        iet = Iteration(header + [recv, gather, send], dim, ncomms - 1)
+        parameters = ([f, comm, msg, ncomms] + list(fixed.values()) +
+                      self._stats_params)
         return Callable('haloupdate%d' % key, iet, 'void', parameters, ('static',))
 
     def _call_haloupdate(self, name, f, hse, msg):
@@ -766,20 +865,30 @@ class Overlap2HaloExchangeBuilder(OverlapHaloExchangeBuilder):
                 for i in range(len(f._dist_dimensions))]
         ofss = [fixed.get(d) or ofss.pop(0) for d in f.dimensions]
 
-        # The `scatter` must be guarded as we must not alter the halo values along
-        # the domain boundary, where the sender is actually MPI.PROC_NULL
         scatter = Call('scatter_%s' % key, [bufs] + sizes + [f] + ofss)
-        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter)
 
         rrecv = Byref(FieldFromComposite(msg._C_field_rrecv, msgi))
         waitrecv = Call('MPI_Wait', [rrecv, Macro('MPI_STATUS_IGNORE')])
         rsend = Byref(FieldFromComposite(msg._C_field_rsend, msgi))
         waitsend = Call('MPI_Wait', [rsend, Macro('MPI_STATUS_IGNORE')])
 
+        header = []
+        if self._stats is not None:
+            entry = lambda i: FieldFromComposite(i, IndexedPointer(self._stats, dim))
+            count = reduce(mul, sizes, 1)
+            header, _, _, _, waitsend, waitrecv, scatter = _instrument(
+                entry, f, count, fromrank=fromrank, waitsend=waitsend,
+                waitrecv=waitrecv, scatter=scatter
+            )
+
+        # The `scatter` must be guarded as we must not alter the halo values along
+        # the domain boundary, where the sender is actually MPI.PROC_NULL
+        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter)
+
         # The -1 below is because an Iteration, by default, generates <=
         ncomms = Symbol(name='ncomms')
-        iet = Iteration([waitsend, waitrecv, scatter], dim, ncomms - 1)
-        parameters = ([f] + list(fixed.values()) + [msg, ncomms])
+        iet = Iteration(header + [waitsend, waitrecv, scatter], dim, ncomms - 1)
+        parameters = ([f] + list(fixed.values()) + [msg, ncomms] + self._stats_params)
         return Callable('halowait%d' % key, iet, 'void', parameters, ('static',))
 
     def _call_halowait(self, name, f, hse, msg):
@@ -860,6 +969,565 @@ class FullHaloExchangeBuilder(Overlap2HaloExchangeBuilder):
         return Prodder(poke.name, poke.parameters, single_thread=True, periodic=True)
 
 
+class PersistentHaloExchangeBuilder(Overlap2HaloExchangeBuilder):
+
+    """
+    A Overlap2HaloExchangeBuilder making use of persistent MPI requests. The
+    requests are created once per Operator run, bound to buffers which are
+    reused across all halo exchanges, and then simply started (MPI_Startall)
+    and completed (MPI_Waitall) at each halo exchange. This saves the cost of
+    posting fresh MPI_Isend/MPI_Irecv at each timestep.
+    """
+
+    def _make_msg(self, f, hse, key):
+        # Only retain the halos required by the Diag scheme
+        halos = sorted(i for i in hse.halos if isinstance(i.dim, tuple))
+        return MPIMsgPersistent('msg%d' % key, f, halos)
+
+    def _make_haloupdate(self, f, hse, key, msg=None):
+        fixed = {d: Symbol(name="o%s" % d.root) for d in hse.loc_indices}
+
+        dim = Dimension(name='i')
+
+        msgi = IndexedPointer(msg, dim)
+
+        bufg = FieldFromComposite(msg._C_field_bufg, msgi)
+
+        torank = FieldFromComposite(msg._C_field_to, msgi)
+
+        sizes = [FieldFromComposite('%s[%d]' % (msg._C_field_sizes, i), msgi)
+                 for i in range(len(f._dist_dimensions))]
+        ofsg = [FieldFromComposite('%s[%d]' % (msg._C_field_ofsg, i), msgi)
+                for i in range(len(f._dist_dimensions))]
+        ofsg = [fixed.get(d) or ofsg.pop(0) for d in f.dimensions]
+
+        gather = Call('gather_%s' % key, [bufg] + sizes + [f] + ofsg)
+
+        # All sends and receives are started at once, as they're all bound to
+        # the (persistent) requests in `msg`
+        ncomms = Symbol(name='ncomms')
+        reqs = FieldFromPointer(msg._C_field_reqs, msg)
+        start = Call('MPI_Startall', [2*ncomms, reqs])
+
+        header = []
+        if self._stats is not None:
+            entry = lambda i: FieldFromComposite(i, IndexedPointer(self._stats, dim))
+            count = reduce(mul, sizes, 1)
+            header, gather, _, _, _, _, _ = _instrument(entry, f, count, torank=torank,
+                                                        gather=gather)
+            start = _timed_shared(entry, MPIStats._C_field_tpost, start, ncomms, 'start')
+
+        # The `gather` is unnecessary if sending to MPI.PROC_NULL
+        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather)
+
+        # The -1 below is because an Iteration, by default, generates <=
+        iet = List(body=[Iteration(header + [gather], dim, ncomms - 1), start])
+        parameters = ([f, msg, ncomms] + list(fixed.values()) + self._stats_params)
+        return Callable('haloupdate%d' % key, iet, 'void', parameters, ('static',))
+
+    def _call_haloupdate(self, name, f, hse, msg):
+        return Call(name, [f, msg, msg.npeers] + list(hse.loc_indices.values()))
+
+    def _make_halowait(self, f, hse, key, msg=None):
+        fixed = {d: Symbol(name="o%s" % d.root) for d in hse.loc_indices}
+
+        dim = Dimension(name='i')
+
+        msgi = IndexedPointer(msg, dim)
+
+        bufs = FieldFromComposite(msg._C_field_bufs, msgi)
+
+        fromrank = FieldFromComposite(msg._C_field_from, msgi)
+
+        sizes = [FieldFromComposite('%s[%d]' % (msg._C_field_sizes, i), msgi)
+                 for i in range(len(f._dist_dimensions))]
+        ofss = [FieldFromComposite('%s[%d]' % (msg._C_field_ofss, i), msgi)
+                for i in range(len(f._dist_dimensions))]
+        ofss = [fixed.get(d) or ofss.pop(0) for d in f.dimensions]
+
+        scatter = Call('scatter_%s' % key, [bufs] + sizes + [f] + ofss)
+
+        ncomms = Symbol(name='ncomms')
+        reqs = FieldFromPointer(msg._C_field_reqs, msg)
+        wait = Call('MPI_Waitall', [2*ncomms, reqs, Macro('MPI_STATUSES_IGNORE')])
+
+        header = []
+        if self._stats is not None:
+            entry = lambda i: FieldFromComposite(i, IndexedPointer(self._stats, dim))
+            count = reduce(mul, sizes, 1)
+            header, _, _, _, _, _, scatter = _instrument(entry, f, count,
+                                                         fromrank=fromrank,
+                                                         scatter=scatter)
+            wait = _timed_shared(entry, MPIStats._C_field_twait, wait, ncomms, 'wait')
+
+        # The `scatter` must be guarded as we must not alter the halo values along
+        # the domain boundary, where the sender is actually MPI.PROC_NULL
+        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter)
+
+        # The -1 below is because an Iteration, by default, generates <=
+        iet = List(body=[wait, Iteration(header + [scatter], dim, ncomms - 1)])
+        parameters = ([f] + list(fixed.values()) + [msg, ncomms] + self._stats_params)
+        return Callable('halowait%d' % key, iet, 'void', parameters, ('static',))
+
+
+class NeighborhoodHaloExchangeBuilder(DiagHaloExchangeBuilder):
+
+    """
+    A DiagHaloExchangeBuilder performing all of the halo exchanges required at a
+    HaloSpot, for all Functions, through a single neighborhood collective,
+    MPI_Neighbor_alltoallw, over a distributed graph communicator connecting
+    each rank to its face and diagonal neighbours. The halos are described by
+    MPI derived datatypes, so no gather/scatter copies are performed.
+    """
+
+    def make(self, hs):
+        # Nothing to exchange, e.g. all halos were hoisted or dropped
+        if not hs.fmapper:
+            return hs.body
+
+        # Sanity check
+        assert all(f.is_Function and f.grid is not None for f in hs.fmapper)
+
+        fmapper = tuple(hs.fmapper.items())
+        if fmapper not in self._cache_halo:
+            key = self._gen_msgkey()
+            msg = self._msgs.setdefault(fmapper, self._make_nbmsg(fmapper, key))
+
+            # Reserve one MPIStats entry per (Function, potential peer)
+            if self._stats is not None:
+                offsets = [self._stats.add(f, self._npeers(hse)) for f, hse in fmapper]
+                self._stats_offsets[fmapper] = offsets[0]
+
+            exchange = self._make_exchange(fmapper, key, msg)
+            self._cache_halo[fmapper] = exchange
+            self._efuncs.append(exchange)
+
+        call = self._call_exchange(self._cache_halo[fmapper], fmapper,
+                                   self._msgs[fmapper])
+
+        return List(body=[call, hs.body])
+
+    def _npeers(self, hse):
+        # All potential face and diagonal neighbours, as the actual ones are only
+        # known at runtime
+        halos = [i for i in hse.halos if isinstance(i.dim, tuple)]
+        return 3**len(halos[0].dim) - 1 if halos else 0
+
+    def _make_nbmsg(self, fmapper, key):
+        # Only retain the halos required by the Diag scheme
+        halos = [sorted(i for i in hse.halos if isinstance(i.dim, tuple))
+                 for _, hse in fmapper]
+        return MPIMsgNeighborhood('nbmsg%d' % key, [f for f, _ in fmapper], halos)
+
+    def _make_exchange(self, fmapper, key, msg):
+        nfuncs = len(fmapper)
+
+        # The base address of each Function's halo exchange. Only the DataRegions
+        # along the distributed Dimensions are described by the MPI datatypes, so
+        # the fixed (e.g., time) indices are accounted for here
+        body = []
+        fixed = []
+        for j, (f, hse) in enumerate(fmapper):
+            mapper = OrderedDict((d, Symbol(name='o%s%d' % (d.root, j)))
+                                 for d in hse.loc_indices)
+            offset = 0
+            for d, v in mapper.items():
+                sizes = [f._C_get_field(FULL, i).size
+                         for i in f.dimensions[f.dimensions.index(d) + 1:]]
+                offset += v*reduce(mul, sizes, 1)
+            addr = '(MPI_Aint)(%s)' % ccode(FieldFromPointer(f._C_field_data, f._C_name))
+            if offset != 0:
+                addr += ' + sizeof(%s)*(%s)' % (dtype_to_cstr(f.dtype), ccode(offset))
+            target = IndexedPointer(FieldFromPointer(msg._C_field_addrs, msg), j)
+            body.append(Element(c.Statement('%s = %s' % (ccode(target), addr))))
+            fixed.extend(mapper.values())
+
+        dim = Dimension(name='i')
+        npeers = FieldFromPointer(msg._C_field_npeers, msg)
+        field = lambda i, idx: IndexedPointer(FieldFromPointer(i, msg), idx)
+
+        # At each peer, a struct datatype combines the DataRegions of all Functions
+        create = []
+        free = []
+        for fblens, ftypes, types in [(msg._C_field_sblens, msg._C_field_sftypes,
+                                       msg._C_field_stypes),
+                                      (msg._C_field_rblens, msg._C_field_rftypes,
+                                       msg._C_field_rtypes)]:
+            create.append(Call('MPI_Type_create_struct', [
+                nfuncs, Byref(field(fblens, nfuncs*dim)),
+                FieldFromPointer(msg._C_field_addrs, msg),
+                Byref(field(ftypes, nfuncs*dim)), Byref(field(types, dim))
+            ]))
+            create.append(Call('MPI_Type_commit', [Byref(field(types, dim))]))
+            free.append(Call('MPI_Type_free', [Byref(field(types, dim))]))
+
+        counts = FieldFromPointer(msg._C_field_counts, msg)
+        displs = FieldFromPointer(msg._C_field_displs, msg)
+        exchange = Call('MPI_Neighbor_alltoallw', [
+            Macro('MPI_BOTTOM'), counts, displs,
+            FieldFromPointer(msg._C_field_stypes, msg),
+            Macro('MPI_BOTTOM'), counts, displs,
+            FieldFromPointer(msg._C_field_rtypes, msg),
+            FieldFromPointer(msg._C_field_comm, msg)
+        ])
+
+        stats = []
+        if self._stats is not None:
+            exchange, stats = self._instrument_exchange(fmapper, msg, exchange, dim)
+
+        # The -1 below is because an Iteration, by default, generates <=
+        body.extend([Iteration(create, dim, npeers - 1), exchange,
+                     Iteration(free + stats, dim, npeers - 1)])
+
+        parameters = ([f for f, _ in fmapper] + fixed + [msg] + self._stats_params)
+        return Callable('nbexchange%d' % key, List(body=body), 'void', parameters,
+                        ('static',))
+
+    def _instrument_exchange(self, fmapper, msg, exchange, dim):
+        # There's no gather/scatter, and the exchange is a blocking collective,
+        # so its time is accounted as wait time, evenly split across the entries
+        npeers = ccode(FieldFromPointer(msg._C_field_npeers, msg))
+        exchange = List(header=c.Statement('double tic_exchange = MPI_Wtime()'),
+                        body=exchange,
+                        footer=c.Statement('double toc_exchange = '
+                                           '(MPI_Wtime() - tic_exchange)/(%d*%s)' %
+                                           (len(fmapper), npeers)))
+
+        stats = []
+        for j, (f, hse) in enumerate(fmapper):
+            entry = lambda i: ccode(FieldFromComposite(i, IndexedPointer(
+                self._stats, j*self._npeers(hse) + dim)))
+            field = lambda i: ccode(IndexedPointer(FieldFromPointer(i, msg),
+                                                   len(fmapper)*dim + j))
+            rank = ccode(IndexedPointer(FieldFromPointer(msg._C_field_ranks, msg), dim))
+            stats.extend([
+                c.Statement('%s = %s' % (entry(MPIStats._C_field_to), rank)),
+                c.Statement('%s = %s' % (entry(MPIStats._C_field_from), rank)),
+                c.Statement('%s += %s' % (entry(MPIStats._C_field_sent),
+                                          field(msg._C_field_ssizes))),
+                c.Statement('%s += %s' % (entry(MPIStats._C_field_recv),
+                                          field(msg._C_field_rsizes))),
+                c.Statement('%s += toc_exchange' % entry(MPIStats._C_field_twait))
+            ])
+
+        return exchange, [Element(i) for i in stats]
+
+    def _call_exchange(self, exchange, fmapper, msg):
+        args = [f for f, _ in fmapper]
+        for _, hse in fmapper:
+            args.extend(hse.loc_indices.values())
+        args.append(msg)
+        if self._stats is not None:
+            args.extend(self._stats_entry(self._stats_offsets[fmapper]))
+        return Call(exchange.name, args)
+
+
+class AggregatedHaloExchangeBuilder(Overlap2HaloExchangeBuilder):
+
+    """
+    A Overlap2HaloExchangeBuilder sending one message per peer per HaloSpot,
+    rather than one per (Function, peer). The halos of all Functions going to
+    the same peer are packed into a single contiguous buffer, which is then
+    shipped through a single MPI_Isend. This reduces the latency-bound overhead
+    of HaloSpots involving many Functions (e.g., elastic and viscoelastic
+    models) by a factor equal to the number of Functions.
+    """
+
+    def make(self, hs):
+        # Nothing to exchange, e.g. all halos were hoisted or dropped
+        if not hs.fmapper:
+            return hs.body
+
+        # Sanity check
+        assert all(f.is_Function and f.grid is not None for f in hs.fmapper)
+
+        fmapper = tuple(hs.fmapper.items())
+        if fmapper not in self._msgs:
+            key = self._gen_msgkey()
+            msg = self._msgs.setdefault(fmapper, self._make_aggmsg(fmapper, key))
+
+            # Reserve one MPIStats entry per (Function, peer)
+            if self._stats is not None:
+                offsets = [self._stats.add(f, msg.npeers) for f, _ in fmapper]
+                self._stats_offsets[fmapper] = offsets[0]
+        msg = self._msgs[fmapper]
+
+        # Callables for send/recv/wait, shared by all HaloSpots with the same
+        # Functions signature
+        signature = tuple((f.dimensions, f.dtype, hse) for f, hse in fmapper)
+        if signature not in self._cache_halo:
+            key = self._gen_commkey()
+            haloupdate = self._make_haloupdate(fmapper, key, msg=msg)
+            halowait = self._make_halowait(fmapper, key, msg=msg)
+            self._cache_halo[signature] = (haloupdate, halowait)
+            self._efuncs.extend([haloupdate, halowait])
+            self._objs.add(fmapper[0][0].grid.distributor._obj_comm)
+        haloupdate, halowait = self._cache_halo[signature]
+
+        # Callable for compute over the CORE region
+        key = self._gen_compkey()
+        compute = self._make_compute(hs, key)
+        if compute is not None:
+            self._efuncs.append(compute)
+
+        # Callable for compute over the OWNED region
+        region = self._make_region(hs, key)
+        region = self._regions.setdefault(hs, region)
+        callcompute = self._call_compute(hs, compute)
+        remainder = self._make_remainder(hs, key, callcompute, region)
+        self._efuncs.append(remainder)
+
+        # Now build up the HaloSpot body, with explicit Calls to the constructed
+        # Callables
+        body = [self._call_haloupdate(haloupdate.name, fmapper, msg),
+                callcompute,
+                self._call_halowait(halowait.name, fmapper, msg),
+                self._call_remainder(remainder)]
+
+        return List(body=body)
+
+    def _make_aggmsg(self, fmapper, key):
+        # Only retain the halos required by the Diag scheme
+        halos = [sorted(i for i in hse.halos if isinstance(i.dim, tuple))
+                 for _, hse in fmapper]
+        return MPIMsgAggregated('msg%d' % key, [f for f, _ in fmapper], halos)
+
+    def _make_copies(self, f, hse, j):
+        """
+        Return a dummy Function standing for ``f`` in the aggregated Callables,
+        as well as the (cached) Callables gathering and scattering its halos.
+        """
+        df = f.__class__.__base__(name='a%d' % j, grid=f.grid, shape=f.shape_global,
+                                  dimensions=f.dimensions, dtype=f.dtype)
+
+        if (f.dimensions, f.dtype) not in self._cache_dims:
+            key = self._gen_commkey()
+            gather = self._make_copy(df, hse, key)
+            scatter = self._make_copy(df, hse, key, swap=True)
+            self._cache_dims[(f.dimensions, f.dtype)] = [gather, scatter]
+            self._efuncs.extend([gather, scatter])
+        gather, scatter = self._cache_dims[(f.dimensions, f.dtype)]
+
+        return df, gather, scatter
+
+    def _make_packing(self, fmapper, msg, dim, swap=False):
+        """
+        Construct, for each Function in ``fmapper``, the Call packing its halo
+        into (or, if ``swap=True``, unpacking it from) the ``dim``-th message.
+        """
+        msgi = IndexedPointer(msg, dim)
+        ncomms = Symbol(name='ncomms')
+
+        if swap is False:
+            buf, ofs, peer = (msg._C_field_bufgs, msg._C_field_ofsg,
+                              FieldFromComposite(msg._C_field_to, msgi))
+        else:
+            buf, ofs, peer = (msg._C_field_bufss, msg._C_field_ofss,
+                              FieldFromComposite(msg._C_field_from, msgi))
+
+        functions = []
+        fixed = []
+        header = []
+        copies = []
+        for j, (f, hse) in enumerate(fmapper):
+            df, gather, scatter = self._make_copies(f, hse, j)
+            mapper = OrderedDict((d, Symbol(name='o%s%d' % (d.root, j)))
+                                 for d in hse.loc_indices)
+
+            field = lambda i, k: FieldFromComposite('%s[%d]' % (i, k), msgi)
+            ndist = len(f._dist_dimensions)
+            sizes = [field(msg._C_field_sizes, j*msg.ndist + k) for k in range(ndist)]
+            ofsx = [field(ofs, j*msg.ndist + k) for k in range(ndist)]
+            ofsx = [mapper.get(d) or ofsx.pop(0) for d in f.dimensions]
+
+            name = scatter.name if swap else gather.name
+            copy = Call(name, [field(buf, j)] + sizes + [df] + ofsx)
+
+            if self._stats is not None:
+                entry = self._stats_entry_aggregated(j, ncomms, dim)
+                count = reduce(mul, sizes, 1)
+                if swap is False:
+                    h, copy, _, _, _, _, _ = _instrument(entry, df, count,
+                                                         torank=peer, gather=copy)
+                else:
+                    h, _, _, _, _, _, copy = _instrument(entry, df, count,
+                                                         fromrank=peer, scatter=copy)
+                header.extend(h)
+
+            # The copies are unnecessary if the peer is MPI.PROC_NULL; on the
+            # scatter side, they must even be avoided, as we must not alter the
+            # halo values along the domain boundary
+            copies.append(Conditional(CondNe(peer, Macro('MPI_PROC_NULL')), copy))
+
+            functions.append(df)
+            fixed.extend(mapper.values())
+
+        return functions, fixed, header, copies
+
+    def _stats_entry_aggregated(self, j, ncomms, dim):
+        """
+        Map an MPIStats field name to the symbolic C field of the entry of the
+        ``j``-th Function and ``dim``-th peer.
+        """
+        return lambda i: FieldFromComposite(i, IndexedPointer(self._stats,
+                                                              j*ncomms + dim))
+
+    def _make_haloupdate(self, fmapper, key, msg=None):
+        comm = fmapper[0][0].grid.distributor._obj_comm
+
+        dim = Dimension(name='i')
+        ncomms = Symbol(name='ncomms')
+
+        msgi = IndexedPointer(msg, dim)
+
+        bufg = FieldFromComposite(msg._C_field_bufg, msgi)
+        bufs = FieldFromComposite(msg._C_field_bufs, msgi)
+        count = FieldFromComposite(msg._C_field_count, msgi)
+
+        fromrank = FieldFromComposite(msg._C_field_from, msgi)
+        torank = FieldFromComposite(msg._C_field_to, msgi)
+
+        functions, fixed, header, gathers = self._make_packing(fmapper, msg, dim)
+
+        # Make Irecv/Isend -- a single message per peer, for all Functions
+        rrecv = Byref(FieldFromComposite(msg._C_field_rrecv, msgi))
+        rsend = Byref(FieldFromComposite(msg._C_field_rsend, msgi))
+        recv = Call('MPI_Irecv', [bufs, count, Macro('MPI_BYTE'), fromrank,
+                                  Integer(13), comm, rrecv])
+        send = Call('MPI_Isend', [bufg, count, Macro('MPI_BYTE'), torank,
+                                  Integer(13), comm, rsend])
+
+        if self._stats is not None:
+            entries = [self._stats_entry_aggregated(j, ncomms, dim)
+                       for j in range(len(fmapper))]
+            recv = _timed_split(entries, MPIStats._C_field_tpost, recv, 'recv')
+            send = _timed_split(entries, MPIStats._C_field_tpost, send, 'send')
+
+        # The -1 below is because an Iteration, by default, generates <=
+        iet = Iteration(header + [recv] + gathers + [send], dim, ncomms - 1)
+        parameters = functions + [comm, msg, ncomms] + fixed + self._stats_params
+        return Callable('haloupdate%d' % key, iet, 'void', parameters, ('static',))
+
+    def _call_haloupdate(self, name, fmapper, msg):
+        comm = fmapper[0][0].grid.distributor._obj_comm
+        args = [f for f, _ in fmapper] + [comm, msg, msg.npeers]
+        for _, hse in fmapper:
+            args.extend(hse.loc_indices.values())
+        if self._stats is not None:
+            args.extend(self._stats_entry(self._stats_offsets[fmapper]))
+        return Call(name, args)
+
+    def _make_halowait(self, fmapper, key, msg=None):
+        dim = Dimension(name='i')
+        ncomms = Symbol(name='ncomms')
+
+        msgi = IndexedPointer(msg, dim)
+
+        functions, fixed, header, scatters = self._make_packing(fmapper, msg, dim,
+                                                                swap=True)
+
+        rrecv = Byref(FieldFromComposite(msg._C_field_rrecv, msgi))
+        waitrecv = Call('MPI_Wait', [rrecv, Macro('MPI_STATUS_IGNORE')])
+        rsend = Byref(FieldFromComposite(msg._C_field_rsend, msgi))
+        waitsend = Call('MPI_Wait', [rsend, Macro('MPI_STATUS_IGNORE')])
+
+        if self._stats is not None:
+            entries = [self._stats_entry_aggregated(j, ncomms, dim)
+                       for j in range(len(fmapper))]
+            waitsend = _timed_split(entries, MPIStats._C_field_twait, waitsend,
+                                    'waitsend')
+            waitrecv = _timed_split(entries, MPIStats._C_field_twait, waitrecv,
+                                    'waitrecv')
+
+        # The -1 below is because an Iteration, by default, generates <=
+        iet = Iteration(header + [waitsend, waitrecv] + scatters, dim, ncomms - 1)
+        parameters = functions + fixed + [msg, ncomms] + self._stats_params
+        return Callable('halowait%d' % key, iet, 'void', parameters, ('static',))
+
+    def _call_halowait(self, name, fmapper, msg):
+        args = [f for f, _ in fmapper]
+        for _, hse in fmapper:
+            args.extend(hse.loc_indices.values())
+        args.extend([msg, msg.npeers])
+        if self._stats is not None:
+            args.extend(self._stats_entry(self._stats_offsets[fmapper]))
+        return Call(name, args)
+
+
+def _instrument(entry, f, count, torank=None, fromrank=None, gather=None, recv=None,
+                send=None, waitsend=None, waitrecv=None, scatter=None):
+    """
+    Instrument the steps of a halo exchange so that bytes and time, the latter
+    as measured by MPI_Wtime, are accumulated into an MPIStats entry. ``entry``
+    maps an MPIStats field name to the symbolic C field of the entry. The steps
+    not provided are returned as None.
+    """
+    def update(field, value, op='+='):
+        return Element(c.Statement('%s %s %s' % (ccode(entry(field)), op, ccode(value))))
+
+    def timed(node, field, name):
+        if node is None:
+            return None
+        tic = 'tic_%s' % name
+        return List(header=c.Statement('double %s = MPI_Wtime()' % tic), body=node,
+                    footer=c.Statement('%s += MPI_Wtime() - %s' %
+                                       (ccode(entry(field)), tic)))
+
+    nbytes = count*Macro('sizeof(%s)' % dtype_to_cstr(f.dtype))
+
+    header = []
+    if torank is not None:
+        header.append(update(MPIStats._C_field_to, torank, '='))
+    if fromrank is not None:
+        header.append(update(MPIStats._C_field_from, fromrank, '='))
+    if gather is not None:
+        gather = List(body=[timed(gather, MPIStats._C_field_tgather, 'gather'),
+                            update(MPIStats._C_field_sent, nbytes)])
+    if scatter is not None:
+        scatter = List(body=[timed(scatter, MPIStats._C_field_tscatter, 'scatter'),
+                             update(MPIStats._C_field_recv, nbytes)])
+
+    return (header, gather,
+            timed(recv, MPIStats._C_field_tpost, 'recv'),
+            timed(send, MPIStats._C_field_tpost, 'send'),
+            timed(waitsend, MPIStats._C_field_twait, 'waitsend'),
+            timed(waitrecv, MPIStats._C_field_twait, 'waitrecv'),
+            scatter)
+
+
+def _timed_shared(entry, field, node, npeers, name):
+    """
+    Wrap ``node``, a step shared by ``npeers`` peers (e.g., an MPI_Startall),
+    such that its execution time is split evenly across the MPIStats entries of
+    the peers. ``entry`` maps an MPIStats field name to the symbolic C field of
+    the entry indexed by ``i``.
+    """
+    tic = 'tic_%s' % name
+    toc = 'toc_%s' % name
+    footer = [c.Statement('double %s = MPI_Wtime() - %s' % (toc, tic)),
+              c.For('int i = 0', 'i < %s' % ccode(npeers), 'i++',
+                    c.Statement('%s += %s/%s' % (ccode(entry(field)), toc,
+                                                 ccode(npeers))))]
+    return List(header=c.Statement('double %s = MPI_Wtime()' % tic), body=node,
+                footer=footer)
+
+
+def _timed_split(entries, field, node, name):
+    """
+    Wrap ``node``, a step shared by several MPIStats entries (e.g., the MPI_Isend
+    of a message aggregating the halos of several Functions), such that its
+    execution time is split evenly across them. ``entries`` is a list of maps
+    from an MPIStats field name to the symbolic C field of an entry.
+    """
+    tic = 'tic_%s' % name
+    toc = 'toc_%s' % name
+    footer = [c.Statement('double %s = MPI_Wtime() - %s' % (toc, tic))]
+    footer.extend(c.Statement('%s += %s/%d' % (ccode(i(field)), toc, len(entries)))
+                  for i in entries)
+    return List(header=c.Statement('double %s = MPI_Wtime()' % tic), body=node,
+                footer=footer)
+
+
 class MPIStatusObject(LocalObject):
 
     dtype = type('MPI_Status', (c_void_p,), {})
@@ -979,8 +1647,8 @@ class MPIMsgEnriched(MPIMsg):
     _C_field_from = 'fromrank'
     _C_field_to = 'torank'
 
-    def __init__(self, name, function, halos):
-        fields = [
+    def __init__(self, name, function, halos, fields=None):
+        fields = (fields or []) + [
             (MPIMsgEnriched._C_field_ofss, POINTER(c_int)),
             (MPIMsgEnriched._C_field_ofsg, POINTER(c_int)),
             (MPIMsgEnriched._C_field_from, c_int),
@@ -1022,6 +1690,500 @@ class MPIMsgEnriched(MPIMsg):
         return {self.name: self.value}
 
 
+class MPIMsgPersistent(MPIMsgEnriched):
+
+    """
+    A MPIMsgEnriched carrying, for each peer, a pair of persistent MPI requests
+    (receive, send) bound to the peer buffers. All requests are stored
+    contiguously, so that they may be started and completed through a single
+    MPI_Startall and MPI_Waitall. The requests are created before jumping to
+    C-land, that is once per Operator run, and freed upon returning.
+    """
+
+    _C_field_reqs = 'reqs'
+
+    _tag = 13
+
+    def __init__(self, name, function, halos):
+        fields = [(MPIMsgPersistent._C_field_reqs, POINTER(MPIMsg.c_mpirequest_p))]
+        super(MPIMsgPersistent, self).__init__(name, function, halos, fields)
+
+        # The buffers get registered with the network interface, if possible
+        self._allocator = MPIAllocator()
+        self._requests = []
+
+    def _C_memfree(self):
+        # The requests must be freed before the buffers they're bound to
+        if not MPI.Is_finalized():
+            for i in self._requests:
+                i.Free()
+        self._requests[:] = []
+        super(MPIMsgPersistent, self)._C_memfree()
+
+    def _arg_defaults(self, alias=None):
+        super(MPIMsgPersistent, self)._arg_defaults(alias)
+
+        function = alias or self.function
+        comm = function.grid.distributor.comm
+        ctype = dtype_to_ctype(function.dtype)
+        reqs = (MPIMsg.c_mpirequest_p*(2*self.npeers))()
+        for i, halo in enumerate(self.halos):
+            entry = self.value[i]
+            size = reduce(mul, entry.sizes[:len(halo.dim)])
+            bufs = np.ctypeslib.as_array(cast(entry.bufs, POINTER(ctype)), (size,))
+            bufg = np.ctypeslib.as_array(cast(entry.bufg, POINTER(ctype)), (size,))
+            rrecv = comm.Recv_init(bufs, source=entry.fromrank, tag=self._tag)
+            rsend = comm.Send_init(bufg, dest=entry.torank, tag=self._tag)
+            reqs[2*i] = MPI._handleof(rrecv)
+            reqs[2*i + 1] = MPI._handleof(rsend)
+            entry.reqs = cast(byref(reqs, 2*i*sizeof(MPIMsg.c_mpirequest_p)),
+                              POINTER(MPIMsg.c_mpirequest_p))
+            self._requests.extend([rrecv, rsend])
+        # Keep the requests array alive until the next run
+        self._reqs = reqs
+
+        return {self.name: self.value}
+
+
+class MPIMsgNeighborhood(CompositeObject):
+
+    """
+    The data structure driving the halo exchanges of a set of Functions through
+    MPI_Neighbor_alltoallw. For each (peer, Function) pair, it carries an MPI
+    subarray datatype describing the OWNED DataRegion to be sent and another
+    one describing the HALO DataRegion to be received. The datatypes are
+    created before jumping to C-land, that is once per Operator run, and freed
+    upon returning.
+
+    Parameters
+    ----------
+    name : str
+        Name of the symbol.
+    functions : list of Function
+        The Functions whose halos are exchanged.
+    halos : list of list of Halo
+        The (diagonal) halos required by each Function.
+    """
+
+    _C_field_comm = 'comm'
+    _C_field_npeers = 'npeers'
+    _C_field_ranks = 'ranks'
+    _C_field_counts = 'counts'
+    _C_field_displs = 'displs'
+    _C_field_addrs = 'addrs'
+    _C_field_sblens = 'sblens'
+    _C_field_rblens = 'rblens'
+    _C_field_sftypes = 'sftypes'
+    _C_field_rftypes = 'rftypes'
+    _C_field_stypes = 'stypes'
+    _C_field_rtypes = 'rtypes'
+    _C_field_ssizes = 'ssizes'
+    _C_field_rsizes = 'rsizes'
+
+    c_mpiaint = type('MPI_Aint', (c_ssize_t,), {})
+
+    if MPI._sizeof(MPI.Datatype) == sizeof(c_int):
+        c_mpidatatype = type('MPI_Datatype', (c_int,), {})
+    else:
+        c_mpidatatype = type('MPI_Datatype', (c_void_p,), {})
+
+    def __init__(self, name, functions, halos):
+        self._functions = tuple(functions)
+        self._halos = tuple(tuple(i) for i in halos)
+
+        c_mpiaint = MPIMsgNeighborhood.c_mpiaint
+        c_mpidatatype = MPIMsgNeighborhood.c_mpidatatype
+        fields = [
+            (MPIMsgNeighborhood._C_field_comm, MPICommObject.dtype),
+            (MPIMsgNeighborhood._C_field_npeers, c_int),
+            (MPIMsgNeighborhood._C_field_ranks, POINTER(c_int)),
+            (MPIMsgNeighborhood._C_field_counts, POINTER(c_int)),
+            (MPIMsgNeighborhood._C_field_displs, POINTER(c_mpiaint)),
+            (MPIMsgNeighborhood._C_field_addrs, POINTER(c_mpiaint)),
+            (MPIMsgNeighborhood._C_field_sblens, POINTER(c_int)),
+            (MPIMsgNeighborhood._C_field_rblens, POINTER(c_int)),
+            (MPIMsgNeighborhood._C_field_sftypes, POINTER(c_mpidatatype)),
+            (MPIMsgNeighborhood._C_field_rftypes, POINTER(c_mpidatatype)),
+            (MPIMsgNeighborhood._C_field_stypes, POINTER(c_mpidatatype)),
+            (MPIMsgNeighborhood._C_field_rtypes, POINTER(c_mpidatatype)),
+            (MPIMsgNeighborhood._C_field_ssizes, POINTER(c_long)),
+            (MPIMsgNeighborhood._C_field_rsizes, POINTER(c_long))
+        ]
+        super(MPIMsgNeighborhood, self).__init__(name, 'nbmsg', fields)
+
+        # The MPI datatypes to be freed upon returning from C-land
+        self._datatypes = []
+
+    def __del__(self):
+        self._C_memfree()
+
+    def _C_memfree(self):
+        if not MPI.Is_finalized():
+            for i in self._datatypes:
+                i.Free()
+        self._datatypes[:] = []
+
+    @property
+    def functions(self):
+        return self._functions
+
+    @property
+    def halos(self):
+        return self._halos
+
+    @classmethod
+    def _make_datatype(cls, function, dims, sides, region):
+        """
+        An MPI subarray datatype describing the ``region`` (OWNED or HALO) of
+        ``function`` along the ``sides`` of ``dims``, or None if the region is
+        empty.
+        """
+        mapper = dict(zip(dims, sides))
+        subsizes = []
+        starts = []
+        for d in function.dimensions:
+            if d not in mapper:
+                # The fixed indices are accounted for in the base address
+                subsizes.append(1)
+                starts.append(0)
+            elif mapper[d] is CENTER:
+                subsizes.append(function._size_domain[d])
+                starts.append(function._offset_owned[d].left)
+            elif region is OWNED:
+                subsizes.append(getattr(function._size_owned[d], mapper[d].name))
+                starts.append(getattr(function._offset_owned[d], mapper[d].name))
+            else:
+                subsizes.append(getattr(function._size_halo[d], mapper[d].name))
+                starts.append(getattr(function._offset_halo[d], mapper[d].name))
+        if 0 in subsizes:
+            return None
+        sizes = function.shape_allocated
+        basetype = MPI._typedict[np.dtype(function.dtype).char]
+        return basetype.Create_subarray(sizes, subsizes, starts).Commit()
+
+    def _arg_defaults(self, functions=None):
+        functions = functions or self.functions
+        distributor = functions[0].grid.distributor
+
+        # `graph_comm` and the datatypes below have matching peer ordering
+        neighbors = distributor.graph_neighbors
+        npeers = len(neighbors)
+        nfuncs = len(functions)
+        size = npeers*nfuncs
+
+        c_mpiaint = MPIMsgNeighborhood.c_mpiaint
+        c_mpidatatype = MPIMsgNeighborhood.c_mpidatatype
+        value = self.value._obj
+        value.comm = MPICommObject.dtype.from_address(MPI._addressof(
+            distributor.graph_comm))
+        value.npeers = npeers
+        value.ranks = (c_int*npeers)(*[i for _, i in neighbors])
+        value.counts = (c_int*npeers)(*[1]*npeers)
+        value.displs = (c_mpiaint*npeers)()
+        value.addrs = (c_mpiaint*nfuncs)()
+        value.stypes = (c_mpidatatype*npeers)()
+        value.rtypes = (c_mpidatatype*npeers)()
+
+        sblens, rblens = (c_int*size)(), (c_int*size)()
+        sftypes, rftypes = (c_mpidatatype*size)(), (c_mpidatatype*size)()
+        ssizes, rsizes = (c_long*size)(), (c_long*size)()
+        for i, (sides, _) in enumerate(neighbors):
+            for j, (f, halos) in enumerate(zip(functions, self.halos)):
+                k = i*nfuncs + j
+                # Send the OWNED region along `sides`, as long as the peer needs it;
+                # receive the HALO region along `sides`, as long as we need it.
+                # A Function not involved gets an empty block in the struct datatype
+                ftypes = [MPI.BYTE, MPI.BYTE]
+                required = [h.side for h in halos]
+                for n, region in enumerate([OWNED, HALO]):
+                    if (sides if region is OWNED else
+                            tuple(s.flip() for s in sides)) not in required:
+                        continue
+                    datatype = self._make_datatype(f, halos[0].dim, sides, region)
+                    if datatype is not None:
+                        self._datatypes.append(datatype)
+                        ftypes[n] = datatype
+                sftypes[k], rftypes[k] = [MPI._handleof(t) for t in ftypes]
+                sblens[k], rblens[k] = [int(t is not MPI.BYTE) for t in ftypes]
+                ssizes[k], rsizes[k] = [t.Get_size()*int(t is not MPI.BYTE)
+                                        for t in ftypes]
+        value.sblens, value.rblens = sblens, rblens
+        value.sftypes, value.rftypes = sftypes, rftypes
+        value.ssizes, value.rsizes = ssizes, rsizes
+
+        return {self.name: self.value}
+
+    def _arg_values(self, args=None, **kwargs):
+        return self._arg_defaults([kwargs.get(f.name, f) for f in self.functions])
+
+    def _arg_apply(self, *args, **kwargs):
+        self._C_memfree()
+
+    # Pickling support
+    _pickle_args = ['name', 'functions', 'halos']
+
+
+class MPIMsgAggregated(CompositeObject):
+
+    """
+    The data structure driving the halo exchanges of a set of Functions through
+    one message per peer. It is an array of ``struct aggmsg``, one entry per
+    peer, that is per (diagonal) halo required by at least one Function. The
+    send and receive buffers of each entry are contiguous, and are partitioned
+    into (aligned) sub-buffers, one per Function. A Function not exchanging
+    halos with a peer gets an empty sub-buffer, that is all of its sizes are 0.
+
+    Parameters
+    ----------
+    name : str
+        Name of the symbol.
+    functions : list of Function
+        The Functions whose halos are exchanged.
+    halos : list of list of Halo
+        The (diagonal) halos required by each Function.
+    """
+
+    _C_field_bufs = 'bufs'
+    _C_field_bufg = 'bufg'
+    _C_field_bufss = 'bufss'
+    _C_field_bufgs = 'bufgs'
+    _C_field_sizes = 'sizes'
+    _C_field_ofss = 'ofss'
+    _C_field_ofsg = 'ofsg'
+    _C_field_count = 'count'
+    _C_field_from = 'fromrank'
+    _C_field_to = 'torank'
+    _C_field_rrecv = 'rrecv'
+    _C_field_rsend = 'rsend'
+
+    _alignment = 64
+    """The alignment, in bytes, of the per-Function sub-buffers."""
+
+    def __init__(self, name, functions, halos):
+        self._functions = tuple(functions)
+        self._halos = tuple(tuple(i) for i in halos)
+
+        # Note: sorting guarantees that all ranks agree on the message ordering
+        self._peers = tuple(sorted({i for halos in self._halos for i in halos},
+                                   key=lambda i: ([d.name for d in i.dim],
+                                                  [s.val for s in i.side])))
+
+        fields = [
+            (MPIMsgAggregated._C_field_bufs, c_void_p),
+            (MPIMsgAggregated._C_field_bufg, c_void_p),
+            (MPIMsgAggregated._C_field_bufss, POINTER(c_void_p)),
+            (MPIMsgAggregated._C_field_bufgs, POINTER(c_void_p)),
+            (MPIMsgAggregated._C_field_sizes, POINTER(c_int)),
+            (MPIMsgAggregated._C_field_ofss, POINTER(c_int)),
+            (MPIMsgAggregated._C_field_ofsg, POINTER(c_int)),
+            (MPIMsgAggregated._C_field_count, c_int),
+            (MPIMsgAggregated._C_field_from, c_int),
+            (MPIMsgAggregated._C_field_to, c_int),
+            (MPIMsgAggregated._C_field_rrecv, MPIMsg.c_mpirequest_p),
+            (MPIMsgAggregated._C_field_rsend, MPIMsg.c_mpirequest_p)
+        ]
+        super(MPIMsgAggregated, self).__init__(name, 'aggmsg', fields)
+
+        # Required for buffer allocation/deallocation before/after jumping/returning
+        # to/from C-land
+        self._allocator = default_allocator()
+        self._memfree_args = []
+
+    def __del__(self):
+        self._C_memfree()
+
+    def _C_memfree(self):
+        # Deallocate the MPI buffers
+        for i in self._memfree_args:
+            self._allocator.free(*i)
+        self._memfree_args[:] = []
+
+    def __value_setup__(self, dtype, value):
+        return (dtype._type_*self.npeers)()
+
+    @property
+    def functions(self):
+        return self._functions
+
+    @property
+    def halos(self):
+        return self._halos
+
+    @property
+    def peers(self):
+        return self._peers
+
+    @property
+    def npeers(self):
+        return len(self.peers)
+
+    @property
+    def ndist(self):
+        """The stride, per Function, of the `sizes`, `ofsg` and `ofss` fields."""
+        return max([len(i.dim) for i in self.peers] or [0])
+
+    def _arg_defaults(self, functions=None):
+        functions = functions or self.functions
+        neighborhood = functions[0].grid.distributor.neighborhood
+        nfuncs = len(functions)
+        size = nfuncs*self.ndist
+
+        for i, peer in enumerate(self.peers):
+            entry = self.value[i]
+            entry.torank = neighborhood[peer.side]
+            entry.fromrank = neighborhood[tuple(s.flip() for s in peer.side)]
+
+            sizes, ofsg, ofss = (c_int*size)(), (c_int*size)(), (c_int*size)()
+            offsets = []
+            nbytes = 0
+            for j, (f, halos) in enumerate(zip(functions, self.halos)):
+                offsets.append(nbytes)
+                if peer not in halos:
+                    continue
+                for k, (d, side) in enumerate(zip(*peer)):
+                    if side is CENTER:
+                        # Note `_offset_owned`, and not `_offset_halo`, is *not*
+                        # a bug here; see MPIMsgEnriched
+                        sizes[j*self.ndist + k] = f._size_domain[d]
+                        ofsg[j*self.ndist + k] = f._offset_owned[d].left
+                        ofss[j*self.ndist + k] = f._offset_owned[d].left
+                    else:
+                        sizes[j*self.ndist + k] = getattr(f._size_owned[d], side.name)
+                        ofsg[j*self.ndist + k] = getattr(f._offset_owned[d], side.name)
+                        ofss[j*self.ndist + k] = getattr(f._offset_halo[d],
+                                                         side.flip().name)
+                count = reduce(mul, sizes[j*self.ndist:j*self.ndist + len(peer.dim)])
+                nbytes += count*np.dtype(f.dtype).itemsize
+                nbytes = -(-nbytes // self._alignment)*self._alignment
+            entry.sizes, entry.ofsg, entry.ofss = sizes, ofsg, ofss
+            entry.count = nbytes
+
+            # Allocate the send/recv buffers, and carve out the sub-buffers
+            bufg, bufg_memfree_args = self._allocator._alloc_C_libcall(nbytes, c_char)
+            bufs, bufs_memfree_args = self._allocator._alloc_C_libcall(nbytes, c_char)
+            entry.bufg, entry.bufs = bufg, bufs
+            entry.bufgs = (c_void_p*nfuncs)(*[bufg.value + o for o in offsets])
+            entry.bufss = (c_void_p*nfuncs)(*[bufs.value + o for o in offsets])
+            # The `memfree_args` will be used to deallocate the buffer upon returning
+            # from C-land
+            self._memfree_args.extend([bufg_memfree_args, bufs_memfree_args])
+
+        return {self.name: self.value}
+
+    def _arg_values(self, args=None, **kwargs):
+        return self._arg_defaults([kwargs.get(f.name, f) for f in self.functions])
+
+    def _arg_apply(self, *args, **kwargs):
+        self._C_memfree()
+
+    # Pickling support
+    _pickle_args = ['name', 'functions', 'halos']
+
+
+class MPIAllocator(MemoryAllocator):
+
+    """
+    Memory allocator based on MPI_Alloc_mem. With most MPI implementations, the
+    returned memory is registered with (i.e., pinned for) the network interface,
+    which saves a copy or a registration at each message transfer.
+    """
+
+    @classmethod
+    def initialize(cls):
+        cls.lib = MPI
+
+    def _alloc_C_libcall(self, size, ctype):
+        # Over-allocate to honour `guaranteed_alignment`
+        mem = MPI.Alloc_mem(size*sizeof(ctype) + self.guaranteed_alignment)
+        address = mem.address
+        address += -address % self.guaranteed_alignment
+        return c_void_p(address), (mem,)
+
+    def free(self, mem):
+        if not MPI.Is_finalized():
+            MPI.Free_mem(mem)
+
+
+class MPIStats(CompositeObject):
+
+    """
+    Halo exchange statistics gathered at run-time, as an array of ``struct
+    mpistats``, one entry per (Function, peer) pair. Each entry tracks the peer
+    ranks, the bytes sent and received, and the time spent in the gather and
+    scatter copies, in posting the MPI_Isend/MPI_Irecv and in the MPI_Waits.
+
+    Parameters
+    ----------
+    name : str
+        Name of the symbol.
+    functions : list of str, optional
+        The name of the Function each entry is about.
+    """
+
+    _C_field_to = 'torank'
+    _C_field_from = 'fromrank'
+    _C_field_sent = 'sent'
+    _C_field_recv = 'recv'
+    _C_field_tgather = 'tgather'
+    _C_field_tpost = 'tpost'
+    _C_field_twait = 'twait'
+    _C_field_tscatter = 'tscatter'
+
+    def __init__(self, name, functions=None):
+        self._functions = list(functions or [])
+        fields = [
+            (MPIStats._C_field_to, c_int),
+            (MPIStats._C_field_from, c_int),
+            (MPIStats._C_field_sent, c_long),
+            (MPIStats._C_field_recv, c_long),
+            (MPIStats._C_field_tgather, c_double),
+            (MPIStats._C_field_tpost, c_double),
+            (MPIStats._C_field_twait, c_double),
+            (MPIStats._C_field_tscatter, c_double)
+        ]
+        super(MPIStats, self).__init__(name, 'mpistats', fields)
+
+    def __value_setup__(self, dtype, value):
+        # The entries are only known once all halo exchanges have been built
+        return None
+
+    @property
+    def functions(self):
+        return self._functions
+
+    @property
+    def nentries(self):
+        return len(self.functions)
+
+    def add(self, function, npeers):
+        """
+        Reserve ``npeers`` entries for the halo exchanges of ``function``.
+        Return the index of the first reserved entry.
+        """
+        offset = self.nentries
+        self._functions.extend([function.name]*npeers)
+        return offset
+
+    def _arg_defaults(self):
+        # A fresh, zero-initialized array of `struct mpistats` for each run
+        return {self.name: (self.dtype._type_*self.nentries)()}
+
+    def _arg_values(self, args=None, **kwargs):
+        return self._arg_defaults()
+
+    def extract(self, value):
+        """
+        Turn ``value``, the run-time array of ``struct mpistats``, into a list of
+        tuples ``(function, torank, fromrank, sent, recv, tgather, tpost, twait,
+        tscatter)``.
+        """
+        return [(f,) + tuple(getattr(i, j) for j, _ in self.pfields)
+                for f, i in zip(self.functions, value)]
+
+    # Pickling support
+    _pickle_args = ['name', 'functions']
+
+
 class MPIRegion(CompositeObject):
 
     def __init__(self, name, arguments, owned):
@@ -1,2 +1,3 @@
-from .operator import Operator  # noqa
+from .operator import Operator, compile_all  # noqa
 from .profiling import profiler_registry  # noqa
+from .roofline import *  # noqa
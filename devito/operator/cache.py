@@ -0,0 +1,221 @@
+from pickle import PicklingError, UnpicklingError
+from uuid import uuid4
+import os
+
+import cloudpickle as pickle
+import numpy as np
+
+from devito.logger import debug, warning
+from devito.parameters import configuration
+from devito.symbolics import retrieve_functions
+from devito.tools import Signer, filter_ordered, flatten, make_tempdir
+
+__all__ = ['BuildCache', 'build_cache']
+
+
+class BuildCache(object):
+
+    """
+    A persistent, on-disk cache of built Operators.
+
+    Building an Operator -- that is lowering the input expressions through
+    clusterization, scheduling and IET construction -- is often much more
+    expensive than fetching the corresponding shared object from the jit-cache.
+    The BuildCache stores the lowered Operators on disk, keyed on a digest of
+    the user-provided expressions, the metadata of the objects they carry, the
+    Operator keyword arguments and the jit-relevant `configuration` entries.
+    Thus, a later Operator construction with the same input can skip the
+    symbolic lowering entirely.
+
+    Parameters
+    ----------
+    path : Path, optional
+        The cache directory. Defaults to a deterministic temporary directory.
+
+    Notes
+    -----
+    Upon a cache hit, the user-visible objects carried by the cached Operator
+    (Functions, SparseFunctions, Constants) are rebound to those appearing in
+    the input expressions, so that the Operator's default arguments are the
+    same as if it had been built from scratch.
+    """
+
+    _exclude = ('initializer', 'coordinates_data', '_value')
+    """
+    Pickling keywords not contributing to the key, as they carry (potentially
+    large) runtime data which doesn't impact code generation.
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+
+    @property
+    def path(self):
+        if self._path is None:
+            self._path = make_tempdir('buildcache')
+        return self._path
+
+    @classmethod
+    def _visible_objects(cls, expressions):
+        """The user-visible objects in ``expressions``, as a mapper from names."""
+        objects = []
+        for e in expressions:
+            objects.extend(retrieve_functions(e))
+            objects.extend(i for i in e.free_symbols if getattr(i, 'is_Input', False))
+        objects = [getattr(i, 'function', i) for i in objects]
+        objects.extend(flatten([getattr(i, j) for j in i._sub_functions]
+                               for i in list(objects) if i.is_SparseFunction))
+        # Symbols carried by the Grids and the Dimensions, such as the spacings
+        grids = filter_ordered(getattr(i, 'grid', None) for i in objects)
+        dimensions = flatten(getattr(i, 'dimensions', ()) for i in objects)
+        for i in grids:
+            if i is not None:
+                dimensions.extend(i.dimensions + (i.time_dim,))
+                objects.extend(i.origin)
+        objects.extend(d.spacing for d in dimensions)
+        objects = [i for i in objects if getattr(i, 'is_Input', False)]
+        return {i.name: i for i in filter_ordered(objects, key=lambda i: i.name)}
+
+    @classmethod
+    def _visible_dimensions(cls, expressions):
+        """
+        The Dimensions in ``expressions``, along with their parents, as a mapper
+        from names. Unlike most other objects, Dimensions with different metadata
+        (e.g., the factor of a ConditionalDimension) may share the same name.
+        """
+        dimensions = []
+        for e in expressions:
+            dimensions.extend(i for i in e.free_symbols if i.is_Dimension)
+            dimensions.extend(e.implicit_dims)
+            dimensions.extend(flatten(getattr(i.function, 'dimensions', ())
+                                      for i in retrieve_functions(e)))
+        for i in cls._visible_objects(expressions).values():
+            grid = getattr(i, 'grid', None)
+            if grid is not None:
+                dimensions.extend(grid.dimensions + (grid.time_dim, grid.stepping_dim))
+        # The parent chain, as e.g. a SubDimension derives its bounds from it
+        queue = list(dimensions)
+        while queue:
+            parent = getattr(queue.pop(), 'parent', None)
+            if parent is not None:
+                dimensions.append(parent)
+                queue.append(parent)
+        return {i.name: i for i in filter_ordered(dimensions, key=lambda i: i.name)}
+
+    @classmethod
+    def _object_signature_items(cls, obj):
+        items = [(obj._pickle_reconstruct or type(obj)).__name__]
+        for i in obj._pickle_args + obj._pickle_kwargs:
+            if i in cls._exclude:
+                continue
+            v = getattr(obj, i, None)
+            if isinstance(v, np.ndarray):
+                continue
+            items.append('%s:%s' % (i, v))
+        return tuple(items)
+
+    def key(self, opcls, expressions, **kwargs):
+        """
+        A unique, deterministic key for the Operator of type ``opcls`` that
+        would be built out of ``expressions`` and ``kwargs``.
+        """
+        from devito import __version__
+
+        items = [__version__, opcls.__module__, opcls.__name__]
+
+        for e in expressions:
+            items.extend([type(e).__name__, str(e), str(e.subdomain),
+                          str(e.implicit_dims), str(e.substitutions)])
+
+        objects = self._visible_objects(expressions)
+        for k in sorted(objects):
+            items.extend(self._object_signature_items(objects[k]))
+
+        dimensions = self._visible_dimensions(expressions)
+        for k in sorted(dimensions):
+            items.extend(self._object_signature_items(dimensions[k]))
+
+        # With MPI, the generated code depends on the domain decomposition
+        grids = filter_ordered(getattr(i, 'grid', None) for i in objects.values())
+        for i in grids:
+            if i is not None:
+                items.extend([str(i.distributor.nprocs), str(i.distributor.myrank)])
+
+        for k in ('name', 'dse', 'dle'):
+            items.append('%s:%s' % (k, kwargs.get(k)))
+        items.append(str(sorted((str(k), str(v))
+                                for k, v in kwargs.get('subs', {}).items())))
+
+        # The profiler instruments the IET, so it impacts code generation too
+        items.extend([str(configuration['profiling']), str(configuration['log-level'])])
+
+        return Signer._digest(configuration, *items)
+
+    def load(self, key, expressions):
+        """
+        Retrieve the Operator mapped to ``key``. Return None if there is no
+        such Operator in the cache or if it can't be restored.
+        """
+        cachefile = self.path.joinpath(key)
+        try:
+            with open(str(cachefile), 'rb') as f:
+                op, names = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (EOFError, UnpicklingError, AttributeError, ImportError, ValueError):
+            debug("BuildCache: `%s` is corrupted; ignoring it" % cachefile)
+            return None
+
+        objects = self._visible_objects(expressions)
+        if any(i not in objects for i in names):
+            return None
+        mapper = self._visible_dimensions(expressions)
+        mapper.update({i: objects[i] for i in names})
+        op._rebind(mapper)
+
+        # Compilation must happen with the current compiler
+        op._compiler = configuration['compiler']
+
+        # The Python-level timings belong to the original build
+        op._profiler.py_timers.clear()
+
+        return op
+
+    def save(self, key, op, expressions):
+        """
+        Store the Operator ``op`` in the cache under ``key``. Operators carrying
+        user-provided data that can't be tracked back to ``expressions`` are
+        not cached.
+        """
+        objects = self._visible_objects(expressions)
+        for i in op.input:
+            if (i.is_DiscreteFunction or not i.is_PerfKnob) and i.name not in objects:
+                debug("BuildCache: can't track `%s` back to the input expressions; "
+                      "Operator `%s` won't be cached" % (i.name, op.name))
+                return
+        names = [i.name for i in op.input if i.name in objects]
+
+        cachefile = self.path.joinpath(key)
+        if cachefile.is_file():
+            return
+
+        # Write to a temporary file and then rename it, so that concurrent
+        # readers never see a partially written Operator
+        tmpfile = self.path.joinpath('%s.%s.tmp' % (key, uuid4().hex))
+        try:
+            with open(str(tmpfile), 'wb') as f:
+                pickle.dump((op, names), f)
+            os.replace(str(tmpfile), str(cachefile))
+        except (PicklingError, AttributeError, TypeError) as e:
+            warning("BuildCache: couldn't store Operator `%s` [%s]" % (op.name, e))
+            if tmpfile.is_file():
+                tmpfile.unlink()
+
+    def clear(self):
+        """Drop all Operators from the cache."""
+        for i in self.path.iterdir():
+            i.unlink()
+
+
+build_cache = BuildCache()
+"""The default BuildCache."""
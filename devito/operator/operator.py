@@ -1,18 +1,23 @@
-from collections import OrderedDict
+from collections import ChainMap, OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from functools import reduce
 from operator import mul
 from math import ceil
+from time import time
 
 from cached_property import cached_property
 import ctypes
 
+from devito.compiler import jit_cache
 from devito.exceptions import InvalidOperator
 from devito.logger import info, perf, warning, is_log_enabled_for
 from devito.ir.equations import LoweredEq
 from devito.ir.clusters import clusterize
 from devito.ir.iet import Callable, MetaCall, iet_build, derive_parameters
 from devito.ir.stree import st_build
-from devito.operator.profiling import create_profile
+from devito.ir.support import DataSpace
+from devito.operator.cache import build_cache
+from devito.operator.profiling import BuildProfile, create_profile
 from devito.mpi import MPI
 from devito.parameters import configuration
 from devito.symbolics import indexify
@@ -20,8 +25,9 @@ from devito.targets import iet_lower
 from devito.tools import (DAG, Signer, ReducerMap, as_tuple, flatten, filter_ordered,
                           filter_sorted, split, timed_pass, timed_region)
 from devito.types import Dimension, Eq
+from devito.types.dense import SubFunction
 
-__all__ = ['Operator']
+__all__ = ['Operator', 'compile_all']
 
 
 class Operator(Callable):
@@ -135,6 +141,7 @@ class Operator(Callable):
         with timed_region('op-compile') as r:
             op = cls._build(expressions, **kwargs)
         op._profiler.py_timers.update(r.timings)
+        op._build_profile = BuildProfile([r.root])
 
         op._emit_build_profiling()
 
@@ -148,6 +155,15 @@ class Operator(Callable):
         if any(not isinstance(i, Eq) for i in expressions):
             raise InvalidOperator("Only `devito.Eq` expressions are allowed.")
 
+        # Attempt to fetch an identical Operator from the on-disk build cache
+        if configuration['build-cache']:
+            input_expressions = expressions
+            key = build_cache.key(cls, input_expressions, **kwargs)
+            op = build_cache.load(key, input_expressions)
+            if op is not None:
+                perf("Operator `%s` fetched from build-cache" % op.name)
+                return op
+
         name = kwargs.get("name", "Kernel")
         dse = kwargs.get("dse", configuration['dse'])
 
@@ -193,6 +209,7 @@ class Operator(Callable):
         op._compiler = configuration['compiler']
         op._lib = None
         op._cfunction = None
+        op._compilation = None
 
         # References to local or external routines
         op._func_table = OrderedDict()
@@ -211,6 +228,10 @@ class Operator(Callable):
         op._dimensions.extend(target_state.dimensions)
         op._dtype, op._dspace = clusters.meta
         op._profiler = profiler
+        op._profiler.track(op.parameters)
+
+        if configuration['build-cache']:
+            build_cache.save(key, op, input_expressions)
 
         return op
 
@@ -311,6 +332,29 @@ class Operator(Callable):
 
         return iet_lower(iet, *set_dle_mode(dle))
 
+    def _rebind(self, mapper):
+        """
+        Replace the input objects (e.g., Functions, Constants) and the Dimensions
+        of the Operator with those in ``mapper``, a dict from object names to
+        objects. This is used when an Operator is restored from the build cache,
+        as its input objects are then distinct from, though equivalent to, the
+        user's ones.
+        """
+        rebind = lambda i: mapper.get(i.name, i) if i.is_Input else i
+
+        self._dimensions = [mapper.get(i.name, i) for i in self._dimensions]
+        self._input = [rebind(i) for i in self._input]
+        self._output = [rebind(i) for i in self._output]
+        self.parameters = tuple(rebind(i) for i in self.parameters)
+
+        parts = {rebind(k): v for k, v in self._dspace.parts.items()}
+        self._dspace = DataSpace(self._dspace.intervals, parts)
+
+        # Drop any derived property, so that it gets recomputed
+        for i in ('input', 'output', 'dimensions', 'objects', '_known_arguments',
+                  '_input_names', '_args_plan'):
+            self.__dict__.pop(i, None)
+
     # Read-only properties exposed to the outside world
 
     @cached_property
@@ -332,12 +376,54 @@ class Operator(Callable):
 
     # Arguments processing
 
-    def _prepare_arguments(self, **kwargs):
+    @cached_property
+    def _args_plan(self):
+        """
+        The argument-processing metadata that only depends on the Operator
+        itself, and thus can be computed once and reused across ``apply`` calls.
+        """
+        # A topological sorting is used so that derived Dimensions are processed after
+        # their parents (note that a leaf Dimension can have an arbitrary long list of
+        # ancestors)
+        dag = DAG(self.dimensions,
+                  [(i, i.parent) for i in self.dimensions if i.is_Derived])
+        dimensions = tuple(reversed(dag.topological_sort()))
+
+        # The data space of each parameter and Dimension
+        dspace = {i: self._dspace[i] for i in self.parameters + self.dimensions}
+
+        return ArgumentsPlan(dimensions, dspace, {})
+
+    def _split_input(self, kwargs):
+        """
+        Split the Operator input into user-provided overrides and defaults. The
+        split only depends on the names in ``kwargs``, so it's cached.
+        """
+        key = frozenset(k for k in kwargs if k in self._input_names)
+        try:
+            return self._args_plan.splits[key]
+        except KeyError:
+            ret = split(self.input, lambda p: p.name in key)
+            self._args_plan.splits[key] = ret
+            return ret
+
+    @cached_property
+    def _input_names(self):
+        return frozenset(i.name for i in self.input)
+
+    def _prepare_arguments(self, _shared=None, **kwargs):
         """
         Process runtime arguments passed to ``.apply()` and derive
         default values for any remaining arguments.
+
+        The argument values of the data carriers not in ``kwargs`` may be
+        provided, already processed, through ``_shared``, a mapper from names
+        to the output of ``_arg_values``.
         """
-        overrides, defaults = split(self.input, lambda p: p.name in kwargs)
+        plan = self._args_plan
+        _shared = _shared or {}
+
+        overrides, defaults = self._split_input(kwargs)
         # Process data-carrier overrides
         args = ReducerMap()
         for p in overrides:
@@ -352,7 +438,11 @@ class Operator(Callable):
             if p.name in args:
                 # E.g., SubFunctions
                 continue
-            for k, v in p._arg_values(**kwargs).items():
+            try:
+                values = _shared[p.name]
+            except KeyError:
+                values = p._arg_values(**kwargs)
+            for k, v in values.items():
                 if k in args and args[k] != v:
                     raise ValueError("Default `%s` is incompatible with other args as "
                                      "`%s=%s`, while `%s=%s` is expected. Perhaps you "
@@ -372,14 +462,13 @@ class Operator(Callable):
         except KeyError:
             grid = None
 
-        # Process Dimensions
-        # A topological sorting is used so that derived Dimensions are processed after
-        # their parents (note that a leaf Dimension can have an arbitrary long list of
-        # ancestors)
-        dag = DAG(self.dimensions,
-                  [(i, i.parent) for i in self.dimensions if i.is_Derived])
-        for d in reversed(dag.topological_sort()):
-            args.update(d._arg_values(args, self._dspace[d], grid, **kwargs))
+        # Process Dimensions, with derived Dimensions after their parents. The
+        # values provided by the data carriers are retained, as the Dimensions
+        # adjust them based on the iteration space (see BoundOperator)
+        names = flatten(d._arg_names for d in plan.dimensions)
+        unadjusted = {k: args[k] for k in names if k in args}
+        for d in plan.dimensions:
+            args.update(d._arg_values(args, plan.dspace[d], grid, **kwargs))
 
         # Process Objects (which may need some `args`)
         for o in self.objects:
@@ -387,10 +476,10 @@ class Operator(Callable):
 
         # Sanity check
         for p in self.parameters:
-            p._arg_check(args, self._dspace[p])
+            p._arg_check(args, plan.dspace[p])
         for d in self.dimensions:
             if d.is_Derived:
-                d._arg_check(args, self._dspace[p])
+                d._arg_check(args, plan.dspace[d])
 
         # Turn arguments into a format suitable for the generated code
         # E.g., instead of NumPy arrays for Functions, the generated code expects
@@ -403,7 +492,8 @@ class Operator(Callable):
                 args.update(p._arg_as_ctype(args, alias=p))
 
         # Add in the profiler argument
-        args[self._profiler.name] = self._profiler.timer.reset()
+        if self._profiler.timer is not None:
+            args[self._profiler.name] = self._profiler.timer.reset()
 
         # Add in any backend-specific argument
         args.update(kwargs.pop('backend', {}))
@@ -419,6 +509,7 @@ class Operator(Callable):
 
         # Attach `grid` to the arguments map
         args = ArgumentsMap(grid, **args)
+        args.unadjusted = unadjusted
 
         return args
 
@@ -426,9 +517,13 @@ class Operator(Callable):
         """Process runtime arguments upon returning from ``.apply()``."""
         for p in self.parameters:
             try:
-                p._arg_apply(args[p.name], args[p.coordinates.name], kwargs.get(p.name))
+                coordinates = p.coordinates
             except AttributeError:
                 p._arg_apply(args[p.name], kwargs.get(p.name))
+                continue
+            # The coordinates aren't used by, e.g., the precomputed interpolation
+            coordsobj = args[coordinates.name] if coordinates in self.parameters else None
+            p._arg_apply(args[p.name], coordsobj, kwargs.get(p.name))
 
     @cached_property
     def _known_arguments(self):
@@ -449,6 +544,134 @@ class Operator(Callable):
                 raise ValueError("No value found for parameter %s" % p.name)
         return args
 
+    def apply_batch(self, batch, nworkers=1, **kwargs):
+        """
+        Execute the Operator once for each set of runtime arguments in ``batch``.
+
+        This is suited to, e.g., seismic workloads, in which the same Operator
+        is run for many shots, each shot having its own sources, receivers and
+        wavefields, while other arguments, such as the physical parameters, are
+        shared by all shots.
+
+        Parameters
+        ----------
+        batch : list of dict
+            The runtime arguments of each execution, as in ``apply``.
+        nworkers : int, optional
+            The maximum number of executions running concurrently, on a pool of
+            threads. Defaults to 1, that is the executions run back to back.
+        **kwargs
+            The runtime arguments shared by all executions, as in ``apply``.
+            The shared data carriers are only processed once.
+
+        Returns
+        -------
+        list of PerformanceSummary
+            The performance summary of each execution.
+
+        Notes
+        -----
+        Concurrent executions must not write to the same objects. With MPI, the
+        executions always run back to back.
+
+        Examples
+        --------
+        >>> from devito import Eq, Function, Grid, TimeFunction, Operator
+        >>> grid = Grid(shape=(4, 4))
+        >>> f = Function(name='f', grid=grid)
+        >>> u = TimeFunction(name='u', grid=grid)
+        >>> op = Operator(Eq(u.forward, u + f))
+
+        Four executions, each one with its own ``u``, but all sharing ``f``
+
+        >>> batch = [{'u': TimeFunction(name='u', grid=grid)} for _ in range(4)]
+        >>> summaries = op.apply_batch(batch, nworkers=2, f=f, time_M=2)
+        """
+        batch = [dict(i) for i in batch]
+        names = set().union(*batch)
+
+        # Process the shared data carriers once. The SubFunctions of a data carrier
+        # in ``batch`` are rather processed along with their parent
+        def is_shared(p):
+            parent = p.parent if isinstance(p, SubFunction) else p
+            return p.name not in names and parent.name not in names
+
+        shared = {p.name: p._arg_values(**kwargs) for p in self.input if is_shared(p)}
+        common = {k: v for k, v in kwargs.items() if k not in self._input_names}
+
+        # Build the arguments of each execution, each with its own profiling timer.
+        # The timers own the storage their structs point to, so they are retained
+        # until the end of the batch
+        timer = self._profiler.timer
+        timers = []
+        argss = []
+        try:
+            for i in batch:
+                with self._profiler.timer_on('arguments'):
+                    args = self._prepare_arguments(_shared=shared, **{**common, **i})
+                    if timer is not None:
+                        timers.append(timer._rebuild())
+                        args[timer.name] = timers[-1].reset()
+                argss.append(args)
+
+            cfunction = self.cfunction
+
+            def run(args):
+                tic = time()
+                cfunction(*[args[p.name] for p in self.parameters])
+                return time() - tic
+
+            if nworkers > 1 and len(batch) > 1 and not configuration['mpi']:
+                with ThreadPoolExecutor(nworkers) as executor:
+                    elapsed = list(executor.map(run, argss))
+            else:
+                elapsed = []
+                for args in argss:
+                    with self._profiler.timer_on('apply', comm=args.comm):
+                        run(args)
+                    elapsed.append(self._profiler.py_timers['apply'])
+
+            summaries = []
+            for i, args, v in zip(batch, argss, elapsed):
+                self._postprocess_arguments(args, **{**kwargs, **i})
+                self._profiler.py_timers['apply'] = v
+                summaries.append(self._emit_apply_profiling(args))
+        finally:
+            # E.g., the hardware counters opened by each timer
+            for i in timers:
+                i.close()
+
+        return summaries
+
+    def bind(self, **kwargs):
+        """
+        Bind runtime arguments to the Operator.
+
+        The runtime arguments are processed once, as in ``apply``, and the result
+        is returned as a BoundOperator -- a low-overhead callable for repeated
+        executions differing only in the iteration bounds along the Dimensions.
+
+        Parameters
+        ----------
+        **kwargs
+            The runtime arguments, as in ``apply``.
+
+        Examples
+        --------
+        >>> from devito import Eq, Grid, TimeFunction, Operator
+        >>> grid = Grid(shape=(3, 3))
+        >>> u = TimeFunction(name='u', grid=grid, save=10)
+        >>> op = Operator(Eq(u.forward, u + 1))
+        >>> bound = op.bind()
+
+        The Operator may now be run over consecutive time windows, by only
+        updating the time bounds
+
+        >>> bound(time_m=0, time_M=3)
+        >>> bound(time_m=4, time_M=8)
+        """
+        return BoundOperator(self, self._prepare_arguments(**kwargs), **kwargs)
+
     # JIT compilation
 
     @cached_property
@@ -464,23 +687,60 @@ class Operator(Callable):
         Operator, reagardless of how many times this method is invoked.
         """
         if self._lib is None:
+            tic = time()
             with self._profiler.timer_on('jit-compile'):
                 recompiled, src_file = self._compiler.jit_compile(self._soname,
                                                                   str(self.ccode))
+            self._build_profile.add('jit-compile', tic, time())
 
-            elapsed = self._profiler.py_timers['jit-compile']
-            if recompiled:
-                perf("Operator `%s` jit-compiled `%s` in %.2f s with `%s`" %
-                     (self.name, src_file, elapsed, self._compiler))
-            else:
-                perf("Operator `%s` fetched `%s` in %.2f s from jit-cache" %
-                     (self.name, src_file, elapsed))
+            self._emit_jit_profiling(recompiled, src_file)
+
+    def compile_async(self):
+        """
+        JIT-compile the Operator in a background thread.
+
+        This allows overlapping the JIT compilation with other work, such as
+        setting up the input data. The first ``apply`` waits for the
+        compilation to complete, if it hasn't already.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            The pending compilation. Any compilation error is raised by its
+            ``result()``, as well as by the first ``apply``.
+
+        Examples
+        --------
+        >>> from devito import Eq, Grid, TimeFunction, Operator
+        >>> grid = Grid(shape=(4, 4))
+        >>> u = TimeFunction(name='u', grid=grid)
+        >>> op = Operator(Eq(u.forward, u + 1))
+        >>> future = op.compile_async()
+        >>> u.data[:] = 1.  # Overlaps with the JIT compilation
+        >>> summary = op.apply(time_M=0)
+        """
+        if self._compilation is None:
+            # The soname depends on `configuration`, which must be read now
+            self._soname
+            self._compilation = jit_executor().submit(self._jit_compile)
+        return self._compilation
+
+    @property
+    def build_profile(self):
+        """
+        The BuildProfile, a hierarchical breakdown of the time spent building
+        and JIT-compiling the Operator.
+        """
+        return self._build_profile
 
     @property
     def cfunction(self):
         """The JIT-compiled C function as a ctypes.FuncPtr object."""
         if self._lib is None:
-            self._jit_compile()
+            if self._compilation is not None:
+                self._compilation.result()
+            else:
+                self._jit_compile()
             self._lib = self._compiler.load(self._soname)
             self._lib.name = self._soname
 
@@ -606,6 +866,18 @@ class Operator(Callable):
             if perc > 20.:
                 perf("- [Hotspot] %s: %.2f s (%.1f %%)" % (i.lstrip('_'), v, perc))
 
+    def _emit_jit_profiling(self, recompiled, src_file):
+        elapsed = self._profiler.py_timers['jit-compile']
+        if recompiled:
+            perf("Operator `%s` jit-compiled `%s` in %.2f s with `%s`" %
+                 (self.name, src_file, elapsed, self._compiler))
+        else:
+            perf("Operator `%s` fetched `%s` in %.2f s from jit-cache" %
+                 (self.name, src_file, elapsed))
+        if jit_cache.enabled:
+            perf("Shared jit-cache `%s`: %d hits, %d misses" %
+                 (jit_cache.path, jit_cache.hits, jit_cache.misses))
+
     def _emit_apply_profiling(self, args):
         """Produce a performance summary of the profiled sections."""
         # Rounder to 2 decimal places
@@ -664,6 +936,34 @@ class Operator(Callable):
                 perf("%s* %s%s computed in %.2f s"
                      % (indent, name, rank, fround(v.time)))
 
+            # Hardware counters, if available, next to the estimates above
+            c = summary.counters.get(k)
+            if c is not None:
+                metrics = []
+                if c.oi is not None:
+                    metrics.append("OI=%.2f" % fround(c.oi))
+                if c.gflopss is not None:
+                    metrics.append("%.2f GFlops/s" % fround(c.gflopss))
+                if c.ipc is not None:
+                    metrics.append("IPC=%.2f" % fround(c.ipc))
+                if metrics:
+                    perf("%s  [measured] %s" % (indent, ", ".join(metrics)))
+
+        # Emit halo exchange data, if available
+        if summary.comms:
+            perf("Halo exchanges")
+            for (f, rank), v in summary.reduce_comms(('function', 'rank')).items():
+                rank = "[rank%d]" % rank if rank is not None else ""
+                perf("%s* %s%s: %.2f MB sent, %.2f MB received in %.2f s "
+                     "[gather %.2f s, post %.2f s, wait %.2f s, scatter %.2f s]" %
+                     (indent, f, rank, v.sent/10**6, v.recv/10**6, sum(v[2:]),
+                      v.gather, v.post, v.wait, v.scatter))
+            loads = summary.load_balance
+            if len(loads) > 1:
+                rank = max(loads, key=lambda i: loads[i].compute)
+                perf("%s* Load imbalance %.2f (max/avg computation time), with "
+                     "rank%d the most loaded" % (indent, summary.imbalance, rank))
+
         # Emit relevant configuration values
         perf("Configuration:  %s" % self._state['optimizations'])
 
@@ -719,6 +1019,7 @@ class Operator(Callable):
     def __getstate__(self):
         if self._lib:
             state = dict(self.__dict__)
+            state['_compilation'] = None
             # The compiled shared-object will be pickled; upon unpickling, it
             # will be restored into a potentially different temporary directory,
             # so the entire process during which the shared-object is loaded and
@@ -736,7 +1037,10 @@ class Operator(Callable):
                 state['binary'] = f.read()
             return state
         else:
-            return self.__dict__
+            # A pending background compilation can't be pickled
+            state = dict(self.__dict__)
+            state['_compilation'] = None
+            return state
 
     def __getnewargs_ex__(self):
         return (None,), {}
@@ -769,18 +1073,215 @@ class Operator(Callable):
 # Misc helpers
 
 
+ArgumentsPlan = namedtuple('ArgumentsPlan', 'dimensions dspace splits')
+"""
+Metadata to speed up the processing of runtime arguments: ::
+
+    * dimensions: the Operator Dimensions, in the order they must be processed;
+    * dspace: a mapper from parameters and Dimensions to their data space;
+    * splits: a cache of the overrides/defaults partitions of the Operator input.
+"""
+
+
 class ArgumentsMap(dict):
 
     def __init__(self, grid, *args, **kwargs):
         super(ArgumentsMap, self).__init__(*args, **kwargs)
         self.grid = grid
 
+        # The Dimension-related values as provided by the data carriers, that
+        # is before being adjusted by the Dimensions
+        self.unadjusted = {}
+
     @property
     def comm(self):
         """The MPI communicator the arguments are collective over."""
         return self.grid.comm if self.grid is not None else MPI.COMM_NULL
 
 
+class BoundOperator(object):
+
+    """
+    An Operator with bound runtime arguments, as returned by ``Operator.bind``.
+
+    Calling a BoundOperator only re-derives the values of the Dimension-related
+    arguments (e.g., ``time_m``, ``time_M``) that are explicitly supplied, and
+    then invokes the JIT-compiled C function. Unlike ``Operator.apply``, neither
+    post-processing of the runtime arguments nor performance profiling take place,
+    unless ``apply`` is used.
+
+    Parameters
+    ----------
+    op : Operator
+        The bound Operator.
+    args : ArgumentsMap
+        The bound runtime arguments.
+    **kwargs
+        The runtime arguments ``args`` were derived from. Those related to the
+        Dimensions apply to each call, unless explicitly overridden.
+
+    Notes
+    -----
+    With MPI, the data of the SparseFunctions is scattered at binding time and
+    gathered back only by ``apply``.
+    """
+
+    def __init__(self, op, args, **kwargs):
+        self.op = op
+        self.args = args
+
+        # The ctypes argument vector
+        self._values = [args[p.name] for p in op.parameters]
+
+        # The data carried by the DiscreteFunctions, for the runtime checks
+        self._arrays = {p.name: p._C_as_ndarray(args[p.name]) for p in op.parameters
+                        if p.is_DiscreteFunction}
+
+        # The Dimension-related arguments that may be updated at each call
+        self._accepted = frozenset(flatten(d._arg_names for d in op.dimensions))
+        self._scalars = [(n, p.name) for n, p in enumerate(op.parameters)
+                         if p.name in self._accepted]
+        self._kwargs = {k: v for k, v in kwargs.items() if k in self._accepted}
+
+    def __call__(self, **kwargs):
+        args, values = self._arguments(**kwargs)
+        self.op.cfunction(*values)
+
+    def _arguments(self, **kwargs):
+        if kwargs:
+            for k, v in kwargs.items():
+                if k not in self._accepted:
+                    raise ValueError("Unrecognized argument %s=%s" % (k, v))
+
+            op = self.op
+            plan = op._args_plan
+
+            # The Dimensions re-derive their values from the unadjusted ones, as
+            # in `Operator._prepare_arguments`
+            args = ArgumentsMap(self.args.grid, self.args)
+            for k in self._accepted:
+                args.pop(k, None)
+            args.update(self.args.unadjusted)
+            kwargs = {**self._kwargs, **kwargs}
+            for d in plan.dimensions:
+                args.update(d._arg_values(args, plan.dspace[d], args.grid, **kwargs))
+            checkargs = ChainMap(self._arrays, args)
+            for p in op.parameters:
+                if p.is_DiscreteFunction:
+                    p._arg_check(checkargs, plan.dspace[p])
+
+            values = list(self._values)
+            for n, k in self._scalars:
+                values[n] = args[k]
+        else:
+            args, values = self.args, self._values
+
+        # Some arguments, e.g. `time_M` with buffered TimeFunctions, may have
+        # been left unbound
+        for n, k in self._scalars:
+            if values[n] is None:
+                raise ValueError("No value found for parameter %s" % k)
+
+        return args, values
+
+    def apply(self, **kwargs):
+        """
+        Execute the bound Operator, post-process the runtime arguments and
+        produce a performance summary, as in ``Operator.apply``.
+        """
+        op = self.op
+
+        args, values = self._arguments(**kwargs)
+        if op._profiler.timer is not None:
+            op._profiler.timer.reset()
+
+        cfunction = op.cfunction
+        with op._profiler.timer_on('apply', comm=args.comm):
+            cfunction(*values)
+
+        op._postprocess_arguments(args)
+
+        return op._emit_apply_profiling(args)
+
+
+def compile_all(operators, nprocs=None):
+    """
+    JIT-compile a collection of Operators, running the system compiler jobs in
+    parallel on a pool of processes.
+
+    Parameters
+    ----------
+    operators : list of Operator
+        The Operators to be compiled. Those already compiled are ignored.
+    nprocs : int, optional
+        The maximum number of concurrent compiler jobs. Defaults to the number
+        of Operators, capped by the number of logical cores.
+
+    Notes
+    -----
+    Code generation takes place in the calling process, while only the compiler
+    invocations are offloaded to the process pool. As with ``Operator.apply``,
+    compilation goes through the codepy cache, whose locks make it safe for
+    several processes to compile the same shared object. With MPI, the jobs
+    are run sequentially, as forking MPI processes is unsafe.
+
+    Examples
+    --------
+    >>> from devito import Eq, Grid, TimeFunction, Operator, compile_all
+    >>> grid = Grid(shape=(4, 4))
+    >>> u = TimeFunction(name='u', grid=grid)
+    >>> op0 = Operator(Eq(u.forward, u + 1))
+    >>> op1 = Operator(Eq(u.forward, u + 2))
+    >>> compile_all([op0, op1])
+    """
+    pending = OrderedDict()
+    for op in as_tuple(operators):
+        if op._lib is None:
+            pending.setdefault(op._soname, []).append(op)
+    if not pending:
+        return
+
+    config = {k: configuration[k] for k in ('jit-backdoor', 'debug-compiler',
+                                            'jit-cache-dir', 'jit-cache-size')}
+    jobs = [(v[0]._compiler, k, str(v[0].ccode), config) for k, v in pending.items()]
+
+    nprocs = nprocs or min(len(jobs), configuration['platform'].cores_logical)
+    if len(jobs) == 1 or nprocs == 1 or configuration['mpi']:
+        results = [_jit_compile_job(*i) for i in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=nprocs) as executor:
+            results = list(executor.map(_jit_compile_job, *zip(*jobs)))
+
+    toc = time()
+    for (soname, ops), (recompiled, src_file, elapsed) in zip(pending.items(), results):
+        for op in ops:
+            op._profiler.py_timers['jit-compile'] = elapsed
+            op._build_profile.add('jit-compile', toc - elapsed, toc)
+            op._emit_jit_profiling(recompiled, src_file)
+            op._lib = op._compiler.load(soname)
+            op._lib.name = soname
+
+
+_jit_executor = None
+
+
+def jit_executor():
+    """The thread pool performing the background JIT compilations."""
+    global _jit_executor
+    if _jit_executor is None:
+        _jit_executor = ThreadPoolExecutor(configuration['platform'].cores_logical)
+    return _jit_executor
+
+
+def _jit_compile_job(compiler, soname, code, config):
+    """A compile_all job, run by a worker process."""
+    for k, v in config.items():
+        configuration[k] = v
+    tic = time()
+    recompiled, src_file = compiler.jit_compile(soname, code)
+    return recompiled, src_file, time() - tic
+
+
 def set_dse_mode(mode):
     if not mode:
         return 'noop'
@@ -1,25 +1,30 @@
 from collections import OrderedDict, namedtuple
 from contextlib import contextmanager
-from ctypes import c_double
+from ctypes import (CDLL, POINTER, Structure, byref, c_double, c_int, c_long,
+                    c_uint32, c_uint64, get_errno)
 from functools import reduce
 from operator import mul
 from pathlib import Path
+from platform import machine
 from time import time as seq_time
+import json
 import os
 
 from cached_property import cached_property
+import numpy as np
 
 from devito.ir.iet import (Call, ExpressionBundle, List, TimedList, Section,
                            FindNodes, Transformer)
 from devito.ir.support import IntervalGroup
-from devito.logger import warning
-from devito.mpi import MPI
+from devito.archinfo import HSW, IVB, KNL, SNB, Intel64
+from devito.logger import debug, warning
+from devito.mpi import MPI, MPIStats
 from devito.parameters import configuration
 from devito.symbolics import estimate_cost
-from devito.tools import flatten
+from devito.tools import flatten, memoized_func
 from devito.types import CompositeObject
 
-__all__ = ['Timer', 'create_profile']
+__all__ = ['Timer', 'BuildProfile', 'create_profile']
 
 
 class Profiler(object):
@@ -40,6 +45,14 @@ class Profiler(object):
         # Python-level timers
         self.py_timers = OrderedDict()
 
+        # Timeline profiling -- the section timings are sampled every `period`
+        # calls into a ring buffer with `size` slots
+        period = configuration['profiling-timeline']
+        if period:
+            self.timeline = (period, configuration['profiling-timeline-size'])
+        else:
+            self.timeline = None
+
         self.initialized = True
 
     def instrument(self, iet):
@@ -91,6 +104,14 @@ class Profiler(object):
 
         return iet
 
+    def track(self, parameters):
+        """
+        Record the objects, among the Operator ``parameters``, carrying run-time
+        profiling data other than that of the Timer. By default, nothing is
+        recorded.
+        """
+        return
+
     @contextmanager
     def timer_on(self, name, comm=None):
         """
@@ -148,11 +169,41 @@ class Profiler(object):
             else:
                 summary.add(name, None, time)
 
+        summary.add_timeline(self.timer.extract_timeline(args[self.name]))
+
         return summary
 
     @cached_property
     def timer(self):
-        return Timer(self.name, [i.name for i in self._sections])
+        return Timer(self.name, [i.name for i in self._sections], self.timeline)
+
+
+class NoopProfiler(Profiler):
+
+    """
+    Profile the Operator as a whole, through Python-level timers only. No
+    C-level timers are generated, and the PerformanceSummary is produced
+    without any collective communication.
+    """
+
+    def instrument(self, iet):
+        return iet
+
+    @contextmanager
+    def timer_on(self, name, comm=None):
+        # No barriers, hence the timings are rank-local
+        with super(NoopProfiler, self).timer_on(name):
+            yield
+
+    def summary(self, args, dtype, reduce_over=None):
+        summary = PerformanceSummary()
+        if reduce_over is not None:
+            summary.add(reduce_over, None, self.py_timers[reduce_over])
+        return summary
+
+    @property
+    def timer(self):
+        return None
 
 
 class AdvancedProfiler(Profiler):
@@ -215,6 +266,8 @@ class AdvancedProfiler(Profiler):
                     points = reduce(mul, (nt,) + grid.shape)
                     summary.add_glb_fdlike(points, self.py_timers[reduce_over])
 
+        summary.add_timeline(self.timer.extract_timeline(args[self.name]))
+
         return summary
 
 
@@ -257,26 +310,303 @@ class AdvisorProfiler(AdvancedProfiler):
         return iet
 
 
+class PerfEventProfiler(AdvancedProfiler):
+
+    """
+    Rely on the Linux ``perf_event`` interface to read hardware performance
+    counters around each profiled section. The measured floating-point
+    operations and memory traffic are reported next to the estimated ones.
+    """
+
+    _default_includes = ['stdint.h', 'unistd.h']
+
+    def __init__(self, name):
+        self.events = perf_events()
+        if not self.events:
+            warning("Requested `perf` profiler, but couldn't open any counter "
+                    "via `perf_event_open`")
+            self.initialized = False
+        else:
+            super(PerfEventProfiler, self).__init__(name)
+
+    def summary(self, args, dtype, reduce_over=None):
+        summary = super(PerfEventProfiler, self).summary(args, dtype, reduce_over)
+
+        comm = args.comm
+        for name, counts in self.timer.extract_counters(args[self.name]).items():
+            if comm is not MPI.COMM_NULL:
+                # With MPI enabled, we add one entry per section per rank
+                countss = comm.allgather(counts)
+                for rank in range(comm.size):
+                    summary.add_counters(name, rank, countss[rank])
+            else:
+                summary.add_counters(name, None, counts)
+
+        return summary
+
+    @cached_property
+    def timer(self):
+        return PerfEventTimer(self.name, [i.name for i in self._sections],
+                              self.timeline, self.events)
+
+
+class MPIProfiler(AdvancedProfiler):
+
+    """
+    An AdvancedProfiler which also tracks the halo exchanges. The generated
+    halo exchange routines are instrumented so that, for each neighbour and
+    for each Function, the bytes exchanged and the time spent in the
+    gather/scatter copies, in posting the MPI_Isend/MPI_Irecv and in the
+    MPI_Waits are gathered into the PerformanceSummary.
+    """
+
+    def __init__(self, name):
+        super(MPIProfiler, self).__init__(name)
+        self.stats = []
+
+    def track(self, parameters):
+        self.stats = [i for i in parameters if isinstance(i, MPIStats)]
+
+    def summary(self, args, dtype, reduce_over=None):
+        summary = super(MPIProfiler, self).summary(args, dtype, reduce_over)
+
+        comm = args.comm
+        for stats in self.stats:
+            entries = stats.extract(args[stats.name])
+            if comm is not MPI.COMM_NULL:
+                entriess = comm.allgather(entries)
+            else:
+                entriess = [entries]
+            for rank, entries in enumerate(entriess):
+                rank = rank if comm is not MPI.COMM_NULL else None
+                for (f, torank, fromrank, sent, recv,
+                     tgather, tpost, twait, tscatter) in entries:
+                    # The time for the sends, i.e. gather and posting, is charged
+                    # to the destination; the time to complete the exchange, i.e.
+                    # waiting and scatter, to the source
+                    if torank != MPI.PROC_NULL and sent:
+                        summary.add_comms(f, torank, rank, sent=sent,
+                                          gather=tgather, post=tpost)
+                    if fromrank != MPI.PROC_NULL and recv:
+                        summary.add_comms(f, fromrank, rank, recv=recv,
+                                          wait=twait, scatter=tscatter)
+
+        return summary
+
+
 class Timer(CompositeObject):
 
-    def __init__(self, name, sections):
-        super(Timer, self).__init__(name, 'profiler', [(i, c_double) for i in sections])
+    """
+    The C struct used by the generated code to store the section timings.
+
+    Parameters
+    ----------
+    name : str
+        The name of the Timer.
+    sections : list of str
+        The names of the timed sections.
+    timeline : 2-tuple of int, optional
+        If provided, a ``(period, size)`` tuple enabling timeline profiling:
+        the cumulative timing of each section is also sampled every ``period``
+        section calls into a ring buffer with ``size`` slots.
+    """
+
+    def __init__(self, name, sections, timeline=None):
+        self._sections = tuple(sections)
+        self._timeline = tuple(timeline) if timeline else None
+        super(Timer, self).__init__(name, 'profiler', self._make_pfields())
+
+    def _make_pfields(self):
+        pfields = [(i, c_double) for i in self.sections]
+        if self.timeline:
+            pfields.extend([('period', c_long), ('size', c_long),
+                            ('timeline', POINTER(c_double))])
+            pfields.extend([('ncalls_%s' % i, c_long) for i in self.sections])
+        return pfields
+
+    def _rebuild(self):
+        """A new Timer with the same layout as ``self``, but its own storage."""
+        args = [getattr(self, i) for i in self._pickle_args]
+        kwargs = {i: getattr(self, i) for i in self._pickle_kwargs}
+        return self.__class__(*args, **kwargs)
 
     def reset(self):
-        for i in self.fields:
+        for i in self.sections:
             setattr(self.value._obj, i, 0.0)
+        if self.timeline:
+            period, size = self.timeline
+            obj = self.value._obj
+            obj.period = period
+            obj.size = size
+            for i in self.sections:
+                setattr(obj, 'ncalls_%s' % i, 0)
+            # NOTE: the Timer owns the ring buffer, so the Timer must be kept
+            # alive for as long as the struct is in use
+            self._buffer = np.zeros((size, len(self.sections)), dtype=np.float64)
+            obj.timeline = self._buffer.ctypes.data_as(POINTER(c_double))
         return self.value
 
+    def close(self):
+        """Release any system resource acquired upon ``reset``."""
+        return
+
     @property
     def total(self):
-        return sum(getattr(self.value._obj, i) for i in self.fields)
+        return sum(getattr(self.value._obj, i) for i in self.sections)
 
     @property
     def sections(self):
-        return self.fields
+        return self._sections
+
+    @property
+    def timeline(self):
+        return self._timeline
+
+    def extract_timeline(self, value):
+        """
+        Decode the timeline recorded in the Timer struct ``value``.
+
+        Returns
+        -------
+        numpy.ndarray
+            A structured array with one entry per sampling window, holding the
+            window index (``window``) and the time spent in each section within
+            that window (NaN if unavailable, e.g. for sections called less than
+            ``period`` times). Only the most recent windows, which fit in the
+            ring buffer, are available. None if timeline profiling is disabled.
+        """
+        if not self.timeline:
+            return None
+        period, size = self.timeline
+        obj = value._obj
+        buf = np.ctypeslib.as_array(obj.timeline, shape=(size, len(self.sections)))
+
+        # Turn the cumulative samples into per-window timings
+        columns = {}
+        for n, i in enumerate(self.sections):
+            nsamples = getattr(obj, 'ncalls_%s' % i) // period
+            start = 0 if nsamples <= size else nsamples - size + 1
+            for j in range(start, nsamples):
+                previous = buf[(j - 1) % size, n] if j > 0 else 0.
+                columns.setdefault(i, {})[j] = buf[j % size, n] - previous
+
+        windows = sorted(set().union(*[set(v) for v in columns.values()]))
+        dtype = [('window', np.int64)] + [(i, np.float64) for i in self.sections]
+        ret = np.empty(len(windows), dtype=dtype)
+        ret['window'] = windows
+        for i in self.sections:
+            ret[i] = [columns.get(i, {}).get(j, np.nan) for j in windows]
+        return ret
 
     # Pickling support
     _pickle_args = ['name', 'sections']
+    _pickle_kwargs = ['timeline']
+
+
+class PerfEventTimer(Timer):
+
+    """
+    A Timer also carrying the hardware counters read around each section.
+
+    Parameters
+    ----------
+    name : str
+        The name of the PerfEventTimer.
+    sections : list of str
+        The names of the timed sections.
+    timeline : 2-tuple of int, optional
+        See :class:`Timer`.
+    events : tuple of PerfEvent, optional
+        The counted events.
+
+    Notes
+    -----
+    Upon ``reset``, one counter per event is opened for each thread of the
+    running process. Threads spawned while the Operator is running are not
+    counted.
+    """
+
+    def __init__(self, name, sections, timeline=None, events=()):
+        self._events = tuple(events)
+        self._fds = []
+        super(PerfEventTimer, self).__init__(name, sections, timeline)
+
+    def _make_pfields(self):
+        pfields = super(PerfEventTimer, self)._make_pfields()
+        pfields.extend([('nfds', c_int), ('fds', POINTER(c_int)),
+                        ('fdevents', POINTER(c_int)), ('scratch', POINTER(c_double)),
+                        ('counters', POINTER(c_double))])
+        return pfields
+
+    @property
+    def events(self):
+        return self._events
+
+    def reset(self):
+        value = super(PerfEventTimer, self).reset()
+        obj = value._obj
+
+        # Drop the counters opened for the previous run
+        self.close()
+        fdevents = []
+        for tid in os.listdir('/proc/self/task'):
+            for n, event in enumerate(self.events):
+                fd = perf_event_open(event, int(tid))
+                if fd >= 0:
+                    self._fds.append(fd)
+                    fdevents.append(n)
+
+        # NOTE: the PerfEventTimer owns the buffers, so the PerfEventTimer must be
+        # kept alive for as long as the struct is in use
+        nfds = len(self._fds)
+        self._fdbuffers = (np.array(self._fds + [-1], dtype=np.intc),
+                           np.array(fdevents + [0], dtype=np.intc),
+                           np.zeros((len(self.sections), nfds + 1)),
+                           np.zeros((len(self.sections), len(self.events))))
+        obj.nfds = nfds
+        obj.fds = self._fdbuffers[0].ctypes.data_as(POINTER(c_int))
+        obj.fdevents = self._fdbuffers[1].ctypes.data_as(POINTER(c_int))
+        obj.scratch = self._fdbuffers[2].ctypes.data_as(POINTER(c_double))
+        obj.counters = self._fdbuffers[3].ctypes.data_as(POINTER(c_double))
+
+        return value
+
+    def close(self):
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+    def extract_counters(self, value):
+        """
+        Decode the counters recorded in the PerfEventTimer struct ``value``.
+
+        Returns
+        -------
+        OrderedDict
+            A mapper from section names to the event counts, as an OrderedDict
+            from event names to values. If the underlying events are available,
+            the counts also include the measured floating-point operations
+            (``flops``) and the traffic from main memory, derived from the
+            last-level cache misses, in bytes (``traffic``).
+        """
+        obj = value._obj
+        shape = (len(self.sections), len(self.events))
+        buf = np.ctypeslib.as_array(obj.counters, shape=shape)
+
+        ret = OrderedDict()
+        for n, i in enumerate(self.sections):
+            counts = OrderedDict([(e.name, float(buf[n, m]))
+                                  for m, e in enumerate(self.events)])
+            fp = [(e.weight, counts[e.name]) for e in self.events if e.weight]
+            if fp:
+                counts['flops'] = sum(w*v for w, v in fp)
+            if 'llc-misses' in counts:
+                counts['traffic'] = counts['llc-misses']*CACHE_LINE_SIZE
+            ret[i] = counts
+        return ret
+
+    # Pickling support
+    _pickle_kwargs = Timer._pickle_kwargs + ['events']
 
 
 class PerformanceSummary(OrderedDict):
@@ -284,11 +614,18 @@ class PerformanceSummary(OrderedDict):
     PerfKey = namedtuple('PerfKey', 'name rank')
     PerfInput = namedtuple('PerfInput', 'time ops points traffic sops itershapes')
     PerfEntry = namedtuple('PerfEntry', 'time gflopss gpointss oi ops itershapes')
+    PerfCounters = namedtuple('PerfCounters', 'gflopss oi ipc events')
+    CommKey = namedtuple('CommKey', 'function neighbour rank')
+    CommEntry = namedtuple('CommEntry', 'sent recv gather post wait scatter')
+    LoadEntry = namedtuple('LoadEntry', 'time compute comm')
 
     def __init__(self, *args, **kwargs):
         super(PerformanceSummary, self).__init__(*args, **kwargs)
         self.input = OrderedDict()
         self.globals = {}
+        self.timeline = None
+        self.counters = OrderedDict()
+        self.comms = OrderedDict()
 
     def add(self, name, rank, time,
             ops=None, points=None, traffic=None, sops=None, itershapes=None):
@@ -357,6 +694,97 @@ class PerformanceSummary(OrderedDict):
 
         self.globals['fdlike'] = self.PerfEntry(time, None, gpointss, None, None, None)
 
+    def add_counters(self, name, rank, events):
+        """
+        Add the hardware counters read for a given code section, that is a
+        mapper from event names to counts, and derive the measured GFlops/s,
+        operational intensity and instructions per cycle, where available.
+        """
+        k = self.PerfKey(name, rank)
+        if k not in self:
+            return
+        time = self[k].time
+
+        flops = events.get('flops')
+        traffic = events.get('traffic')
+        gflopss = flops/10**9/time if flops is not None else None
+        oi = flops/traffic if flops is not None and traffic else None
+        ipc = (events['instructions']/events['cycles']
+               if events.get('instructions') and events.get('cycles') else None)
+
+        self.counters[k] = self.PerfCounters(gflopss, oi, ipc, events)
+
+    def add_comms(self, function, neighbour, rank, sent=0, recv=0,
+                  gather=0., post=0., wait=0., scatter=0.):
+        """
+        Add the bytes sent to and received from the rank ``neighbour`` while
+        exchanging the halo of ``function``, as well as the time spent in the
+        gather/scatter copies, in posting the sends/receives and in waiting
+        for their completion. With MPI enabled, the data is "per-rank".
+        """
+        k = self.CommKey(function, neighbour, rank)
+        v = self.comms.get(k, self.CommEntry(0, 0, 0., 0., 0., 0.))
+        items = (sent, recv, gather, post, wait, scatter)
+        self.comms[k] = self.CommEntry(*[i + j for i, j in zip(v, items)])
+
+    def reduce_comms(self, by):
+        """
+        Aggregate the halo exchange data by ``by``, that is any of ``function``,
+        ``neighbour`` and ``rank``, or a tuple thereof.
+        """
+        by = (by,) if isinstance(by, str) else tuple(by)
+        ret = OrderedDict()
+        for k, v in self.comms.items():
+            key = tuple(getattr(k, i) for i in by)
+            key = key[0] if len(key) == 1 else key
+            ret[key] = self.CommEntry(*[i + j for i, j in
+                                        zip(ret.get(key, (0,)*len(v)), v)])
+        return ret
+
+    @property
+    def load_balance(self):
+        """
+        A mapper from ranks to the time spent in the profiled sections, split
+        into computation and halo exchanges.
+        """
+        ret = OrderedDict()
+        comms = self.reduce_comms('rank')
+        for k, v in self.items():
+            time = ret.get(k.rank, self.LoadEntry(0., 0., 0.)).time + v.time
+            ret[k.rank] = self.LoadEntry(time, 0., 0.)
+        for rank, v in ret.items():
+            comm = sum(comms.get(rank, ())[2:])
+            ret[rank] = self.LoadEntry(v.time, max(v.time - comm, 0.), comm)
+        return ret
+
+    @property
+    def imbalance(self):
+        """
+        The load imbalance across ranks, that is the ratio between the maximum
+        and the average computation time. A perfectly balanced run has
+        imbalance 1.
+        """
+        compute = [v.compute for v in self.load_balance.values()]
+        if not compute or not sum(compute):
+            return 1.
+        return max(compute)/(sum(compute)/len(compute))
+
+    def add_timeline(self, timeline):
+        """
+        Add the per-section timings sampled over the course of the run, as a
+        structured array with one entry per sampling window.
+        """
+        self.timeline = timeline
+
+    def save_timeline(self, filename):
+        """Export the timeline to ``filename`` in CSV format, e.g. for plotting."""
+        if self.timeline is None:
+            raise ValueError("No timeline available; was the Operator run with "
+                             "`configuration['profiling-timeline']` set?")
+        np.savetxt(str(filename), self.timeline, delimiter=',',
+                   header=','.join(self.timeline.dtype.names), comments='',
+                   fmt=['%d'] + ['%.9e']*(len(self.timeline.dtype.names) - 1))
+
     @property
     def gflopss(self):
         return OrderedDict([(k, v.gflopss) for k, v in self.items()])
@@ -370,6 +798,97 @@ class PerformanceSummary(OrderedDict):
         return OrderedDict([(k, v.time) for k, v in self.items()])
 
 
+class BuildProfile(object):
+
+    """
+    A hierarchical profile of an Operator build, covering all of the timed
+    passes (lowering, clusterization, DSE, scheduling, IET construction,
+    target-specific passes) as well as JIT compilation.
+
+    Parameters
+    ----------
+    nodes : list of dict
+        The top-level profiled regions, as recorded by a `timed_region`. Each
+        region is a dict with keys ``name``, ``start`` (absolute time, in
+        seconds), ``elapsed`` (in seconds) and ``children``.
+    """
+
+    def __init__(self, nodes=None):
+        self.nodes = list(nodes or [])
+
+    def __repr__(self):
+        lines = []
+
+        def _repr(node, depth):
+            lines.append("%s%s: %.3f s" % ('  '*depth, node['name'], node['elapsed']))
+            for i in node['children']:
+                _repr(i, depth + 1)
+
+        for i in self.nodes:
+            _repr(i, 0)
+        return '\n'.join(lines)
+
+    @property
+    def start(self):
+        return min([i['start'] for i in self.nodes], default=0.)
+
+    def add(self, name, tic, toc):
+        """Add a top-level region, timed by the caller."""
+        self.nodes.append({'name': name, 'start': tic, 'elapsed': toc - tic,
+                           'children': []})
+
+    def as_dict(self):
+        """
+        The profile as a list of nested dicts, with start times relative to the
+        beginning of the build.
+        """
+        start = self.start
+
+        def _as_dict(node):
+            return OrderedDict([('name', node['name']),
+                                ('start', node['start'] - start),
+                                ('elapsed', node['elapsed']),
+                                ('children', [_as_dict(i) for i in node['children']])])
+
+        return [_as_dict(i) for i in self.nodes]
+
+    def to_json(self, filename=None):
+        """
+        Export the profile in JSON format. If ``filename`` is provided, the
+        profile is also written to disk.
+        """
+        ret = json.dumps(self.as_dict(), indent=2)
+        if filename is not None:
+            with open(str(filename), 'w') as f:
+                f.write(ret)
+        return ret
+
+    def to_chrome_trace(self, filename=None):
+        """
+        Export the profile in the Chrome trace event format, which can be loaded
+        into ``chrome://tracing`` or Perfetto. If ``filename`` is provided, the
+        trace is also written to disk.
+        """
+        start = self.start
+        events = []
+
+        def _events(node):
+            events.append({'name': node['name'], 'ph': 'X', 'pid': 0, 'tid': 0,
+                           'ts': (node['start'] - start)*10**6,
+                           'dur': node['elapsed']*10**6})
+            for i in node['children']:
+                _events(i)
+
+        for i in self.nodes:
+            _events(i)
+
+        ret = json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
+        if filename is not None:
+            with open(str(filename), 'w') as f:
+                f.write(ret)
+        return ret
+
+
 def create_profile(name):
     """Create a new Profiler."""
     if configuration['log-level'] == 'DEBUG':
@@ -390,9 +909,12 @@ def create_profile(name):
 
 
 profiler_registry = {
+    'off': NoopProfiler,
     'basic': Profiler,
     'advanced': AdvancedProfiler,
-    'advisor': AdvisorProfiler
+    'advisor': AdvisorProfiler,
+    'perf': PerfEventProfiler,
+    'mpi': MPIProfiler
 }
 """Profiling levels."""
 
@@ -409,3 +931,93 @@ def locate_intel_advisor():
     except KeyError:
         warning("Requested `advisor` profiler, but ADVISOR_HOME isn't set")
         return None
+
+
+# Linux `perf_event` support
+
+PERF_TYPE_HARDWARE = 0
+PERF_TYPE_SOFTWARE = 1
+PERF_TYPE_RAW = 4
+
+PERF_FORMAT_TOTAL_TIME_ENABLED = 1 << 0
+PERF_FORMAT_TOTAL_TIME_RUNNING = 1 << 1
+
+PERF_ATTR_EXCLUDE_KERNEL = 1 << 5
+PERF_ATTR_EXCLUDE_HV = 1 << 6
+
+CACHE_LINE_SIZE = 64
+
+perf_event_open_nr = {'x86_64': 298, 'i386': 336, 'i686': 336,
+                      'aarch64': 241, 'ppc64': 319, 'ppc64le': 319}
+"""The `perf_event_open` syscall number on the supported architectures."""
+
+
+class PerfEventAttr(Structure):
+
+    """The leading fields of ``struct perf_event_attr``, as of ``PERF_ATTR_SIZE_VER0``."""
+
+    _fields_ = [('type', c_uint32), ('size', c_uint32), ('config', c_uint64),
+                ('sample_period', c_uint64), ('sample_type', c_uint64),
+                ('read_format', c_uint64), ('flags', c_uint64),
+                ('wakeup_events', c_uint32), ('bp_type', c_uint32),
+                ('config1', c_uint64)]
+
+
+PerfEvent = namedtuple('PerfEvent', 'name type config weight')
+"""
+A countable event. ``weight`` is the number of floating-point operations
+represented by one event occurrence; it is 0 if the event doesn't count
+floating-point operations.
+"""
+
+
+def perf_event_open(event, tid):
+    """
+    Open a counter for ``event`` on the thread ``tid``, counting in user space
+    only. Return the file descriptor, or -1 if the counter can't be opened.
+    """
+    try:
+        nr = perf_event_open_nr[machine()]
+    except KeyError:
+        return -1
+    attr = PerfEventAttr(type=event.type, size=64, config=event.config,
+                         read_format=(PERF_FORMAT_TOTAL_TIME_ENABLED |
+                                      PERF_FORMAT_TOTAL_TIME_RUNNING),
+                         flags=PERF_ATTR_EXCLUDE_KERNEL | PERF_ATTR_EXCLUDE_HV)
+    libc = CDLL(None, use_errno=True)
+    fd = libc.syscall(nr, byref(attr), c_int(tid), c_int(-1), c_int(-1), c_long(0))
+    if fd < 0:
+        debug("perf_event_open failed for `%s` [errno=%d]" % (event.name, get_errno()))
+    return fd
+
+
+@memoized_func
+def perf_events():
+    """
+    The events that can be counted on the underlying platform, that is cycles,
+    instructions, last-level cache misses and task-clock, plus, on Intel CPUs
+    from Broadwell onwards, the retired floating-point arithmetic instructions
+    (grouped by the number of operations per instruction).
+    """
+    candidates = [PerfEvent('cycles', PERF_TYPE_HARDWARE, 0, 0),
+                  PerfEvent('instructions', PERF_TYPE_HARDWARE, 1, 0),
+                  PerfEvent('llc-misses', PERF_TYPE_HARDWARE, 3, 0),
+                  PerfEvent('task-clock', PERF_TYPE_SOFTWARE, 1, 0)]
+
+    platform = configuration['platform']
+    if isinstance(platform, Intel64) and platform not in (SNB, IVB, HSW, KNL):
+        # FP_ARITH_INST_RETIRED (event 0xc7), by umask:
+        # scalar (0x03), 128b-packed-double (0x04), 128b-packed-single and
+        # 256b-packed-double (0x18), 256b-packed-single and 512b-packed-double
+        # (0x60), 512b-packed-single (0x80)
+        for umask, weight in [(0x03, 1), (0x04, 2), (0x18, 4), (0x60, 8), (0x80, 16)]:
+            candidates.append(PerfEvent('fp-arith-%d' % weight, PERF_TYPE_RAW,
+                                        (umask << 8) | 0xc7, weight))
+
+    events = []
+    for i in candidates:
+        fd = perf_event_open(i, 0)
+        if fd >= 0:
+            os.close(fd)
+            events.append(i)
+    return tuple(events)
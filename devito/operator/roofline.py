@@ -0,0 +1,284 @@
+"""
+Roofline analysis of profiled Operators.
+
+The machine peaks -- the sustainable memory bandwidth and floating-point
+throughput -- are measured once, through Devito Operators, and cached per
+host. Each section of a PerformanceSummary can then be placed on the
+roofline defined by such peaks.
+"""
+
+from collections import OrderedDict, namedtuple
+from socket import gethostname
+from uuid import uuid4
+import json
+import os
+
+import numpy as np
+
+from devito.logger import debug, perf
+from devito.mpi import MPI
+from devito.parameters import configuration, switchconfig
+from devito.tools import make_tempdir
+
+__all__ = ['MachinePeaks', 'Roofline', 'machine_peaks']
+
+
+MachinePeaks = namedtuple('MachinePeaks', 'bandwidth gflopss')
+"""The sustainable memory bandwidth (GB/s) and floating-point throughput (GFlops/s)."""
+
+
+def _peaks_key(dtype):
+    nthreads = os.environ.get('OMP_NUM_THREADS') if configuration['openmp'] else 1
+    return ':'.join([gethostname(), str(configuration['platform']),
+                     str(configuration['compiler']), str(nthreads or 'default'),
+                     np.dtype(dtype).name])
+
+
+def _peaks_path():
+    return make_tempdir('roofline').joinpath('peaks.json')
+
+
+def machine_peaks(dtype=np.float32, refresh=False, size=2**24, repeats=5):
+    """
+    The MachinePeaks of the underlying host, measured through Devito Operators
+    and cached on disk.
+
+    Parameters
+    ----------
+    dtype : data-type, optional
+        The data type of the measurement kernels. Defaults to ``np.float32``.
+    refresh : bool, optional
+        If True, ignore any cached peaks and measure them again.
+    size : int, optional
+        The number of points of the arrays in the bandwidth kernel. It should
+        be large enough that the arrays don't fit in the last-level cache.
+    repeats : int, optional
+        The number of runs of each kernel; the best run is retained.
+
+    Notes
+    -----
+    The bandwidth is measured as in the STREAM triad, ``a = b + s*c``, so the
+    traffic due to write-allocate is not accounted for. The floating-point
+    throughput is measured through a cache-resident polynomial evaluation, so
+    it is the peak attainable by Devito-generated code, rather than the
+    theoretical peak of the machine.
+    """
+    key = _peaks_key(dtype)
+    path = _peaks_path()
+    try:
+        with open(str(path), 'r') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        cache = {}
+
+    if key in cache and not refresh:
+        return MachinePeaks(*cache[key])
+
+    peaks = MachinePeaks(_measure_bandwidth(dtype, size, repeats),
+                         _measure_gflopss(dtype, repeats))
+    perf("Measured machine peaks: %.2f GB/s, %.2f GFlops/s" % peaks)
+
+    cache[key] = list(peaks)
+    tmpfile = path.with_suffix('.%s.tmp' % uuid4().hex)
+    with open(str(tmpfile), 'w') as f:
+        json.dump(cache, f, indent=1)
+    os.replace(str(tmpfile), str(path))
+
+    return peaks
+
+
+def _best_time(op, repeats, **kwargs):
+    # The C-level section timings, so the Python overhead isn't accounted for
+    return min(sum(op.apply(**kwargs).timings.values()) for _ in range(repeats))
+
+
+@switchconfig(profiling='basic', profiling_timeline=0)
+def _measure_bandwidth(dtype, size, repeats):
+    import devito as dv
+
+    comm = MPI.COMM_SELF if configuration['mpi'] else None
+    grid = dv.Grid(shape=(size,), dtype=dtype, comm=comm)
+    a = dv.Function(name='a', grid=grid)
+    b = dv.Function(name='b', grid=grid)
+    c = dv.Function(name='c', grid=grid)
+    s = dv.Constant(name='s', dtype=dtype, value=3.)
+    b.data[:] = 1.
+    c.data[:] = 2.
+
+    op = dv.Operator(dv.Eq(a, b + s*c), name='stream_triad')
+    op.apply()  # Warm up (jit-compilation, page faults)
+    elapsed = _best_time(op, repeats)
+
+    traffic = 3*size*np.dtype(dtype).itemsize
+    debug("STREAM triad: %d points in %.6f s" % (size, elapsed))
+    return traffic/elapsed/10**9
+
+
+@switchconfig(profiling='basic', profiling_timeline=0)
+def _measure_gflopss(dtype, repeats, width=32, depth=4, nt=200):
+    import devito as dv
+    from devito.types import Scalar
+
+    # A cache-resident working set per core, to make the kernel compute-bound
+    npoints = 8192*(configuration['platform'].cores_physical
+                    if configuration['openmp'] else 1)
+    comm = MPI.COMM_SELF if configuration['mpi'] else None
+    grid = dv.Grid(shape=(npoints,), dtype=dtype, comm=comm)
+    u = dv.TimeFunction(name='u', grid=grid)
+    c = dv.Constant(name='c', dtype=dtype, value=.25)
+    cs = [dv.Constant(name='c%d' % i, dtype=dtype, value=.5) for i in range(width)]
+
+    # `width` independent chains of multiply-adds, so that the kernel isn't
+    # latency-bound. Each chain step goes through a scalar temporary, as deeply
+    # nested expressions are expensive to lower. The coefficients are Constants,
+    # so that nothing can be simplified symbolically. The iteration is
+    # contractive, so the values stay bounded
+    dims = (grid.time_dim,) + grid.dimensions
+    eqns = []
+    chains = [u]*width
+    for i in range(depth):
+        temps = [Scalar(name='r%d_%d' % (j, i), dtype=dtype) for j in range(width)]
+        eqns.extend(dv.Eq(r, v*cs[j] + c, implicit_dims=dims)
+                    for j, (r, v) in enumerate(zip(temps, chains)))
+        chains = temps
+    eqns.append(dv.Eq(u.forward, sum(chains)/width))
+
+    op = dv.Operator(eqns, name='peak_flops')
+    op.apply(time_M=0)  # Warm up
+    elapsed = _best_time(op, repeats, time_M=nt-1)
+
+    flops = (2*depth + 1)*width*npoints*nt
+    debug("Multiply-add chains: %d flops in %.6f s" % (flops, elapsed))
+    return flops/elapsed/10**9
+
+
+class Roofline(object):
+
+    """
+    The sections of a PerformanceSummary placed on the roofline.
+
+    Parameters
+    ----------
+    summary : PerformanceSummary
+        The performance data, as produced by an Operator run with (at least)
+        ``configuration['profiling'] = 'advanced'``.
+    peaks : MachinePeaks, optional
+        The machine peaks. Defaults to the (cached) measured ones.
+    dtype : data-type, optional
+        The data type used to retrieve the measured peaks, if ``peaks`` isn't
+        provided. Defaults to ``np.float32``.
+
+    Notes
+    -----
+    For each section, the attainable performance is ``min(gflopss, oi*bandwidth)``,
+    with ``gflopss`` and ``bandwidth`` the machine peaks. A section is
+    memory-bound if its operational intensity (OI) is lower than the ridge
+    point, ``gflopss/bandwidth``, and compute-bound otherwise. The headroom is
+    the ratio between attainable and achieved performance. With hardware
+    counters available (``profiling='perf'``), the measured OI and GFlops/s
+    are reported too.
+    """
+
+    RooflineEntry = namedtuple('RooflineEntry', 'name rank oi gflopss attainable '
+                                                'headroom bound measured_oi '
+                                                'measured_gflopss')
+
+    def __init__(self, summary, peaks=None, dtype=np.float32):
+        self.peaks = peaks or machine_peaks(dtype)
+
+        self.entries = []
+        for k, v in summary.items():
+            if not v.oi or not v.gflopss:
+                # E.g., `basic` profiling or unexecuted sections
+                continue
+            attainable = min(self.peaks.gflopss, v.oi*self.peaks.bandwidth)
+            bound = 'memory' if v.oi < self.ridge else 'compute'
+            counters = getattr(summary, 'counters', {}).get(k)
+            self.entries.append(self.RooflineEntry(
+                k.name, k.rank, v.oi, v.gflopss, attainable, attainable/v.gflopss,
+                bound, getattr(counters, 'oi', None), getattr(counters, 'gflopss', None)
+            ))
+        if not self.entries:
+            raise ValueError("No sections with operational intensity; was the "
+                             "Operator run with `profiling='advanced'`?")
+
+    @property
+    def ridge(self):
+        """The OI at which the memory and compute roofs intersect."""
+        return self.peaks.gflopss/self.peaks.bandwidth
+
+    def __repr__(self):
+        lines = ["Roofline [%.2f GB/s, %.2f GFlops/s, ridge at OI=%.2f]" %
+                 (self.peaks.bandwidth, self.peaks.gflopss, self.ridge)]
+        for i in self.entries:
+            name = i.name if i.rank is None else "%s[rank%d]" % (i.name, i.rank)
+            line = ("* %s: OI=%.2f, %.2f GFlops/s (%.1f %% of %.2f attainable, "
+                    "%.2fx headroom), %s-bound" %
+                    (name, i.oi, i.gflopss, 100/i.headroom, i.attainable,
+                     i.headroom, i.bound))
+            if i.measured_oi is not None:
+                line += " [measured OI=%.2f]" % i.measured_oi
+            lines.append(line)
+        return "\n".join(lines)
+
+    def as_dict(self):
+        return OrderedDict([
+            ('peaks', OrderedDict(self.peaks._asdict())),
+            ('ridge', self.ridge),
+            ('sections', [OrderedDict(i._asdict()) for i in self.entries])
+        ])
+
+    def to_json(self, filename=None):
+        """
+        Serialize the Roofline in JSON format. If ``filename`` is provided,
+        the JSON is written to file; otherwise, it is returned as a string.
+        """
+        ret = json.dumps(self.as_dict(), indent=2)
+        if filename is None:
+            return ret
+        with open(str(filename), 'w') as f:
+            f.write(ret)
+
+    def to_text(self, filename=None):
+        """
+        A human-readable report. If ``filename`` is provided, the report is
+        written to file; otherwise, it is returned as a string.
+        """
+        ret = repr(self)
+        if filename is None:
+            return ret
+        with open(str(filename), 'w') as f:
+            f.write(ret + "\n")
+
+    def to_png(self, filename, title=None):
+        """Plot the Roofline to ``filename``. Requires Matplotlib."""
+        try:
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+        except ImportError:
+            raise ImportError("To plot the roofline, make sure to have the "
+                              "Matplotlib package installed")
+
+        ois = [i.oi for i in self.entries]
+        ois.extend(i.measured_oi for i in self.entries if i.measured_oi)
+        xmin = min(ois + [self.ridge])/4
+        xmax = max(ois + [self.ridge])*4
+        x = np.logspace(np.log10(xmin), np.log10(xmax), 256)
+
+        fig, ax = plt.subplots()
+        ax.loglog(x, np.minimum(self.peaks.gflopss, x*self.peaks.bandwidth), 'k-')
+        for i in self.entries:
+            name = i.name if i.rank is None else "%s[rank%d]" % (i.name, i.rank)
+            ax.loglog(i.oi, i.gflopss, 'o', label=name)
+            ax.annotate("%.0f%%" % (100/i.headroom), (i.oi, i.gflopss),
+                        textcoords='offset points', xytext=(4, 4), size=7)
+            if i.measured_oi:
+                ax.loglog(i.measured_oi, i.measured_gflopss or i.gflopss, 'x',
+                          color=ax.lines[-1].get_color())
+        ax.set_xlabel("Operational intensity (Flops/Byte)")
+        ax.set_ylabel("Performance (GFlops/s)")
+        ax.set_title(title or "Roofline [%.2f GB/s, %.2f GFlops/s]" % self.peaks)
+        ax.legend(loc='lower right', fontsize=7)
+        fig.savefig(str(filename), bbox_inches='tight')
+        plt.close(fig)
@@ -111,17 +111,25 @@ env_vars_mapper = {
     'DEVITO_ARCH': 'compiler',
     'DEVITO_PLATFORM': 'platform',
     'DEVITO_PROFILING': 'profiling',
+    'DEVITO_PROFILING_TIMELINE': 'profiling-timeline',
+    'DEVITO_PROFILING_TIMELINE_SIZE': 'profiling-timeline-size',
     'DEVITO_BACKEND': 'backend',
     'DEVITO_DEVELOP': 'develop-mode',
     'DEVITO_DSE': 'dse',
     'DEVITO_DLE': 'dle',
     'DEVITO_OPENMP': 'openmp',
     'DEVITO_MPI': 'mpi',
+    'DEVITO_MPI_LINK_WEIGHTS': 'mpi-link-weights',
+    'DEVITO_INJECTION_COLOURING': 'injection-colouring',
     'DEVITO_AUTOTUNING': 'autotuning',
+    'DEVITO_AUTOTUNING_DB': 'autotuning-db',
     'DEVITO_LOGGING': 'log-level',
     'DEVITO_FIRST_TOUCH': 'first-touch',
     'DEVITO_DEBUG_COMPILER': 'debug-compiler',
     'DEVITO_JIT_BACKDOOR': 'jit-backdoor',
+    'DEVITO_JIT_CACHE_DIR': 'jit-cache-dir',
+    'DEVITO_JIT_CACHE_SIZE': 'jit-cache-size',
+    'DEVITO_BUILD_CACHE': 'build-cache',
     'DEVITO_IGNORE_UNKNOWN_PARAMS': 'ignore-unknowns'
 }
 
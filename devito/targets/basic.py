@@ -100,6 +100,8 @@ def iet_lower(iet, mode='advanced', options=None):
     options : dict, optional
         - ``openmp``: Enable/disable OpenMP. Defaults to `configuration['openmp']`.
         - ``mpi``: Enable/disable MPI. Defaults to `configuration['mpi']`.
+        - ``profiling``: The profiling level. With ``mpi``, the halo exchanges
+                         are instrumented. Defaults to `configuration['profiling']`.
         - ``blockinner``: Enable/disable blocking of innermost loops. By default,
                           this is disabled to maximize SIMD vectorization. Pass True
                           to override this heuristic.
@@ -125,6 +127,7 @@ def iet_lower(iet, mode='advanced', options=None):
     params['blocklevels'] = configuration['dle-options'].get('blocklevels', None)
     params['openmp'] = configuration['openmp']
     params['mpi'] = configuration['mpi']
+    params['profiling'] = configuration['profiling']
 
     # Parse input options (potentially replacing defaults)
     for k, v in (options or {}).items():
@@ -7,8 +7,8 @@ from collections import OrderedDict
 
 import cgen as c
 
-from devito.ir import (ArrayCast, Element, Expression, List, LocalExpression,
-                       FindNodes, MapExprStmts, Transformer)
+from devito.ir import (ArrayCast, Element, Expression, Iteration, List,
+                       LocalExpression, FindNodes, MapExprStmts, Transformer)
 from devito.symbolics import ccode
 from devito.targets.common.engine import target_pass
 from devito.tools import flatten
@@ -156,9 +156,10 @@ class DataManager(object):
         """
         # Make the generated code less verbose: if a non-Array parameter does not
         # appear in any Expression, that is, if the parameter is merely propagated
-        # down to another Call, then there's no need to cast it
-        exprs = FindNodes(Expression).visit(iet)
-        need_cast = {i for i in set().union(*[i.functions for i in exprs]) if i.is_Tensor}
+        # down to another Call, then there's no need to cast it. The Iterations
+        # are searched too, as their bounds may be read from arrays
+        nodes = FindNodes(Expression).visit(iet) + FindNodes(Iteration).visit(iet)
+        need_cast = {i for i in set().union(*[i.functions for i in nodes]) if i.is_Tensor}
         need_cast.update({i for i in iet.parameters if i.is_Array})
 
         casts = tuple(ArrayCast(i) for i in iet.parameters if i in need_cast)
@@ -2,7 +2,7 @@ from devito.ir.iet import (Call, HaloSpot, Iteration, List, FindAdjacent,
                            FindNodes, MapNodes, Transformer, retrieve_iteration_tree)
 from devito.ir.support import PARALLEL
 from devito.logger import perf_adv
-from devito.mpi import HaloExchangeBuilder, HaloScheme
+from devito.mpi import HaloExchangeBuilder, HaloScheme, MPIStats
 from devito.targets.common.engine import target_pass
 from devito.tools import generator
 
@@ -117,20 +117,25 @@ def optimize_halospots(iet):
 def mpiize(iet, **kwargs):
     """
     Add MPI routines performing halo exchanges to emit distributed-memory
-    parallel code.
+    parallel code. With ``profiling=True``, the halo exchanges are instrumented
+    to gather bytes and time spent in communication into an MPIStats object.
     """
     mode = kwargs.pop('mode')
+    profiling = kwargs.pop('profiling', False)
 
     # To produce unique object names
     generators = {'msg': generator(), 'comm': generator(), 'comp': generator()}
-    sync_heb = HaloExchangeBuilder('basic', **generators)
-    user_heb = HaloExchangeBuilder(mode, **generators)
+    stats = MPIStats(name='mpistats') if profiling else None
+    sync_heb = HaloExchangeBuilder('basic', stats=stats, **generators)
+    user_heb = HaloExchangeBuilder(mode, stats=stats, **generators)
     mapper = {}
     for hs in FindNodes(HaloSpot).visit(iet):
         heb = user_heb if hs.is_Overlappable else sync_heb
         mapper[hs] = heb.make(hs)
     efuncs = sync_heb.efuncs + user_heb.efuncs
     objs = sync_heb.objs + user_heb.objs
+    if stats is not None and stats.nentries > 0:
+        objs.append(stats)
     iet = Transformer(mapper, nested=True).visit(iet)
 
     # Must drop the PARALLEL tag from the Iterations within which halo
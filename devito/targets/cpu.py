@@ -49,7 +49,8 @@ class CPU64Target(CPU64NoopTarget):
         avoid_denormals(graph)
         optimize_halospots(graph)
         if self.params['mpi']:
-            mpiize(graph, mode=self.params['mpi'])
+            mpiize(graph, mode=self.params['mpi'],
+                   profiling=self.params['profiling'] == 'mpi')
         self.blocker.make_blocking(graph)
         self.ompizer.make_simd(graph, simd_reg_size=self.platform.simd_reg_size)
         if self.params['openmp']:
@@ -90,7 +91,8 @@ class CustomTarget(CPU64Target):
             'wrapping': partial(loop_wrapping),
             'blocking': partial(self.blocker.make_blocking),
             'openmp': partial(self.ompizer.make_parallel),
-            'mpi': partial(mpiize, mode=self.params['mpi']),
+            'mpi': partial(mpiize, mode=self.params['mpi'],
+                           profiling=self.params['profiling'] == 'mpi'),
             'simd': partial(self.ompizer.make_simd,
                             simd_reg_size=self.platform.simd_reg_size),
             'minrem': partial(minimize_remainders,
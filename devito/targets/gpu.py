@@ -147,7 +147,8 @@ class DeviceOffloadingTarget(Target):
         # Optimization and parallelism
         optimize_halospots(graph)
         if self.params['mpi']:
-            mpiize(graph, mode=self.params['mpi'])
+            mpiize(graph, mode=self.params['mpi'],
+                   profiling=self.params['profiling'] == 'mpi')
         if self.params['openmp']:
             self.ompizer.make_parallel(graph)
         hoist_prodders(graph)
@@ -106,6 +106,12 @@ class timed_pass(object):
     Python threads compiling multiple Operators in parallel.
     """
 
+    stacks = {}
+    """
+    A ``thread_id -> stack`` mapper. The stack tracks the timed passes currently
+    running, so that nested passes are recorded hierarchically.
+    """
+
     def __init__(self, func, name=None):
         self.func = func
         self.name = name
@@ -114,17 +120,37 @@ class timed_pass(object):
     def is_enabled(cls):
         return isinstance(cls.timings.get(get_ident()), dict)
 
+    @classmethod
+    def record(cls, name, tic, toc):
+        """
+        Record a pass, timed by the caller, within the innermost running pass.
+        Nothing is recorded outside a `timed_region`.
+        """
+        if not cls.is_enabled():
+            return
+        node = {'name': name, 'start': tic, 'elapsed': toc - tic, 'children': []}
+        cls.stacks[get_ident()][-1]['children'].append(node)
+
     def __call__(self, *args, **kwargs):
         timings = timed_pass.timings.get(get_ident())
         if not isinstance(timings, dict):
             raise ValueError("Attempting to use `timed_pass` outside a `timed_region`")
-        tic = time()
-        retval = self.func(*args, **kwargs)
-        toc = time()
         if self.name is not None:
             key = self.name
         else:
             key = self.func.__name__
+        stack = timed_pass.stacks[get_ident()]
+        node = {'name': key, 'start': None, 'elapsed': None, 'children': []}
+        stack[-1]['children'].append(node)
+        stack.append(node)
+        tic = time()
+        try:
+            retval = self.func(*args, **kwargs)
+        finally:
+            toc = time()
+            stack.pop()
+        node['start'] = tic
+        node['elapsed'] = toc - tic
         timings[key] = toc - tic
         return retval
 
@@ -141,6 +167,10 @@ class timed_region(object):
 
     """
     A context manager for code regions in which the `timed_pass` decorator is used.
+
+    Besides the flat ``timings`` of the passes, the region records a hierarchical
+    profile, ``root``, as a tree of dicts with keys ``name``, ``start`` (absolute
+    time, in seconds), ``elapsed`` (in seconds) and ``children``.
     """
 
     def __init__(self, name):
@@ -150,10 +180,15 @@ class timed_region(object):
         if isinstance(timed_pass.timings.get(get_ident()), dict):
             raise ValueError("Cannot nest `timed_region`")
         self.timings = OrderedDict()
-        timed_pass.timings[get_ident()] = self.timings
         self.tic = time()
+        self.root = {'name': self.name, 'start': self.tic, 'elapsed': None,
+                     'children': []}
+        timed_pass.timings[get_ident()] = self.timings
+        timed_pass.stacks[get_ident()] = [self.root]
         return self
 
     def __exit__(self, *args):
         self.timings[self.name] = time() - self.tic
+        self.root['elapsed'] = self.timings[self.name]
         del timed_pass.timings[get_ident()]
+        del timed_pass.stacks[get_ident()]
@@ -620,6 +620,14 @@ class DiscreteFunction(AbstractFunction, ArgProvider):
         A ctypes object representing the DiscreteFunction that can be passed to
         an Operator.
         """
+        # Reuse the most recently created dataobj, unless `data` has changed
+        key = (data.ctypes.data, data.shape)
+        try:
+            if self._C_dataobj[0] == key:
+                return self._C_dataobj[1]
+        except AttributeError:
+            pass
+
         dataobj = byref(self._C_ctype._type_())
         dataobj._obj.data = data.ctypes.data_as(c_void_p)
         dataobj._obj.size = (c_int*self.ndim)(*data.shape)
@@ -630,6 +638,9 @@ class DiscreteFunction(AbstractFunction, ArgProvider):
         dataobj._obj.hsize = (c_int*(self.ndim*2))(*flatten(self._size_halo))
         dataobj._obj.hofs = (c_int*(self.ndim*2))(*flatten(self._offset_halo))
         dataobj._obj.oofs = (c_int*(self.ndim*2))(*flatten(self._offset_owned))
+
+        self._C_dataobj = (key, dataobj)
+
         return dataobj
 
     def _C_as_ndarray(self, dataobj):
@@ -13,7 +13,7 @@ from devito.types.basic import Symbol, DataSymbol, Scalar
 
 __all__ = ['Dimension', 'SpaceDimension', 'TimeDimension', 'DefaultDimension',
            'SteppingDimension', 'SubDimension', 'ConditionalDimension', 'dimensions',
-           'ModuloDimension', 'IncrDimension']
+           'ModuloDimension', 'IncrDimension', 'ColouredDimension']
 
 
 class Dimension(ArgProvider):
@@ -98,6 +98,7 @@ class Dimension(ArgProvider):
     is_Stepping = False
     is_Modulo = False
     is_Incr = False
+    is_Coloured = False
 
     _C_typename = 'const %s' % dtype_to_cstr(np.int32)
     _C_typedata = _C_typename
@@ -946,6 +947,84 @@ class IncrDimension(DerivedDimension):
     _pickle_kwargs = ['name']
 
 
+class ColouredDimension(DerivedDimension):
+
+    """
+    Dimension symbol representing the points of a given ``parent`` Dimension
+    belonging to the same colour. The colours are iterated over by the
+    Dimension ``colour``; the points of colour ``c`` are ``offsets[c], ...,
+    offsets[c] + sizes[c] - 1``.
+
+    Parameters
+    ----------
+    name : str
+        Name of the dimension.
+    parent : Dimension
+        The Dimension from which the ColouredDimension is derived.
+    colour : Dimension
+        The Dimension iterating over the colours.
+    offsets : Function
+        The first point of each colour.
+    sizes : Function
+        The number of points of each colour.
+
+    Notes
+    -----
+    The colouring is a promise to the compiler: the increments performed by
+    the points of the same colour, including those performed within nested
+    iteration spaces, never hit the same memory location. Thus, any such
+    increment carries dependences along ``colour`` only, and no atomic
+    updates are necessary to parallelize the ColouredDimension.
+
+    This type should not be instantiated directly in user code.
+    """
+
+    is_Coloured = True
+
+    def __init_finalize__(self, name, parent, colour, offsets, sizes):
+        super().__init_finalize__(name, parent)
+        self._colour = colour
+        self._offsets = offsets
+        self._sizes = sizes
+
+    @property
+    def colour(self):
+        return self._colour
+
+    @property
+    def offsets(self):
+        return self._offsets
+
+    @property
+    def sizes(self):
+        return self._sizes
+
+    @cached_property
+    def symbolic_min(self):
+        return self.offsets[self.colour]
+
+    @cached_property
+    def symbolic_max(self):
+        return self.offsets[self.colour] + self.sizes[self.colour] - 1
+
+    def _arg_defaults(self, **kwargs):
+        """
+        A ColouredDimension provides no arguments, so this method returns an
+        empty dict.
+        """
+        return {}
+
+    def _arg_values(self, *args, **kwargs):
+        """
+        A ColouredDimension provides no arguments, so there are no argument
+        values to be derived.
+        """
+        return {}
+
+    # Pickling support
+    _pickle_args = DerivedDimension._pickle_args + ['colour', 'offsets', 'sizes']
+
+
 def dimensions(names):
     assert type(names) == str
     return tuple(Dimension(i) for i in names.split())
@@ -47,6 +47,17 @@ class Grid(ArgProvider):
     comm : MPI communicator, optional
         The set of processes over which the grid is distributed. Only relevant in
         case of MPI execution.
+    topology : tuple of ints, optional
+        The number of MPI processes along each Dimension. Only relevant in case
+        of MPI execution. Defaults to the topology minimizing the halo volume
+        per process.
+    decomposition : tuple or array_like or Function, optional
+        How each Dimension is split over the MPI processes. Only relevant in
+        case of MPI execution. Either one entry per Dimension, being None or the
+        global indices at which the second, third, ... subdomains begin; or a
+        per-point cost, such that the resulting subdomains carry approximately
+        the same cost. Defaults to subdomains of near-equal size. For more
+        information, refer to ``Distributor.__doc__``.
 
     Examples
     --------
@@ -98,7 +109,7 @@ class Grid(ArgProvider):
 
     def __init__(self, shape, extent=None, origin=None, dimensions=None,
                  time_dimension=None, dtype=np.float32, subdomains=None,
-                 comm=None):
+                 comm=None, topology=None, decomposition=None):
         self._shape = as_tuple(shape)
         self._extent = as_tuple(extent or tuple(1. for _ in self.shape))
         self._dtype = dtype
@@ -138,7 +149,10 @@ class Grid(ArgProvider):
         else:
             raise ValueError("`time_dimension` must be None or of type TimeDimension")
 
-        self._distributor = Distributor(self.shape, self.dimensions, comm)
+        self._topology = topology
+        self._decomposition = decomposition
+        self._distributor = Distributor(self.shape, self.dimensions, comm, topology,
+                                        decomposition)
 
     def __repr__(self):
         return "Grid[extent=%s, shape=%s, dimensions=%s]" % (
@@ -287,7 +301,9 @@ class Grid(ArgProvider):
     def __setstate__(self, state):
         for k, v in state.items():
             setattr(self, k, v)
-        self._distributor = Distributor(self.shape, self.dimensions)
+        self._distributor = Distributor(self.shape, self.dimensions,
+                                        topology=self._topology,
+                                        decomposition=self._decomposition)
 
 
 class SubDomain(object):
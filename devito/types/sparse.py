@@ -1,4 +1,5 @@
 from collections import OrderedDict
+from functools import wraps
 from itertools import product
 
 import sympy
@@ -8,11 +9,13 @@ from cached_property import cached_property
 from devito.finite_differences import Differentiable, generate_fd_shortcuts
 from devito.logger import warning
 from devito.mpi import MPI, SparseDistributor
+from devito.parameters import configuration
 from devito.symbolics import INT, cast_mapper, indexify, retrieve_function_carriers
 from devito.tools import (ReducerMap, flatten, prod, powerset,
                           filter_ordered, memoized_meth)
 from devito.types.dense import DiscreteFunction, Function, SubFunction
-from devito.types.dimension import Dimension, ConditionalDimension, DefaultDimension
+from devito.types.dimension import (Dimension, ConditionalDimension, DefaultDimension,
+                                    ColouredDimension)
 from devito.types.basic import Symbol, Scalar
 from devito.types.equation import Eq, Inc
 
@@ -20,6 +23,206 @@ __all__ = ['SparseFunction', 'SparseTimeFunction', 'PrecomputedSparseFunction',
            'PrecomputedSparseTimeFunction']
 
 
+def _cached_on_position(func):
+    """
+    Decorator caching the value computed by a method of an AbstractSparseFunction
+    until the data determining the position of its sparse points changes.
+    """
+    key = func.__name__
+
+    @wraps(func)
+    def wrapper(self):
+        position = self._position
+        snapshot, cache = self.__dict__.get('_position_cache', (None, None))
+        if snapshot is None or not np.array_equal(snapshot, position):
+            snapshot, cache = np.array(position), {}
+            self._position_cache = (snapshot, cache)
+        if key not in cache:
+            cache[key] = func(self)
+        return cache[key]
+    return wrapper
+
+
+def _clip_support(gridpoints, weights, lower, upper):
+    """
+    Restrict the support of the sparse points to the grid points within
+    ``[lower, upper]`` along each Dimension.
+
+    Parameters
+    ----------
+    gridpoints : np.ndarray
+        The first grid point of the support of each sparse point, of shape
+        ``(npoint, grid.dim)``.
+    weights : np.ndarray
+        The weights of the ``r`` grid points of the support of each sparse point
+        along each Dimension, of shape ``(npoint, grid.dim, r)``.
+    lower : array_like
+        The lowest accessible grid point along each Dimension.
+    upper : array_like
+        The highest accessible grid point along each Dimension.
+
+    Returns
+    -------
+    The gridpoints and the weights, such that all grid points in the support
+    lie within ``[lower, upper]``. The weights of the grid points falling
+    outside of ``[lower, upper]`` are zero.
+    """
+    lower = np.asarray(lower)[:, None]
+    upper = np.asarray(upper)[:, None]
+    r = weights.shape[-1]
+
+    # Zero the weights of the inaccessible grid points
+    index = gridpoints[..., None] + np.arange(r)
+    weights = np.where((index >= lower) & (index <= upper), weights, 0)
+
+    # Shift the support, along with its weights, within the accessible region
+    shifted = np.clip(gridpoints, lower[:, 0], upper[:, 0] - r + 1)
+    index = (shifted - gridpoints)[..., None] + np.arange(r)
+    weights = np.where((index >= 0) & (index < r),
+                       np.take_along_axis(weights, np.clip(index, 0, r - 1), axis=-1), 0)
+
+    return shifted, weights
+
+
+def _linear_weights(distance, r):
+    if r != 2:
+        raise ValueError("Linear interpolation requires `r=2`")
+    return np.stack([1 - distance, distance], axis=-1)
+
+
+def _lagrange_weights(distance, r):
+    # The Lagrange basis polynomials over the `r` grid points in the support,
+    # at unit distance, evaluated at the sparse points
+    nodes = np.arange(r)
+    diff = distance[..., None] - nodes
+    numerator = np.repeat(diff[..., None, :], r, axis=-2)
+    numerator[..., nodes, nodes] = 1
+    denominator = np.prod(np.where(np.eye(r, dtype=bool), 1, nodes[:, None] - nodes),
+                          axis=-1)
+    return np.prod(numerator, axis=-1)/denominator
+
+
+_kaiser_beta = {2: 2.94, 3: 4.53, 4: 4.14, 5: 5.26, 6: 6.40, 7: 7.51, 8: 8.56,
+                9: 9.56, 10: 10.64}
+"""
+The shape parameter of the Kaiser window, for each half-width of the support,
+as tabulated in:
+
+    Hicks, G. J. (2002). Arbitrary source and receiver positioning in
+    finite-difference schemes using Kaiser windowed sinc functions.
+    Geophysics, 67(1), 156-165.
+"""
+
+
+def _sinc_weights(distance, r):
+    halfwidth, odd = divmod(r, 2)
+    if odd or halfwidth not in _kaiser_beta:
+        raise ValueError("Sinc interpolation requires an even `r` in [%d, %d]"
+                         % (2*min(_kaiser_beta), 2*max(_kaiser_beta)))
+    beta = _kaiser_beta[halfwidth]
+    # The sinc centred at the sparse points, tapered by a Kaiser window
+    # spanning the support
+    x = distance[..., None] - np.arange(r)
+    window = np.i0(beta*np.sqrt(np.maximum(1 - (x/halfwidth)**2, 0)))/np.i0(beta)
+    return np.sinc(x)*window
+
+
+_interpolation_schemes = {
+    'linear': _linear_weights,
+    'lagrange': _lagrange_weights,
+    'sinc': _sinc_weights
+}
+"""
+The interpolation schemes whose weights can be precomputed. Each maps the
+distance of the sparse points from the first grid point of their support, in
+units of grid spacing, to the weights of the ``r`` grid points in the support.
+"""
+
+
+def _precompute_weights(grid, coords, r, interpolation):
+    """
+    Compute, through the interpolation scheme ``interpolation``, the first grid
+    point of the support of each sparse point, as well as the weights of the
+    ``r`` grid points in the support along each Dimension.
+
+    Parameters
+    ----------
+    grid : Grid
+        The computational domain.
+    coords : np.ndarray
+        The coordinates of the sparse points, of shape ``(npoint, grid.dim)``.
+    r : int
+        The number of grid points in the support along each Dimension.
+    interpolation : str
+        The interpolation scheme. Allowed values are 'linear', 'lagrange'
+        and 'sinc'.
+    """
+    try:
+        scheme = _interpolation_schemes[interpolation]
+    except KeyError:
+        raise ValueError("Unknown interpolation scheme `%s`; allowed values are %s"
+                         % (interpolation, sorted(_interpolation_schemes)))
+
+    coords = np.asarray(coords).reshape(-1, grid.dim)
+    origin = np.array([o.data for o in grid.origin], dtype=coords.dtype)
+    spacing = np.array([i.spacing.data for i in grid.dimensions], dtype=coords.dtype)
+
+    # The support is centred on the sparse points. As in the code generated for
+    # the SparseFunctions, the distance from the reference grid point is
+    # normalized by the grid spacing
+    gridpoints = np.floor((coords - origin)/spacing - r/2) + 1
+    distance = (coords - origin - gridpoints*spacing)/spacing
+
+    return gridpoints.astype(np.int32), scheme(distance, r)
+
+
+def _colour_support(gridpoints, r):
+    """
+    Partition the sparse points into colours, such that the supports of any two
+    sparse points of the same colour are disjoint.
+
+    Parameters
+    ----------
+    gridpoints : np.ndarray
+        The first grid point of the support of each sparse point, of shape
+        ``(npoint, dim)``.
+    r : int
+        The number of grid points in the support along each Dimension.
+
+    Returns
+    -------
+    The sparse points sorted by colour, as well as the offset, within such
+    ordering, and the number of sparse points of each colour.
+
+    Notes
+    -----
+    The grid is tiled into blocks of ``r - 1`` grid points along each Dimension.
+    Two distinct blocks with the same parity along each Dimension are at least
+    ``r`` grid points apart, so the supports of the sparse points they contain
+    are disjoint. Each colour thus gathers, out of the blocks with a given
+    parity, at most one sparse point per block. There are no more than
+    ``2**dim`` colours, unless some blocks contain several sparse points.
+    """
+    npoint, dim = gridpoints.shape
+    blocks = np.floor_divide(gridpoints, max(r - 1, 1))
+    parity = np.ravel_multi_index((blocks % 2).T, (2,)*dim)
+
+    # The rank of each sparse point among those in the same block
+    order = np.lexsort(blocks.T[::-1])
+    blocks = blocks[order]
+    starts = np.flatnonzero(np.append(True, np.any(blocks[1:] != blocks[:-1], axis=1)))
+    counts = np.diff(np.append(starts, npoint))
+    rank = np.empty(npoint, dtype=int)
+    rank[order] = np.arange(npoint) - np.repeat(starts, counts)
+
+    colours = rank*2**dim + parity
+    order = np.argsort(colours, kind='stable')
+    _, sizes = np.unique(colours, return_counts=True)
+    offsets = np.cumsum(sizes) - sizes
+
+    return order.astype(np.int32), offsets.astype(np.int32), sizes.astype(np.int32)
+
+
 class AbstractSparseFunction(DiscreteFunction, Differentiable):
 
     """
@@ -85,7 +288,8 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
     @property
     def gridpoints(self):
         """
-        The *reference* grid point corresponding to each sparse point.
+        The *reference* grid point corresponding to each sparse point, as an
+        array of shape ``(npoint, grid.dim)``.
 
         Notes
         -----
@@ -95,31 +299,136 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         raise NotImplementedError
 
     @property
+    def _position(self):
+        """
+        The data determining the position of the sparse points. The metadata
+        derived from it, such as the grid points and the MPI ranks each sparse
+        point is required by, are cached until it changes.
+        """
+        raise NotImplementedError
+
+    def _precomputed_indices(self, gridpoints, weights):
+        """
+        The substitutions for the grid Dimensions, as well as the interpolation
+        weight, of an interpolation/injection reading the first grid point of
+        the support of each sparse point from ``gridpoints``, and the weights
+        of the grid points in the support, along each Dimension, from
+        ``weights``. The support is iterated over through a DefaultDimension
+        per grid Dimension, so the weights are applied as a tensor product.
+        """
+        p = self._sparse_dim
+
+        idx_subs = {}
+        coeffs = []
+        for i, d in enumerate(self.grid.dimensions):
+            rd = DefaultDimension(name='r%s_%s' % (d.name, self.name),
+                                  default_value=weights.shape[-1])
+            idx_subs[d] = gridpoints[p, i] + rd
+            coeffs.append(weights[p, i, rd])
+
+        return idx_subs, prod(coeffs)
+
+    def _interpolate_precomputed(self, expr, gridpoints, weights, increment=False,
+                                 self_subs={}):
+        """
+        Generate equations interpolating an arbitrary expression into ``self``,
+        through precomputed grid points and weights.
+        """
+        idx_subs, weight = self._precomputed_indices(gridpoints, weights)
+
+        # Accumulate point-wise contributions into a temporary
+        rhs = Scalar(name='sum', dtype=self.dtype)
+        summands = [Eq(rhs, 0., implicit_dims=self.dimensions),
+                    Inc(rhs, weight*indexify(expr).xreplace(idx_subs),
+                        implicit_dims=self.dimensions)]
+
+        # Write/Incr `self`
+        lhs = self.subs(self_subs)
+        last = [Inc(lhs, rhs)] if increment else [Eq(lhs, rhs)]
+
+        return summands + last
+
+    def _inject_precomputed(self, field, expr, gridpoints, weights, colouring=None):
+        """
+        Generate equations injecting an arbitrary expression into a field,
+        through precomputed grid points and weights. If ``colouring``, a 3-tuple
+        ``(order, offsets, sizes)`` as produced by ``_colour_support``, is
+        provided, the sparse points are injected colour by colour.
+        """
+        idx_subs, weight = self._precomputed_indices(gridpoints, weights)
+
+        lhs = indexify(field).xreplace(idx_subs)
+        rhs = indexify(expr).xreplace(idx_subs)*weight
+
+        if colouring is None:
+            return [Inc(lhs, rhs, implicit_dims=self.dimensions)]
+
+        # The sparse points of the same colour may be injected in parallel, as
+        # their supports are disjoint. No atomic updates are thus necessary
+        order, offsets, sizes = colouring
+        colour = offsets.indices[0]
+        q = ColouredDimension(name='%sc' % order.indices[0], parent=order.indices[0],
+                              colour=colour, offsets=offsets, sizes=sizes)
+        subs = {self._sparse_dim: order[q]}
+        implicit_dims = tuple(d for d in self.dimensions if d is not self._sparse_dim)
+
+        return [Inc(lhs.xreplace(subs), rhs.xreplace(subs),
+                    implicit_dims=implicit_dims + (colour, q))]
+
+    @property
+    @_cached_on_position
     def _support(self):
         """
         The grid points surrounding each sparse point within the radius of self's
-        injection/interpolation operators.
+        injection/interpolation operators, as a 2-tuple of arrays of shape
+        ``(npoint, grid.dim)``: the lower (inclusive) and upper (exclusive)
+        bounds of the support along each Dimension.
         """
-        ret = []
-        for i in self.gridpoints:
-            support = [range(max(0, j - self._radius + 1), min(M, j + self._radius + 1))
-                       for j, M in zip(i, self.grid.shape)]
-            ret.append(tuple(product(*support)))
-        return tuple(ret)
+        gridpoints = np.asarray(self.gridpoints, dtype=int).reshape(-1, self.grid.dim)
+        lower = np.maximum(gridpoints - self._radius + 1, 0)
+        upper = np.minimum(gridpoints + self._radius + 1, self.grid.shape)
+        return lower, upper
 
     @property
+    @_cached_on_position
     def _dist_datamap(self):
         """
         Mapper ``M : MPI rank -> required sparse data``.
         """
-        ret = {}
-        for i, s in enumerate(self._support):
-            # Sparse point `i` is "required" by the following ranks
-            for r in self.grid.distributor.glb_to_rank(s):
-                ret.setdefault(r, []).append(i)
-        return {k: filter_ordered(v) for k, v in ret.items()}
+        distributor = self.grid.distributor
+        lower, upper = self._support
+
+        # Sparse points falling outside of the grid aren't required by any rank
+        points = np.flatnonzero(np.all(lower < upper, axis=1))
+        if points.size == 0:
+            return {}
+
+        # The coordinates of the ranks owning the two extremes of the support
+        lcoords = distributor.glb_to_coords(lower[points])
+        ucoords = distributor.glb_to_coords(upper[points] - 1)
+
+        # Sparse point `i` is "required" by all ranks in between. The support
+        # usually spans very few ranks, so we iterate over the offsets from the
+        # lowest rank rather than over the sparse points
+        ranks = []
+        required = []
+        for offset in np.ndindex(*(ucoords - lcoords).max(axis=0) + 1):
+            coords = lcoords + offset
+            mask = np.all(coords <= ucoords, axis=1)
+            ranks.append(np.ravel_multi_index(coords[mask].T, distributor.topology))
+            required.append(points[mask])
+        ranks = np.concatenate(ranks)
+        required = np.concatenate(required)
+
+        # Group by rank, with the sparse points in increasing order
+        order = np.lexsort((required, ranks))
+        ranks, required = ranks[order], required[order]
+        splits = np.flatnonzero(np.diff(ranks)) + 1
+        return dict(zip(ranks[np.concatenate([[0], splits])].tolist(),
+                        np.split(required, splits)))
 
     @property
+    @_cached_on_position
     def _dist_scatter_mask(self):
         """
         A mask to index into ``self.data``, which creates a new data array that
@@ -129,7 +438,7 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         the boundary of two or more MPI ranks are duplicated.
         """
         dmap = self._dist_datamap
-        mask = np.array(flatten(dmap[i] for i in sorted(dmap)), dtype=int)
+        mask = np.concatenate([np.zeros(0, dtype=int)] + [dmap[i] for i in sorted(dmap)])
         ret = [slice(None) for i in range(self.ndim)]
         ret[self._sparse_position] = mask
         return tuple(ret)
@@ -144,17 +453,18 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         return self._dist_scatter_mask[self._sparse_position]
 
     @property
+    @_cached_on_position
     def _dist_gather_mask(self):
         """
         A mask to index into the ``data`` received upon returning from
-        ``self._dist_alltoall``. This mask creates a new data array in which
+        ``self._dist_plan.gather``. This mask creates a new data array in which
         duplicate sparse data values have been discarded. The resulting data
         array can thus be used to populate ``self.data``.
         """
         ret = list(self._dist_scatter_mask)
-        mask = ret[self._sparse_position]
-        ret[self._sparse_position] = [mask.tolist().index(i)
-                                      for i in filter_ordered(mask)]
+        # The first occurrence of each sparse point, in increasing order
+        _, ret[self._sparse_position] = np.unique(ret[self._sparse_position],
+                                                  return_index=True)
         return tuple(ret)
 
     @property
@@ -181,64 +491,18 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
 
         return ssparse, rsparse
 
-    @cached_property
-    def _dist_reorder_mask(self):
-        """
-        An ordering mask that puts ``self._sparse_position`` at the front.
-        """
-        ret = (self._sparse_position,)
-        ret += tuple(i for i, d in enumerate(self.indices) if d is not self._sparse_dim)
-        return ret
-
-    @property
-    def _dist_alltoall(self):
-        """
-        The metadata necessary to perform an ``MPI_Alltoallv`` distributing the
-        sparse data values across the MPI ranks needing them.
-        """
-        ssparse, rsparse = self._dist_count
-
-        # Per-rank shape of send/recv data
-        sshape = []
-        rshape = []
-        for s, r in zip(ssparse, rsparse):
-            handle = list(self.shape)
-            handle[self._sparse_position] = s
-            sshape.append(tuple(handle))
-
-            handle = list(self.shape)
-            handle[self._sparse_position] = r
-            rshape.append(tuple(handle))
-
-        # Per-rank count of send/recv data
-        scount = tuple(prod(i) for i in sshape)
-        rcount = tuple(prod(i) for i in rshape)
-
-        # Per-rank displacement of send/recv data (it's actually all contiguous,
-        # but the Alltoallv needs this information anyway)
-        sdisp = np.concatenate([[0], np.cumsum(scount)[:-1]])
-        rdisp = np.concatenate([[0], tuple(np.cumsum(rcount))[:-1]])
-
-        # Total shape of send/recv data
-        sshape = list(self.shape)
-        sshape[self._sparse_position] = sum(ssparse)
-        rshape = list(self.shape)
-        rshape[self._sparse_position] = sum(rsparse)
-
-        # May have to swap axes, as `MPI_Alltoallv` expects contiguous data, and
-        # the sparse dimension may not be the outermost
-        sshape = tuple(sshape[i] for i in self._dist_reorder_mask)
-        rshape = tuple(rshape[i] for i in self._dist_reorder_mask)
-
-        return sshape, scount, sdisp, rshape, rcount, rdisp
-
     @property
-    def _dist_subfunc_alltoall(self):
+    def _dist_plan(self):
         """
-        The metadata necessary to perform an ``MPI_Alltoallv`` distributing
-        self's SubFunction values across the MPI ranks needing them.
+        The SparseExchangePlan distributing the sparse data values across the
+        MPI ranks needing them. This is a collective operation, as the plan is
+        rebuilt as soon as the sparse points move on any of the MPI ranks.
         """
-        raise NotImplementedError
+        plan = self.__dict__.get('_dist_plan_cache')
+        stale = plan is None or not np.array_equal(plan.position, self._position)
+        if self.grid.distributor.comm.allreduce(stale, op=MPI.LOR):
+            plan = self._dist_plan_cache = SparseExchangePlan(self)
+        return plan
 
     def _dist_scatter(self):
         """
@@ -255,8 +519,10 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         """
         raise NotImplementedError
 
-    @memoized_meth
     def _arg_defaults(self, alias=None):
+        # Not memoized: with MPI, the sparse data values (and coordinates) are
+        # scattered from their up-to-date values at each run; this is cheap, as
+        # the SparseExchangePlan is reused until the sparse points move
         key = alias or self
         mapper = {self: key}
         mapper.update({getattr(self, i): getattr(key, i) for i in self._sub_functions})
@@ -470,7 +736,9 @@ class SparseFunction(AbstractSparseFunction):
     _radius = 1
     """The radius of the stencil operators provided by the SparseFunction."""
 
-    _sub_functions = ('coordinates',)
+    _sub_functions = ('coordinates', '_interpolation_gridpoints',
+                      '_interpolation_weights', '_colour_order', '_colour_offsets',
+                      '_colour_sizes')
 
     def __init_finalize__(self, *args, **kwargs):
         super(SparseFunction, self).__init_finalize__(*args, **kwargs)
@@ -513,6 +781,66 @@ class SparseFunction(AbstractSparseFunction):
     def coordinates_data(self):
         return self.coordinates.data.view(np.ndarray)
 
+    @cached_property
+    def _interpolation_gridpoints(self):
+        """
+        The first grid point of the support of each sparse point, as used by the
+        interpolation/injection with ``precompute=True``.
+        """
+        return DerivedSubFunction(name='%s_gridpoints' % self.name, parent=self,
+                                  dtype=np.int32,
+                                  dimensions=(self._sparse_dim, Dimension(name='d')),
+                                  shape=(self.npoint, self.grid.dim), space_order=0,
+                                  distributor=self._distributor)
+
+    @cached_property
+    def _interpolation_weights(self):
+        """
+        The interpolation weights of the grid points in the support of each
+        sparse point, along each Dimension, as used by the interpolation/injection
+        with ``precompute=True``.
+        """
+        r = 2*self._radius
+        return DerivedSubFunction(name='%s_weights' % self.name, parent=self,
+                                  dtype=self.dtype,
+                                  dimensions=(self._sparse_dim, Dimension(name='d'),
+                                              Dimension(name='i_%s' % self.name)),
+                                  shape=(self.npoint, self.grid.dim, r), space_order=0,
+                                  distributor=self._distributor)
+
+    @cached_property
+    def _colour_order(self):
+        """
+        The sparse points sorted by colour, as used by the injection with no
+        atomic updates.
+        """
+        return DerivedSubFunction(name='%s_order' % self.name, parent=self,
+                                  dtype=np.int32,
+                                  dimensions=(Dimension(name='q_%s' % self.name),),
+                                  shape=(self.npoint,), space_order=0)
+
+    @cached_property
+    def _colour_offsets(self):
+        """
+        The offset of each colour within ``self._colour_order``. As there are
+        at most ``npoint`` colours, the shape is only an upper bound.
+        """
+        return DerivedSubFunction(name='%s_offsets' % self.name, parent=self,
+                                  dtype=np.int32,
+                                  dimensions=(Dimension(name='c_%s' % self.name),),
+                                  shape=(self.npoint,), space_order=0)
+
+    @cached_property
+    def _colour_sizes(self):
+        """
+        The number of sparse points of each colour. As there are at most
+        ``npoint`` colours, the shape is only an upper bound.
+        """
+        return DerivedSubFunction(name='%s_sizes' % self.name, parent=self,
+                                  dtype=np.int32,
+                                  dimensions=(Dimension(name='c_%s' % self.name),),
+                                  shape=(self.npoint,), space_order=0)
+
     @property
     def _interpolation_coeffs(self):
         """
@@ -641,16 +969,96 @@ class SparseFunction(AbstractSparseFunction):
         return idx_subs, temps
 
     @property
-    def gridpoints(self):
+    def _position(self):
         if self.coordinates._data is None:
             raise ValueError("No coordinates attached to this SparseFunction")
-        ret = []
-        for coords in self.coordinates.data._local:
-            ret.append(tuple(int(sympy.floor((c - o.data)/i.spacing.data)) for c, o, i in
-                             zip(coords, self.grid.origin, self.grid.dimensions)))
-        return ret
+        return self.coordinates.data._local
 
-    def interpolate(self, expr, offset=0, increment=False, self_subs={}):
+    @property
+    @_cached_on_position
+    def gridpoints(self):
+        coords = self._position
+        origin = np.array([o.data for o in self.grid.origin], dtype=coords.dtype)
+        spacing = np.array([i.spacing.data for i in self.grid.dimensions],
+                           dtype=coords.dtype)
+        return np.floor((coords - origin)/spacing).astype(int)
+
+    def _precompute(self, coords):
+        """
+        Compute, on the host, the values of the SubFunctions read by the
+        interpolation/injection with ``precompute=True``, given the coordinates
+        ``coords`` of the sparse points relative to the local domain.
+        """
+        gridpoints, weights = _precompute_weights(self.grid, coords, 2*self._radius,
+                                                  'linear')
+
+        # The grid points accessed by the generated code must fall within the
+        # local domain, extended by the radius
+        lower = [-self._radius]*self.grid.dim
+        upper = [i - 1 + self._radius for i in self.grid.shape_local]
+        gridpoints, weights = _clip_support(gridpoints, weights, lower, upper)
+
+        return {self._interpolation_gridpoints: gridpoints.astype(np.int32),
+                self._interpolation_weights: weights.astype(self.dtype)}
+
+    def _colour(self, gridpoints):
+        """
+        Compute, on the host, the values of the SubFunctions read by the injection
+        with no atomic updates, given the precomputed ``gridpoints``.
+        """
+        order, offsets, sizes = _colour_support(gridpoints, 2*self._radius)
+
+        return {self._colour_order: order,
+                self._colour_offsets: offsets,
+                self._colour_sizes: sizes}
+
+    @property
+    @_cached_on_position
+    def _precomputed(self):
+        # Populated on demand by `_dist_precompute`
+        return {}
+
+    def _dist_precompute(self, function):
+        """
+        The values of ``function``, a DerivedSubFunction of self, relative to the
+        local domain. These are only computed once an Operator reads ``function``,
+        and then reused until the sparse points move.
+        """
+        if self.grid.distributor.nprocs == 1:
+            cache, coords = self._precomputed, self._position
+        else:
+            plan = self._dist_plan
+            cache, coords = plan.precomputed, self._dist_coordinates(plan)[1]
+
+        if function not in cache:
+            if function in (self._interpolation_gridpoints,
+                            self._interpolation_weights):
+                cache.update(self._precompute(coords))
+            else:
+                # The colouring depends on the precomputed grid points
+                gridpoints = self._dist_precompute(self._interpolation_gridpoints)
+                cache.update(self._colour(gridpoints))
+
+        return cache[function]
+
+    def _arg_derived(self, function, source=None):
+        """
+        The argument values of ``function``, a DerivedSubFunction of self. The
+        values may be derived from the sparse points of another SparseFunction,
+        ``source``, such as a user-provided override for self.
+        """
+        source = source or self
+        name, = [i for i in self._sub_functions if getattr(self, i) is function]
+
+        value = source._dist_precompute(getattr(source, name))
+        args = {function.name: value}
+        for i, s in zip(function.indices, value.shape):
+            args.update(i._arg_defaults(_min=0, size=s))
+
+        return args
+
+    def interpolate(self, expr, offset=0, increment=False, self_subs={},
+                    precompute=False):
         """
         Generate equations interpolating an arbitrary expression into ``self``.
 
@@ -662,6 +1070,11 @@ class SparseFunction(AbstractSparseFunction):
             Additional offset from the boundary.
         increment: bool, optional
             If True, generate increments (Inc) rather than assignments (Eq).
+        precompute : bool, optional
+            If True, the grid points and the weights of the interpolation are
+            computed once, on the host, before running the Operator, rather than
+            by the generated code for each sparse point at each time step.
+            Defaults to False.
         """
         # Derivatives must be evaluated before the introduction of indirect accesses
         try:
@@ -670,6 +1083,13 @@ class SparseFunction(AbstractSparseFunction):
             # E.g., a generic SymPy expression or a number
             pass
 
+        if precompute:
+            if offset != 0:
+                raise ValueError("`offset` not supported with `precompute=True`")
+            return self._interpolate_precomputed(expr, self._interpolation_gridpoints,
+                                                 self._interpolation_weights,
+                                                 increment, self_subs)
+
         variables = list(retrieve_function_carriers(expr))
 
         # Need to get origin of the field in case it is staggered
@@ -694,7 +1114,7 @@ class SparseFunction(AbstractSparseFunction):
 
         return temps + summands + last
 
-    def inject(self, field, expr, offset=0):
+    def inject(self, field, expr, offset=0, precompute=False):
         """
         Generate equations injecting an arbitrary expression into a field.
 
@@ -706,6 +1126,21 @@ class SparseFunction(AbstractSparseFunction):
             Injected expression.
         offset : int, optional
             Additional offset from the boundary.
+        precompute : bool, optional
+            If True, the grid points and the weights of the injection are
+            computed once, on the host, before running the Operator, rather than
+            by the generated code for each sparse point at each time step.
+            Defaults to False.
+
+        Notes
+        -----
+        With OpenMP, the injections from different sparse points into the same
+        grid point would require atomic updates. Thus, if ``npoint`` is at least
+        ``configuration['injection-colouring']``, the sparse points are rather
+        partitioned into colours, on the host, such that the sparse points of the
+        same colour have disjoint supports; the generated code then processes
+        the colours sequentially, and the sparse points of each colour in
+        parallel. This implies ``precompute=True``.
         """
         # Derivatives must be evaluated before the introduction of indirect accesses
         try:
@@ -714,6 +1149,19 @@ class SparseFunction(AbstractSparseFunction):
             # E.g., a generic SymPy expression or a number
             pass
 
+        threshold = configuration['injection-colouring']
+        if offset == 0 and configuration['openmp'] and 0 < threshold <= self._npoint:
+            return self._inject_precomputed(field, expr, self._interpolation_gridpoints,
+                                            self._interpolation_weights,
+                                            colouring=(self._colour_order,
+                                                       self._colour_offsets,
+                                                       self._colour_sizes))
+        elif precompute:
+            if offset != 0:
+                raise ValueError("`offset` not supported with `precompute=True`")
+            return self._inject_precomputed(field, expr, self._interpolation_gridpoints,
+                                            self._interpolation_weights)
+
         variables = list(retrieve_function_carriers(expr)) + [field]
 
         # Need to get origin of the field in case it is staggered
@@ -775,31 +1223,6 @@ class SparseFunction(AbstractSparseFunction):
         mapper = {self._sparse_dim: self._distributor.decomposition[self._sparse_dim]}
         return tuple(mapper.get(d) for d in self.dimensions)
 
-    @property
-    def _dist_subfunc_alltoall(self):
-        ssparse, rsparse = self._dist_count
-
-        # Per-rank shape of send/recv `coordinates`
-        sshape = [(i, self.grid.dim) for i in ssparse]
-        rshape = [(i, self.grid.dim) for i in rsparse]
-
-        # Per-rank count of send/recv `coordinates`
-        scount = [prod(i) for i in sshape]
-        rcount = [prod(i) for i in rshape]
-
-        # Per-rank displacement of send/recv `coordinates` (it's actually all
-        # contiguous, but the Alltoallv needs this information anyway)
-        sdisp = np.concatenate([[0], np.cumsum(scount)[:-1]])
-        rdisp = np.concatenate([[0], tuple(np.cumsum(rcount))[:-1]])
-
-        # Total shape of send/recv `coordinates`
-        sshape = list(self.coordinates.shape)
-        sshape[0] = sum(ssparse)
-        rshape = list(self.coordinates.shape)
-        rshape[0] = sum(rsparse)
-
-        return sshape, scount, sdisp, rshape, rcount, rdisp
-
     def _dist_scatter(self, data=None):
         data = data if data is not None else self.data._local
         distributor = self.grid.distributor
@@ -808,34 +1231,24 @@ class SparseFunction(AbstractSparseFunction):
         if distributor.nprocs == 1:
             return {self: data, self.coordinates: self.coordinates.data}
 
-        comm = distributor.comm
-        mpitype = MPI._typedict[np.dtype(self.dtype).char]
+        plan = self._dist_plan
 
-        # Pack sparse data values so that they can be sent out via an Alltoallv
-        data = data[self._dist_scatter_mask]
-        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
         # Send out the sparse point values
-        _, scount, sdisp, rshape, rcount, rdisp = self._dist_alltoall
-        scattered = np.empty(shape=rshape, dtype=self.dtype)
-        comm.Alltoallv([data, scount, sdisp, mpitype],
-                       [scattered, rcount, rdisp, mpitype])
-        data = scattered
-        # Unpack data values so that they follow the expected storage layout
-        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
-
-        # Pack (reordered) coordinates so that they can be sent out via an Alltoallv
-        coords = self.coordinates.data._local[self._dist_subfunc_scatter_mask]
-        # Send out the sparse point coordinates
-        _, scount, sdisp, rshape, rcount, rdisp = self._dist_subfunc_alltoall
-        scattered = np.empty(shape=rshape, dtype=self.coordinates.dtype)
-        comm.Alltoallv([coords, scount, sdisp, mpitype],
-                       [scattered, rcount, rdisp, mpitype])
-        coords = scattered
-
-        # Translate global coordinates into local coordinates
-        coords = coords - np.array(self.grid.origin_offset, dtype=self.dtype)
-
-        return {self: data, self.coordinates: coords}
+        data = plan.scatter(data, self._sparse_position)
+
+        return {self: data, self.coordinates: self._dist_coordinates(plan)[0]}
+
+    def _dist_coordinates(self, plan):
+        """
+        The sparse point coordinates scattered by ``plan``, relative to the local
+        domain, along with a pristine copy. These are only exchanged once per plan.
+        """
+        if plan.coordinates is None:
+            coords = plan.scatter(self.coordinates.data._local, 0)
+            # Translate global coordinates into local coordinates
+            coords = coords - np.array(self.grid.origin_offset, dtype=self.dtype)
+            plan.coordinates = (coords, coords.copy())
+        return plan.coordinates
 
     def _dist_gather(self, data, coords):
         distributor = self.grid.distributor
@@ -844,30 +1257,21 @@ class SparseFunction(AbstractSparseFunction):
         if distributor.nprocs == 1:
             return
 
-        comm = distributor.comm
+        plan = self._dist_plan
 
-        # Pack sparse data values so that they can be sent out via an Alltoallv
-        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
         # Send back the sparse point values
-        sshape, scount, sdisp, _, rcount, rdisp = self._dist_alltoall
-        gathered = np.empty(shape=sshape, dtype=self.dtype)
-        mpitype = MPI._typedict[np.dtype(self.dtype).char]
-        comm.Alltoallv([data, rcount, rdisp, mpitype],
-                       [gathered, scount, sdisp, mpitype])
-        # Unpack data values so that they follow the expected storage layout
-        gathered = np.ascontiguousarray(np.transpose(gathered, self._dist_reorder_mask))
-        self._data[:] = gathered[self._dist_gather_mask]
+        self._data[:] = plan.gather(data, self._sparse_position)
 
         if coords is not None:
-            # Pack (reordered) coordinates so that they can be sent out via an Alltoallv
-            coords = coords + np.array(self.grid.origin_offset, dtype=self.dtype)
-            # Send out the sparse point coordinates
-            sshape, scount, sdisp, _, rcount, rdisp = self._dist_subfunc_alltoall
-            gathered = np.empty(shape=sshape, dtype=self.coordinates.dtype)
-            mpitype = MPI._typedict[np.dtype(self.coordinates.dtype).char]
-            comm.Alltoallv([coords, rcount, rdisp, mpitype],
-                           [gathered, scount, sdisp, mpitype])
-            self._coordinates.data._local[:] = gathered[self._dist_subfunc_gather_mask]
+            # The sparse point coordinates are only sent back if the Operator
+            # has modified them on any rank
+            if not isinstance(coords, np.ndarray):
+                # No sparse points on this rank
+                coords = plan.coordinates[0]
+            modified = not np.array_equal(coords, plan.coordinates[1])
+            if distributor.comm.allreduce(modified, op=MPI.LOR):
+                coords = coords + np.array(self.grid.origin_offset, dtype=self.dtype)
+                self._coordinates.data._local[:] = plan.gather(coords, 0)
 
         # Note: this method "mirrors" `_dist_scatter`: a sparse point that is sent
         # in `_dist_scatter` is here received; a sparse point that is received in
@@ -958,7 +1362,8 @@ class SparseTimeFunction(AbstractSparseTimeFunction, SparseFunction):
 
     is_SparseTimeFunction = True
 
-    def interpolate(self, expr, offset=0, u_t=None, p_t=None, increment=False):
+    def interpolate(self, expr, offset=0, u_t=None, p_t=None, increment=False,
+                    precompute=False):
         """
         Generate equations interpolating an arbitrary expression into ``self``.
 
@@ -974,6 +1379,10 @@ class SparseTimeFunction(AbstractSparseTimeFunction, SparseFunction):
             Time index at which the result of the interpolation is stored.
         increment: bool, optional
             If True, generate increments (Inc) rather than assignments (Eq).
+        precompute : bool, optional
+            If True, the grid points and the weights of the interpolation are
+            computed once, on the host, before running the Operator. Defaults
+            to False.
         """
         # Apply optional time symbol substitutions to expr
         subs = {}
@@ -987,9 +1396,10 @@ class SparseTimeFunction(AbstractSparseTimeFunction, SparseFunction):
 
         return super(SparseTimeFunction, self).interpolate(expr, offset=offset,
                                                            increment=increment,
-                                                           self_subs=subs)
+                                                           self_subs=subs,
+                                                           precompute=precompute)
 
-    def inject(self, field, expr, offset=0, u_t=None, p_t=None):
+    def inject(self, field, expr, offset=0, u_t=None, p_t=None, precompute=False):
         """
         Generate equations injecting an arbitrary expression into a field.
 
@@ -1005,6 +1415,10 @@ class SparseTimeFunction(AbstractSparseTimeFunction, SparseFunction):
             Time index at which the interpolation is performed.
         p_t : expr-like, optional
             Time index at which the result of the interpolation is stored.
+        precompute : bool, optional
+            If True, the grid points and the weights of the injection are
+            computed once, on the host, before running the Operator. Defaults
+            to False.
         """
         # Apply optional time symbol substitutions to field and expr
         if u_t is not None:
@@ -1012,7 +1426,8 @@ class SparseTimeFunction(AbstractSparseTimeFunction, SparseFunction):
         if p_t is not None:
             expr = expr.subs(self.time_dim, p_t)
 
-        return super(SparseTimeFunction, self).inject(field, expr, offset=offset)
+        return super(SparseTimeFunction, self).inject(field, expr, offset=offset,
+                                                      precompute=precompute)
 
     # Pickling support
     _pickle_kwargs = AbstractSparseTimeFunction._pickle_kwargs +\
@@ -1022,8 +1437,9 @@ class SparseTimeFunction(AbstractSparseTimeFunction, SparseFunction):
 class PrecomputedSparseFunction(AbstractSparseFunction):
     """
     Tensor symbol representing a sparse array in symbolic equations; unlike
-    SparseFunction, PrecomputedSparseFunction uses externally-defined data
-    for interpolation.
+    SparseFunction, PrecomputedSparseFunction uses precomputed data for
+    interpolation, either externally-defined or computed, once, from the
+    coordinates of the sparse points.
 
     Parameters
     ----------
@@ -1050,6 +1466,16 @@ class PrecomputedSparseFunction(AbstractSparseFunction):
         j]*interpolation_coeffs[...,k]``. So for ``r=6``, we will store 18
         coefficients per sparse point (instead of potentially 216).
         Must be a three-dimensional array of shape ``(npoint, grid.ndim, r)``.
+    coordinates : np.ndarray, optional
+        The coordinates of each sparse point. If provided, ``gridpoints`` and
+        ``interpolation_coeffs`` are computed from the coordinates through the
+        interpolation scheme ``interpolation``, with the support of each sparse
+        point centred on it.
+    interpolation : str, optional
+        The interpolation scheme used with ``coordinates``. Allowed values are
+        'linear' (requires ``r=2``), 'lagrange', i.e. Lagrange interpolation of
+        order ``r-1``, and 'sinc', i.e. Kaiser-windowed sinc interpolation
+        (requires an even ``r`` between 4 and 20). Defaults to 'lagrange'.
     space_order : int, optional
         Discretisation order for space derivatives. Defaults to 0.
     shape : tuple of ints, optional
@@ -1088,13 +1514,34 @@ class PrecomputedSparseFunction(AbstractSparseFunction):
             raise ValueError('`r` must be > 0')
         self.r = r
 
+        coordinates = kwargs.get('coordinates')
+        if coordinates is not None:
+            # Precompute the grid points and the interpolation coefficients
+            # through one of the built-in interpolation schemes
+            self.interpolation = kwargs.get('interpolation', 'lagrange')
+            gridpoints_data, coefficients_data = _precompute_weights(
+                self.grid, coordinates, r, self.interpolation
+            )
+            # Points outside of the domain only contribute through the grid
+            # points within the domain
+            gridpoints_data, coefficients_data = _clip_support(
+                gridpoints_data, coefficients_data, [0]*self.grid.dim,
+                [i - 1 for i in self.grid.shape]
+            )
+        else:
+            self.interpolation = None
+            gridpoints_data = kwargs.get('gridpoints', None)
+            coefficients_data = kwargs.get('interpolation_coeffs', None)
+            assert(gridpoints_data is not None)
+            assert(coefficients_data is not None)
+            warning("Ensure that the provided interpolation coefficient and grid " +
+                    "point values are computed on the final grid that will be " +
+                    "used for other computations.")
+
         gridpoints = SubFunction(name="%s_gridpoints" % self.name, dtype=np.int32,
                                  dimensions=(self.indices[-1], Dimension(name='d')),
                                  shape=(self.npoint, self.grid.dim), space_order=0,
                                  parent=self)
-
-        gridpoints_data = kwargs.get('gridpoints', None)
-        assert(gridpoints_data is not None)
         gridpoints.data[:] = gridpoints_data[:]
         self._gridpoints = gridpoints
 
@@ -1106,13 +1553,8 @@ class PrecomputedSparseFunction(AbstractSparseFunction):
                                                   self.r),
                                            dtype=self.dtype, space_order=0,
                                            parent=self)
-        coefficients_data = kwargs.get('interpolation_coeffs', None)
-        assert(coefficients_data is not None)
         interpolation_coeffs.data[:] = coefficients_data[:]
         self._interpolation_coeffs = interpolation_coeffs
-        warning("Ensure that the provided interpolation coefficient and grid point " +
-                "values are computed on the final grid that will be used for other " +
-                "computations.")
 
     def interpolate(self, expr, offset=0, increment=False, self_subs={}):
         """
@@ -1127,20 +1569,9 @@ class PrecomputedSparseFunction(AbstractSparseFunction):
         increment: bool, optional
             If True, generate increments (Inc) rather than assignments (Eq).
         """
-        expr = indexify(expr)
-
-        p, _, _ = self.interpolation_coeffs.indices
-        dim_subs = []
-        coeffs = []
-        for i, d in enumerate(self.grid.dimensions):
-            rd = DefaultDimension(name="r%s" % d.name, default_value=self.r)
-            dim_subs.append((d, INT(rd + self.gridpoints[p, i])))
-            coeffs.append(self.interpolation_coeffs[p, i, rd])
-        # Apply optional time symbol substitutions to lhs of assignment
-        lhs = self.subs(self_subs)
-        rhs = prod(coeffs) * expr.subs(dim_subs)
-
-        return [Eq(lhs, lhs + rhs)]
+        return self._interpolate_precomputed(expr, self.gridpoints,
+                                             self.interpolation_coeffs,
+                                             increment, self_subs)
 
     def inject(self, field, expr, offset=0):
         """
@@ -1155,19 +1586,8 @@ class PrecomputedSparseFunction(AbstractSparseFunction):
         offset : int, optional
             Additional offset from the boundary.
         """
-        expr = indexify(expr)
-        field = indexify(field)
-
-        p, _ = self.gridpoints.indices
-        dim_subs = []
-        coeffs = []
-        for i, d in enumerate(self.grid.dimensions):
-            rd = DefaultDimension(name="r%s" % d.name, default_value=self.r)
-            dim_subs.append((d, INT(rd + self.gridpoints[p, i])))
-            coeffs.append(self.interpolation_coeffs[p, i, rd])
-        rhs = prod(coeffs) * expr
-        field = field.subs(dim_subs)
-        return [Eq(field, field + rhs.subs(dim_subs))]
+        return self._inject_precomputed(field, expr, self.gridpoints,
+                                        self.interpolation_coeffs)
 
     @property
     def gridpoints(self):
@@ -1213,7 +1633,8 @@ class PrecomputedSparseTimeFunction(AbstractSparseTimeFunction,
     """
     Tensor symbol representing a space- and time-varying sparse array in symbolic
     equations; unlike SparseTimeFunction, PrecomputedSparseTimeFunction uses
-    externally-defined data for interpolation.
+    precomputed data for interpolation, either externally-defined or computed,
+    once, from the coordinates of the sparse points.
 
     Parameters
     ----------
@@ -1240,6 +1661,16 @@ class PrecomputedSparseTimeFunction(AbstractSparseTimeFunction,
         j]*interpolation_coeffs[...,k]``. So for ``r=6``, we will store 18 coefficients
         per sparse point (instead of potentially 216). Must be a three-dimensional array
         of shape ``(npoint, grid.ndim, r)``.
+    coordinates : np.ndarray, optional
+        The coordinates of each sparse point. If provided, ``gridpoints`` and
+        ``interpolation_coeffs`` are computed from the coordinates through the
+        interpolation scheme ``interpolation``, with the support of each sparse
+        point centred on it.
+    interpolation : str, optional
+        The interpolation scheme used with ``coordinates``. Allowed values are
+        'linear' (requires ``r=2``), 'lagrange', i.e. Lagrange interpolation of
+        order ``r-1``, and 'sinc', i.e. Kaiser-windowed sinc interpolation
+        (requires an even ``r`` between 4 and 20). Defaults to 'lagrange'.
     space_order : int, optional
         Discretisation order for space derivatives. Defaults to 0.
     time_order : int, optional
@@ -1296,3 +1727,133 @@ class PrecomputedSparseTimeFunction(AbstractSparseTimeFunction,
         return super(PrecomputedSparseTimeFunction, self).interpolate(
             expr, offset=offset, increment=increment, self_subs=subs
         )
+
+
+class DerivedSubFunction(SubFunction):
+
+    """
+    A SubFunction whose values are derived, on the host, from the position of
+    the sparse points of its parent SparseFunction.
+
+    The values are only computed if an Operator reads the DerivedSubFunction,
+    so that the SparseFunctions not needing them don't pay for them.
+    """
+
+    def _arg_values(self, **kwargs):
+        if self.name in kwargs:
+            raise RuntimeError("`%s` is a SubFunction, so it can't be assigned "
+                               "a value dynamically" % self.name)
+        else:
+            # The parent may be overridden by another SparseFunction
+            source = kwargs.get(self.parent.name)
+            if not isinstance(source, AbstractSparseFunction):
+                source = None
+            return self.parent._arg_derived(self, source)
+
+
+class SparseExchangePlan(object):
+
+    """
+    The metadata and the buffers needed to distribute, via ``MPI_Alltoallv``,
+    the values of an AbstractSparseFunction across the MPI ranks requiring them,
+    and to send them back to the owning MPI ranks.
+
+    A plan only depends on the position of the sparse points, so it is built
+    once per set of coordinates and then reused across Operator runs.
+
+    Parameters
+    ----------
+    function : AbstractSparseFunction
+        The object whose values are exchanged.
+    """
+
+    def __init__(self, function):
+        self.comm = function.grid.distributor.comm
+        self.position = np.array(function._position)
+
+        # The number of sparse points sent to/received from each MPI rank
+        self.ssparse, self.rsparse = function._dist_count
+
+        # The sparse points to be sent out, and the received ones to be retained
+        self.scatter_mask = function._dist_subfunc_scatter_mask
+        self.gather_mask = function._dist_subfunc_gather_mask
+
+        # The scattered coordinates, if any, relative to the local domain, as
+        # handed to the Operators, along with a pristine copy
+        self.coordinates = None
+
+        # Any further data derived from the scattered coordinates, such as the
+        # precomputed interpolation weights, populated on demand
+        self.precomputed = {}
+
+    @memoized_meth
+    def _alltoall(self, shape, dtype, position):
+        """
+        The per-rank counts and displacements, as well as the send and receive
+        buffers, of an ``MPI_Alltoallv`` distributing an array of local shape
+        ``shape``, in which the sparse points are along the axis ``position``.
+        As ``MPI_Alltoallv`` expects contiguous data, the buffers have the
+        sparse points along the outermost axis; the scattered values are then
+        laid out, as expected, in a further buffer, unless ``position`` is 0.
+        """
+        other = tuple(j for i, j in enumerate(shape) if i != position)
+        nitems = int(np.prod(other))
+
+        scount = self.ssparse*nitems
+        rcount = self.rsparse*nitems
+        sdisp = np.concatenate([[0], np.cumsum(scount)[:-1]])
+        rdisp = np.concatenate([[0], np.cumsum(rcount)[:-1]])
+
+        sbuf = np.empty((sum(self.ssparse),) + other, dtype=dtype)
+        rbuf = np.empty((sum(self.rsparse),) + other, dtype=dtype)
+
+        # The scattered values, following the expected storage layout
+        if position == 0:
+            scattered = rbuf
+        else:
+            scattered = np.empty(np.moveaxis(rbuf, 0, position).shape, dtype=dtype)
+
+        return (sbuf, scount, sdisp), (rbuf, rcount, rdisp), scattered
+
+    def scatter(self, data, position):
+        """
+        Send out the sparse data values in ``data``, with the sparse points along
+        the axis ``position``, to the MPI ranks requiring them.
+
+        Notes
+        -----
+        The returned array is owned by the plan, and is overwritten by the next
+        ``scatter`` of an array with the same shape and type.
+        """
+        data = np.asarray(data)
+        position %= data.ndim
+        (sbuf, scount, sdisp), (rbuf, rcount, rdisp), scattered = \
+            self._alltoall(data.shape, data.dtype, position)
+        mpitype = MPI._typedict[data.dtype.char]
+
+        np.take(np.moveaxis(data, position, 0), self.scatter_mask, axis=0, out=sbuf)
+        self.comm.Alltoallv([sbuf, scount, sdisp, mpitype],
+                            [rbuf, rcount, rdisp, mpitype])
+        if scattered is not rbuf:
+            np.copyto(scattered, np.moveaxis(rbuf, 0, position))
+
+        return scattered
+
+    def gather(self, data, position):
+        """
+        Send back the sparse data values in ``data``, as produced by ``scatter``,
+        to the MPI ranks owning them. Duplicate sparse data values are discarded.
+        """
+        data = np.asarray(data)
+        position %= data.ndim
+        shape = list(data.shape)
+        shape[position] = len(self.gather_mask)
+        (sbuf, scount, sdisp), (rbuf, rcount, rdisp), _ = \
+            self._alltoall(tuple(shape), data.dtype, position)
+        mpitype = MPI._typedict[data.dtype.char]
+
+        np.copyto(rbuf, np.moveaxis(data, position, 0))
+        self.comm.Alltoallv([rbuf, rcount, rdisp, mpitype],
+                            [sbuf, scount, sdisp, mpitype])
+
+        return np.moveaxis(np.take(sbuf, self.gather_mask, axis=0), 0, position)
@@ -24,11 +24,11 @@ class CheckpointOperator(Operator):
     def __init__(self, op, **kwargs):
         self.op = op
         self.args = kwargs
-        op_default_args = self.op._prepare_arguments(**kwargs)
-        self.start_offset = op_default_args[self.t_arg_names['t_start']]
+        self.bound = self.op.bind(**kwargs)
+        self.start_offset = self.bound.args[self.t_arg_names['t_start']]
 
     def _prepare_args(self, t_start, t_end):
-        args = self.args.copy()
+        args = {}
         args[self.t_arg_names['t_start']] = t_start + self.start_offset
         args[self.t_arg_names['t_end']] = t_end - 1 + self.start_offset
         return args
@@ -39,11 +39,9 @@ class CheckpointOperator(Operator):
             pyRevolve.Operator.apply() without caring about these extra arguments while
             this method passes them on correctly to devito.Operator
         """
-        # Build the arguments list to invoke the kernel function
-        args = self.op.arguments(**self._prepare_args(t_start, t_end))
-        # Invoke kernel function with args
-        arg_values = [args[p.name] for p in self.op.parameters]
-        self.op.cfunction(*arg_values)
+        # The extra arguments are bound once and for all, so only the time
+        # bounds need to be updated before invoking the kernel function
+        self.bound(**self._prepare_args(t_start, t_end))
 
 
 class DevitoCheckpoint(Checkpoint):
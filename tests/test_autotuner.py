@@ -1,3 +1,5 @@
+from pathlib import Path
+
 import pytest
 import numpy as np
 from unittest.mock import patch
@@ -12,7 +14,7 @@ pytestmark = skipif(['yask', 'ops'], whole_module=True)
 # a backend reinitialization would be triggered via `devito/core/.__init__.py`,
 # thus invalidating all of the future tests. This is guaranteed by the
 # `pytestmark` above
-from devito.core.autotuning import options  # noqa
+from devito.core.autotuning import options, tuning_db  # noqa
 
 
 @switchconfig(log_level='DEBUG')
@@ -323,3 +325,46 @@ def test_few_timesteps():
     op.apply(autotune=True)
     assert op._state['autotuning'][0]['runs'] == 2
     assert op._state['autotuning'][0]['tpr'] == 2  # Induced by `save`
+
+
+def test_model_guided_search():
+    grid = Grid(shape=(64, 64, 64))
+    f = TimeFunction(name='f', grid=grid, space_order=4)
+
+    op = Operator(Eq(f.forward, f.laplace + 1.),
+                  dle=('blocking', {'openmp': False, 'blockinner': True}))
+
+    op.apply(time_M=0, autotune='aggressive')
+    exhaustive = op._state['autotuning'][-1]['runs']
+
+    with patch.dict(options, {'search': 'model'}):
+        op.apply(time_M=0, autotune='aggressive')
+    assert options['model-seeds'] <= op._state['autotuning'][-1]['runs'] < exhaustive
+    assert len(op._state['autotuning'][-1]['tuned']) == 3
+
+
+@switchconfig(autotuning_db=True)
+def test_tuning_db(tmpdir, monkeypatch):
+    monkeypatch.setattr(tuning_db, '_path', Path(str(tmpdir)).joinpath('db.json'))
+
+    grid = Grid(shape=(32, 32, 32))
+    f = TimeFunction(name='f', grid=grid)
+
+    op = Operator(Eq(f.forward, f + 1.))
+    op.apply(time_M=0, autotune=True)
+    assert op._state['autotuning'][0]['runs'] > 0
+    tuned = op._state['autotuning'][0]['tuned']
+
+    # Now an identical Operator, which must reuse the tuned arguments
+    op = Operator(Eq(f.forward, f + 1.))
+    op.apply(time_M=0, autotune=True)
+    assert op._state['autotuning'][0]['runs'] == 0
+    assert op._state['autotuning'][0]['tuned'] == tuned
+
+    # A different iteration space extent is a new autotuning problem
+    op.apply(time_M=0, x_M=15, autotune=True)
+    assert op._state['autotuning'][1]['runs'] > 0
+
+    # Different autotuning levels are independent
+    op.apply(time_M=0, autotune='aggressive')
+    assert op._state['autotuning'][2]['runs'] > 0
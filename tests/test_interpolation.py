@@ -4,9 +4,11 @@ import numpy as np
 import pytest
 
 from conftest import skipif, unit_box, points, unit_box_time, time_points
-from devito import (Grid, Operator, Function, SparseFunction, Dimension, TimeFunction,
-                    PrecomputedSparseFunction, PrecomputedSparseTimeFunction)
+from devito import (Grid, Operator, Function, SparseFunction, SparseTimeFunction,
+                    Dimension, TimeFunction, PrecomputedSparseFunction,
+                    PrecomputedSparseTimeFunction, switchconfig)
 from devito.symbolics import FLOAT
+from devito.types.sparse import _colour_support
 from examples.seismic import (demo_model, TimeAxis, RickerSource, Receiver,
                               AcquisitionGeometry)
 from examples.seismic.acoustic import AcousticWaveSolver
@@ -130,6 +132,89 @@ def test_precomputed_interpolation_time():
         assert np.allclose(sf.data[it, :], it)
 
 
+@pytest.mark.parametrize('r', [2, 3, 4])
+def test_precomputed_lagrange(r):
+    """ Test that the Lagrange interpolation of order r-1, precomputed from
+        the coordinates, is exact for polynomials of degree r-1
+    """
+    grid = Grid(shape=(21, 21, 21))
+    x, y, z = np.meshgrid(*[np.linspace(0., 1., 21)]*3, indexing='ij')
+    poly = lambda x, y, z: x**(r-1) + (x*y)**(r-1) - 2*z**(r-1) + 1.  # noqa
+    m = Function(name='m', grid=grid, space_order=2)
+    m.data[:] = poly(x, y, z)
+
+    coords = np.random.uniform(.2, .8, size=(20, 3))
+    sf = PrecomputedSparseFunction(name='s', grid=grid, r=r, npoint=len(coords),
+                                   coordinates=coords, interpolation='lagrange')
+    Operator(sf.interpolate(m))()
+
+    assert np.allclose(sf.data, poly(*coords.T), atol=1e-5)
+
+
+@pytest.mark.parametrize('interpolation, r, tolerance', [
+    ('lagrange', 4, 6e-2),
+    ('lagrange', 8, 4e-3),
+    ('sinc', 8, 8e-3),
+    ('sinc', 12, 1e-3),
+])
+def test_precomputed_accuracy(interpolation, r, tolerance):
+    """ Test the accuracy of the interpolation schemes precomputed from the
+        coordinates, for a wavefield sampled with about six grid points per
+        wavelength
+    """
+    grid = Grid(shape=(41, 41))
+    x, y = np.meshgrid(*[np.linspace(0., 1., 41)]*2, indexing='ij')
+    m = Function(name='m', grid=grid, space_order=6)
+    m.data[:] = np.sin(40.*x)*np.cos(40.*y)
+
+    coords = np.random.uniform(.2, .8, size=(50, 2))
+    sf = PrecomputedSparseFunction(name='s', grid=grid, r=r, npoint=len(coords),
+                                   coordinates=coords, interpolation=interpolation)
+    Operator(sf.interpolate(m))()
+
+    expected = np.sin(40.*coords[:, 0])*np.cos(40.*coords[:, 1])
+    assert np.max(np.abs(sf.data - expected)) < tolerance
+
+
+@pytest.mark.parametrize('interpolation, r', [
+    ('linear', 2), ('lagrange', 5), ('sinc', 8)
+])
+def test_precomputed_adjoint(interpolation, r):
+    """ Test that injection is the adjoint of interpolation, also for sparse
+        points whose support falls partly or entirely outside of the domain
+    """
+    grid = Grid(shape=(21, 21))
+    m = Function(name='m', grid=grid, space_order=2)
+    m.data[:] = np.random.rand(*m.shape)
+    v = Function(name='v', grid=grid, space_order=2)
+
+    coords = np.random.uniform(-.2, 1.2, size=(50, 2))
+    sf = PrecomputedSparseFunction(name='s', grid=grid, r=r, npoint=len(coords),
+                                   coordinates=coords, interpolation=interpolation)
+    data = np.random.rand(len(coords)).astype(np.float32)
+    sf.data[:] = data
+    Operator(sf.inject(v, expr=sf))()
+    Operator(sf.interpolate(m))()
+
+    assert np.isclose(np.sum(v.data*m.data), np.dot(data, sf.data), rtol=1e-5)
+    # Nothing is written outside of the domain
+    assert np.all(v.data_with_halo[:2] == 0.) and np.all(v.data_with_halo[-2:] == 0.)
+
+
+def test_precomputed_invalid():
+    grid = Grid(shape=(11, 11))
+    coords = np.array([(.5, .5)])
+    with pytest.raises(ValueError):
+        PrecomputedSparseFunction(name='s', grid=grid, r=4, npoint=1,
+                                  coordinates=coords, interpolation='linear')
+    with pytest.raises(ValueError):
+        PrecomputedSparseFunction(name='s', grid=grid, r=5, npoint=1,
+                                  coordinates=coords, interpolation='sinc')
+    with pytest.raises(ValueError):
+        PrecomputedSparseFunction(name='s', grid=grid, r=4, npoint=1,
+                                  coordinates=coords, interpolation='cubic')
+
+
 @pytest.mark.parametrize('shape, coords', [
     ((11, 11), [(.05, .9), (.01, .8)]),
     ((11, 11, 11), [(.05, .9), (.01, .8), (0.07, 0.84)])
@@ -388,6 +473,134 @@ def test_inject_from_field(shape, coords, result, npoints=19):
     assert np.allclose(a.data[indices], result, rtol=1.e-5)
 
 
+@pytest.mark.parametrize('shape', [(11, 11), (11, 11, 11)])
+@pytest.mark.parametrize('increment', [False, True])
+def test_interpolate_precompute(shape, increment, npoints=20):
+    """Test that interpolation with precomputed grid points and weights
+    matches the default one, also for points close to or out of the domain.
+    """
+    grid = Grid(shape=shape)
+    u = TimeFunction(name='u', grid=grid, space_order=2)
+    u.data[:] = np.random.rand(*u.shape)
+
+    ps = [SparseTimeFunction(name='p%d' % i, grid=grid, npoint=npoints, nt=3)
+          for i in range(2)]
+    coords = np.random.uniform(-.05, 1.05, size=(npoints, len(shape)))
+    for p, precompute in zip(ps, [False, True]):
+        p.coordinates.data[:] = coords
+        p.data[:] = 1.
+        Operator(p.interpolate(u, increment=increment, precompute=precompute))()
+
+    assert np.allclose(ps[0].data, ps[1].data, rtol=1e-6)
+
+    # Moving the points requires no recompilation
+    coords = np.random.rand(npoints, len(shape))
+    for p in ps:
+        p.coordinates.data[:] = coords
+    op0 = Operator(ps[0].interpolate(u))
+    op1 = Operator(ps[1].interpolate(u, precompute=True))
+    op0()
+    op1()
+
+    assert np.allclose(ps[0].data, ps[1].data, rtol=1e-6)
+
+
+def test_precompute_on_demand(npoints=20):
+    """Test that the grid points and weights are only precomputed on the host
+    for the Operators reading them, and from the sparse points provided at
+    ``apply`` time.
+    """
+    grid = Grid(shape=(11, 11))
+    u = Function(name='u', grid=grid, space_order=2)
+    u.data[:] = np.random.rand(*u.shape)
+
+    ps = [SparseFunction(name='p%d' % i, grid=grid, npoint=npoints) for i in range(2)]
+    for p in ps:
+        p.coordinates.data[:] = np.random.rand(npoints, 2)
+
+    p = ps[0]
+    Operator(p.interpolate(u))()
+    assert p._precomputed == {}
+    expected = p.data.copy()
+
+    op = Operator(p.interpolate(u, precompute=True))
+    op()
+    assert set(p._precomputed) == {p._interpolation_gridpoints,
+                                   p._interpolation_weights}
+    assert np.allclose(p.data, expected, rtol=1e-6)
+
+    # With an override, the sparse points of the override are used
+    Operator(ps[1].interpolate(u))()
+    expected = ps[1].data.copy()
+    ps[1].data[:] = 0.
+    op(p0=ps[1])
+    assert np.allclose(ps[1].data, expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize('shape', [(11, 11), (11, 11, 11)])
+def test_inject_precompute(shape, npoints=20):
+    """Test that injection with precomputed grid points and weights matches
+    the default one, also for points close to or out of the domain.
+    """
+    grid = Grid(shape=shape)
+    us = [TimeFunction(name='u%d' % i, grid=grid, space_order=2) for i in range(2)]
+
+    p = SparseTimeFunction(name='p', grid=grid, npoint=npoints, nt=3)
+    p.coordinates.data[:] = np.random.uniform(-.05, 1.05, size=(npoints, len(shape)))
+    p.data[:] = np.random.rand(*p.shape)
+
+    for u, precompute in zip(us, [False, True]):
+        Operator(p.inject(u.forward, expr=p*2, precompute=precompute))(time_M=1)
+
+    assert np.allclose(us[0].data_with_halo, us[1].data_with_halo, atol=1e-6)
+    # Nothing is written beyond the radius of the injection
+    assert np.all(us[1].data_with_halo[:, 0] == 0.)
+    assert np.all(us[1].data_with_halo[:, -1] == 0.)
+
+
+@pytest.mark.parametrize('shape, r', [((11, 11), 2), ((11, 11), 4), ((7, 7, 7), 3)])
+def test_colour_support(shape, r, npoints=200):
+    """Test that the supports of the sparse points of the same colour are
+    disjoint."""
+    gridpoints = np.random.randint(-r, max(shape), size=(npoints, len(shape)))
+
+    order, offsets, sizes = _colour_support(gridpoints, r)
+
+    assert np.all(np.sort(order) == np.arange(npoints))
+    assert np.all(offsets == np.cumsum(sizes) - sizes)
+    for i, j in zip(offsets, sizes):
+        hits = np.zeros([max(shape) + 2*r]*len(shape), dtype=int)
+        for p in order[i:i+j]:
+            hits[tuple(slice(k + r, k + 2*r) for k in gridpoints[p])] += 1
+        assert hits.max() == 1
+
+
+@pytest.mark.parametrize('shape', [(11, 11), (11, 11, 11)])
+@switchconfig(openmp=True)
+def test_inject_colouring(shape, npoints=50):
+    """Test that injection with the sparse points coloured on the host, which
+    is used with OpenMP when ``npoint`` is large enough, matches the default
+    one, but without atomic updates.
+    """
+    grid = Grid(shape=shape)
+    us = [TimeFunction(name='u%d' % i, grid=grid, space_order=2) for i in range(2)]
+
+    p = SparseTimeFunction(name='p', grid=grid, npoint=npoints, nt=3)
+    p.coordinates.data[:] = np.random.uniform(-.05, 1.05, size=(npoints, len(shape)))
+    p.data[:] = np.random.rand(*p.shape)
+
+    op0 = Operator(p.inject(us[0].forward, expr=p*2))
+    op1 = Operator(switchconfig(injection_colouring=npoints)(p.inject)(us[1].forward,
+                                                                       expr=p*2))
+    assert 'omp atomic' in str(op0)
+    assert 'omp atomic' not in str(op1)
+
+    op0(time_M=1)
+    op1(time_M=1)
+
+    assert np.allclose(us[0].data_with_halo, us[1].data_with_halo, atol=1e-6)
+
+
 @pytest.mark.parametrize('shape', [(50, 50, 50)])
 def test_position(shape):
     t0 = 0.0  # Start time
@@ -1,3 +1,5 @@
+from itertools import product
+
 import numpy as np
 import pytest
 from unittest.mock import patch
@@ -11,6 +13,8 @@ from devito import (Grid, Constant, Function, TimeFunction, SparseFunction,
 from devito.data import LEFT, RIGHT
 from devito.ir.iet import Call, Conditional, Iteration, FindNodes, retrieve_iteration_tree
 from devito.mpi import MPI
+from devito.mpi.distributed import balanced_splits, compute_dims
+from devito.tools import as_tuple
 from examples.seismic.acoustic import acoustic_setup
 
 pytestmark = skipif(['yask', 'ops', 'nompi'], whole_module=True)
@@ -48,6 +52,94 @@ class TestDistributor(object):
         }
         assert f.shape == expected[distributor.nprocs][distributor.myrank]
 
+    def test_compute_dims(self):
+        # Without the domain shape, the processes are spread evenly
+        assert compute_dims(8, 3) == (2, 2, 2)
+        assert compute_dims(9, 2) == (3, 3)
+
+        # On elongated domains, the halo volume per rank is minimized
+        assert compute_dims(8, 3, shape=(4000, 500, 500)) == (8, 1, 1)
+        assert compute_dims(8, 3, shape=(2000, 1000, 500)) == (4, 2, 1)
+        assert compute_dims(4, 2, shape=(100, 400)) == (1, 4)
+        assert compute_dims(9, 2, shape=(90, 90)) == (3, 3)
+
+        # Expensive inter-node links favour intra-node communication
+        assert compute_dims(4, 2, shape=(400, 100)) == (4, 1)
+        assert compute_dims(4, 2, shape=(400, 100), ppn=2,
+                            weights={'inter': 10}) == (2, 2)
+
+    @pytest.mark.parallel(mode=4)
+    def test_custom_topology(self):
+        grid = Grid(shape=(16, 16), topology=(4, 1))
+        f = Function(name='f', grid=grid)
+
+        assert grid.distributor.topology == (4, 1)
+        assert f.shape == (4, 16)
+
+        with pytest.raises(ValueError):
+            Grid(shape=(16, 16), topology=(2, 1))
+
+    def test_balanced_splits(self):
+        assert balanced_splits([1]*8, 4) == (2, 4, 6)
+        assert balanced_splits([4, 1, 1, 1, 1, 4], 3) == (1, 5)
+        # No empty chunks, even if the cost is all concentrated in one point
+        assert balanced_splits([0, 0, 0, 10], 3) == (2, 3)
+
+    @pytest.mark.parallel(mode=4)
+    def test_custom_decomposition(self):
+        grid = Grid(shape=(16, 8), extent=(15., 7.), decomposition=((3, 10, 12), None))
+        x, y = grid.dimensions
+        f = Function(name='f', grid=grid)
+
+        # The split points determine the topology
+        assert grid.distributor.topology == (4, 1)
+        assert f.shape == [(3, 8), (7, 8), (2, 8), (4, 8)][grid.distributor.myrank]
+
+        # Global indexing
+        f.data[:] = np.arange(16*8, dtype=np.float32).reshape(16, 8)
+        assert np.all(f.data_ro_domain[:, 0] == 8*np.arange(16)[f.local_indices[0]])
+        if grid.distributor.myrank == 2:
+            assert np.all(f.data[10:12, 1:3] == np.array([[81., 82.], [89., 90.]]))
+        assert grid.distributor.glb_to_rank((9, 0)) == 1
+        assert grid.distributor.glb_to_rank((10, 7)) == 2
+
+        # Sparse points are routed to the owning ranks
+        coords = [(2., 1.), (9., 5.), (11., 3.), (14., 6.)]
+        sf = SparseFunction(name='sf', grid=grid, npoint=4, coordinates=coords)
+        Operator(sf.interpolate(expr=f))()
+        expected = np.array([8.*i + j for i, j in coords])
+        assert np.all(sf.data == expected[sf.local_indices[0]])
+
+        with pytest.raises(ValueError):
+            Grid(shape=(16, 8), decomposition=((3, 10), None))
+        with pytest.raises(ValueError):
+            Grid(shape=(16, 8), decomposition=((3, 10, 12), None), topology=(2, 2))
+
+    @pytest.mark.parallel(mode=4)
+    def test_cost_decomposition(self):
+        shape = (40, 40)
+        nbl = 5
+
+        # An absorbing layer four times as expensive as the interior, except
+        # at the top, which is a free surface
+        cost = np.ones(shape)
+        cost[-nbl:] = cost[:, :nbl] = cost[:, -nbl:] = 4.
+
+        grid0 = Grid(shape=shape)
+        c = Function(name='c', grid=grid0)
+        c.data[:] = cost
+
+        expected = [balanced_splits(cost.sum(axis=1), 2),
+                    balanced_splits(cost.sum(axis=0), 2)]
+        assert expected[0] > (20,) and expected[1] == (20,)
+
+        for v in [cost, c]:
+            grid = Grid(shape=shape, decomposition=v)
+            assert grid.distributor.topology == (2, 2)
+            for d, i, j in zip(grid.distributor.decomposition, expected, grid.shape):
+                assert d.glb_min == 0 and d.glb_max == j - 1
+                assert tuple(min(k) for k in d[1:]) == i
+
     @pytest.mark.parallel(mode=9)
     def test_neighborhood_horizontal_2d(self):
         grid = Grid(shape=(3, 3))
@@ -427,6 +519,104 @@ class TestSparseFunction(object):
                 coords_loc += sf.coordinates.data[i, 0]
             assert sf.data[i] == coords_loc
 
+    @pytest.mark.parallel(mode=4)
+    def test_dist_datamap(self):
+        grid = Grid(shape=(9, 9), extent=(8., 8.))
+        distributor = grid.distributor
+
+        def reference(sf):
+            ret = {}
+            for i, p in enumerate(sf.gridpoints):
+                support = [range(max(0, j - sf._radius + 1), min(M, j + sf._radius + 1))
+                           for j, M in zip(p, grid.shape)]
+                for r in as_tuple(distributor.glb_to_rank(tuple(product(*support)))):
+                    ret.setdefault(r, set()).add(i)
+            return {k: sorted(v) for k, v in ret.items()}
+
+        coords = np.random.RandomState(0).rand(50, 2)*8.
+        sf = SparseFunction(name='sf', grid=grid, npoint=50, coordinates=coords)
+
+        dmap = sf._dist_datamap
+        assert {k: list(v) for k, v in dmap.items()} == reference(sf)
+        assert sf._dist_datamap is dmap
+
+        # Moving the sparse points invalidates the cached metadata
+        sf.coordinates.data[:] = 8. - coords
+        assert sf._dist_datamap is not dmap
+        assert {k: list(v) for k, v in sf._dist_datamap.items()} == reference(sf)
+        assert np.all(sf.gridpoints == np.floor(sf.coordinates.data._local).astype(int))
+
+    @pytest.mark.parallel(mode=4)
+    def test_exchange_plan(self):
+        grid = Grid(shape=(4, 4), extent=(3.0, 3.0))
+        x, y = grid.dimensions
+
+        coords = np.array([(3., 3.), (3., 1.), (1., 3.), (1., 1.)])
+        sf = SparseFunction(name='sf', grid=grid, npoint=len(coords), coordinates=coords)
+        u = Function(name='u', grid=grid)
+        u.data[:] = np.arange(16, dtype=np.float32).reshape(4, 4)
+
+        op = Operator(sf.interpolate(u))
+        op.apply()
+        plan = sf._dist_plan
+        assert np.all(sf.data == (4*coords[:, 0] + coords[:, 1])[sf.local_indices])
+
+        # The plan is reused as long as the sparse points don't move ...
+        op.apply(sf=sf)
+        assert sf._dist_plan is plan
+        assert np.all(sf.data == (4*coords[:, 0] + coords[:, 1])[sf.local_indices])
+
+        # ... on any of the MPI ranks
+        if grid.distributor.myrank == 0:
+            sf.coordinates.data._local[:] = (2., 2.)
+        assert sf._dist_plan is not plan
+        op.apply(sf=sf)
+        expected = 4*coords[:, 0] + coords[:, 1]
+        expected[0] = 10.
+        assert np.all(sf.data == expected[sf.local_indices])
+
+    @pytest.mark.parallel(mode=4)
+    def test_precompute(self):
+        """
+        Test that interpolation and injection with precomputed grid points and
+        weights match the default ones, for sparse points across the MPI ranks.
+        """
+        grid = Grid(shape=(11, 11))
+
+        coords = np.random.RandomState(0).uniform(-.05, 1.05, size=(20, 2))
+        sfs = [SparseFunction(name='sf%d' % i, grid=grid, npoint=len(coords),
+                              coordinates=coords) for i in range(2)]
+        u = Function(name='u', grid=grid, space_order=2)
+        u.data[:] = np.arange(121, dtype=np.float32).reshape(11, 11)
+        vs = [Function(name='v%d' % i, grid=grid, space_order=2) for i in range(2)]
+
+        for sf, v, precompute in zip(sfs, vs, [False, True]):
+            Operator(sf.interpolate(u, precompute=precompute))()
+            Operator(sf.inject(v, expr=sf, precompute=precompute))()
+
+        assert np.allclose(sfs[0].data, sfs[1].data, rtol=1e-6)
+        assert np.allclose(vs[0].data, vs[1].data, atol=1e-4)
+
+    @pytest.mark.parallel(mode=4)
+    @switchconfig(openmp=True)
+    def test_inject_colouring(self):
+        """
+        Test that injection with the sparse points coloured on the host matches
+        the default one, for sparse points across the MPI ranks.
+        """
+        grid = Grid(shape=(11, 11))
+
+        coords = np.random.RandomState(0).uniform(-.05, 1.05, size=(40, 2))
+        sf = SparseFunction(name='sf', grid=grid, npoint=len(coords), coordinates=coords)
+        sf.data[:] = np.arange(len(coords), dtype=np.float32)
+        vs = [Function(name='v%d' % i, grid=grid, space_order=2) for i in range(2)]
+
+        for v, threshold in zip(vs, [0, len(coords)]):
+            eqns = switchconfig(injection_colouring=threshold)(sf.inject)(v, expr=sf)
+            Operator(eqns)()
+
+        assert np.allclose(vs[0].data, vs[1].data, atol=1e-4)
+
 
 class TestOperatorSimple(object):
 
@@ -493,7 +683,8 @@ class TestOperatorSimple(object):
             assert np.all(f.data_ro_domain[-1, :-time_M] == 31.)
 
     @pytest.mark.parallel(mode=[(4, 'basic'), (4, 'diag'), (4, 'overlap'),
-                                (4, 'overlap2'), (4, 'full')])
+                                (4, 'overlap2'), (4, 'full'), (4, 'persistent'),
+                                (4, 'neighborhood'), (4, 'aggregated')])
     def test_trivial_eq_2d(self):
         grid = Grid(shape=(8, 8,))
         x, y = grid.dimensions
@@ -528,8 +719,80 @@ class TestOperatorSimple(object):
             assert np.all(f.data_ro_domain[0, :-1, -1:] == side)
             assert np.all(f.data_ro_domain[0, -1:, :-1] == side)
 
+    @pytest.mark.parallel(mode=[(4, 'basic'), (4, 'diag'), (4, 'neighborhood'),
+                                (4, 'aggregated')])
+    def test_trivial_eq_2d_functions(self):
+        """
+        Like ``test_trivial_eq_2d``, but with Functions, which may result in
+        HaloSpots with nothing left to exchange.
+        """
+        grid = Grid(shape=(8, 8,))
+        x, y = grid.dimensions
+
+        f = Function(name='f', grid=grid, space_order=1)
+        g = Function(name='g', grid=grid, space_order=1)
+        h = Function(name='h', grid=grid, space_order=1)
+        f.data[:] = 1.
+        g.data[:] = 2.
+
+        op = Operator(Eq(h, f[x-1, y] + f[x+1, y] + g[x, y-1] + g[x, y+1]))
+        op.apply()
+
+        # Along the domain boundary, the missing neighbours are zero
+        expected = np.full(h.data_ro_domain.shape, 6.)
+        glb_pos_map = grid.distributor.glb_pos_map
+        if LEFT in glb_pos_map[x]:
+            expected[0, :] -= 1.
+        if RIGHT in glb_pos_map[x]:
+            expected[-1, :] -= 1.
+        if LEFT in glb_pos_map[y]:
+            expected[:, 0] -= 2.
+        if RIGHT in glb_pos_map[y]:
+            expected[:, -1] -= 2.
+        assert np.all(h.data_ro_domain == expected)
+
+    @pytest.mark.parallel(mode=[(4, 'basic'), (4, 'diag'), (4, 'overlap'),
+                                (4, 'overlap2'), (4, 'full'), (4, 'persistent'),
+                                (4, 'neighborhood'), (4, 'aggregated')])
+    def test_profiling_mpi(self):
+        grid = Grid(shape=(8, 8,))
+        x, y = grid.dimensions
+        t = grid.stepping_dim
+
+        f = TimeFunction(name='f', grid=grid, space_order=1)
+        f.data_with_halo[:] = 1.
+
+        eqn = Eq(f.forward, f[t, x-1, y] + f[t, x+1, y] + f[t, x, y-1] + f[t, x, y+1])
+        op = switchconfig(profiling='mpi')(Operator)(eqn)
+        summary = op.apply(time=1)
+
+        # Results unaffected by the instrumentation
+        assert np.all(f.data_ro_domain[0, 1:-1, 1:-1] == 16.)
+
+        # Every rank exchanges halos with (at least) its two face neighbours
+        comms = summary.comms
+        nprocs = grid.distributor.nprocs
+        for rank in range(nprocs):
+            neighbours = {k.neighbour for k in comms if k.rank == rank}
+            assert len(neighbours) >= 2
+            assert rank not in neighbours
+        # What's sent by a rank is received by the neighbour
+        for k, v in comms.items():
+            assert k.function == 'f'
+            assert v.sent > 0 or v.recv > 0
+            assert all(i >= 0 for i in v[2:])
+            peer = comms[summary.CommKey(k.function, k.rank, k.neighbour)]
+            assert v.sent == peer.recv
+        assert set(summary.reduce_comms('rank')) == set(range(nprocs))
+
+        # Load imbalance report
+        assert set(summary.load_balance) == set(range(nprocs))
+        assert all(v.compute >= 0 for v in summary.load_balance.values())
+        assert summary.imbalance >= 1.
+
     @pytest.mark.parallel(mode=[(8, 'basic'), (8, 'diag'), (8, 'overlap'),
-                                (8, 'overlap2'), (8, 'full')])
+                                (8, 'overlap2'), (8, 'full'), (8, 'persistent'),
+                                (8, 'neighborhood'), (8, 'aggregated')])
     def test_trivial_eq_3d(self):
         grid = Grid(shape=(8, 8, 8))
         x, y, z = grid.dimensions
@@ -809,6 +1072,92 @@ class TestCodeGeneration(object):
         destinations = {i.arguments[-2].field for i in calls}
         assert destinations == expected
 
+    @pytest.mark.parallel(mode=[(1, 'persistent')])
+    def test_persistent_requests(self):
+        grid = Grid(shape=(4, 4))
+        x, y = grid.dimensions
+        t = grid.stepping_dim
+
+        f = TimeFunction(name='f', grid=grid)
+
+        eqn = Eq(f.forward, f[t, x-1, y] + f[t, x+1, y] + f[t, x, y-1] + f[t, x, y+1])
+        op = Operator(eqn)
+
+        # All sends and receives are started, and then completed, at once
+        calls = FindNodes(Call).visit(op._func_table['haloupdate0'])
+        assert [i.name for i in calls] == ['gather_0', 'MPI_Startall']
+        calls = FindNodes(Call).visit(op._func_table['halowait0'])
+        assert [i.name for i in calls] == ['MPI_Waitall', 'scatter_0']
+        assert 'MPI_Isend' not in str(op)
+
+        # The persistent requests are created before, and freed after, each run
+        msg = op._func_table['haloupdate0'].root.parameters[1]
+        op.apply(time_M=1)
+        assert len(msg._requests) == 0
+        args = msg._arg_defaults()
+        assert len(msg._requests) == 2*msg.npeers
+        assert all(i.reqs for i in args[msg.name])
+        msg._C_memfree()
+        assert len(msg._requests) == 0
+
+    @pytest.mark.parallel(mode=[(1, 'neighborhood')])
+    def test_neighborhood_collective(self):
+        grid = Grid(shape=(4, 4))
+        x, y = grid.dimensions
+        t = grid.stepping_dim
+
+        f = TimeFunction(name='f', grid=grid)
+        g = TimeFunction(name='g', grid=grid, space_order=2)
+
+        op = Operator([Eq(f.forward, f[t, x-1, y] + f[t, x+1, y] + g[t, x, y+1]),
+                       Eq(g.forward, g[t, x-2, y] + f[t, x, y-1])])
+
+        # One single exchange, for both `f` and `g`, without gather/scatter
+        calls = FindNodes(Call).visit(op)
+        assert len(calls) == 1
+        assert calls[0].name == 'nbexchange0'
+        assert [i.name for i in calls[0].arguments[:2]] == ['f', 'g']
+        calls = FindNodes(Call).visit(op._func_table['nbexchange0'])
+        assert [i.name for i in calls].count('MPI_Neighbor_alltoallw') == 1
+        assert 'gather' not in str(op)
+
+    @pytest.mark.parallel(mode=[(1, 'aggregated')])
+    def test_aggregated_messages(self):
+        grid = Grid(shape=(4, 4))
+        x, y = grid.dimensions
+        t = grid.stepping_dim
+
+        f = TimeFunction(name='f', grid=grid)
+        g = TimeFunction(name='g', grid=grid, space_order=2)
+
+        op = Operator([Eq(f.forward, f[t, x-1, y] + f[t, x+1, y] + g[t, x, y+1]),
+                       Eq(g.forward, g[t, x-2, y] + f[t, x, y-1])])
+
+        # One single haloupdate/halowait, for both `f` and `g`
+        calls = [i for i in FindNodes(Call).visit(op) if i.name.startswith('halo')]
+        assert [i.name for i in calls] == ['haloupdate0', 'halowait0']
+        assert [i.name for i in calls[0].arguments[:2]] == ['f', 'g']
+
+        # One message per peer, carrying the halos of both `f` and `g`
+        calls = FindNodes(Call).visit(op._func_table['haloupdate0'])
+        names = [i.name for i in calls]
+        assert names.count('MPI_Isend') == 1
+        assert len([i for i in names if i.startswith('gather')]) == 2
+        msg = op._func_table['haloupdate0'].root.parameters[3]
+        assert msg.functions == (f, g)
+        assert msg.npeers == len(set(msg.halos[0]) | set(msg.halos[1]))
+
+        # Each Function gets its own (aligned) sub-buffer within the message
+        args = msg._arg_defaults()
+        for i, peer in enumerate(msg.peers):
+            entry = args[msg.name][i]
+            assert entry.count % msg._alignment == 0
+            assert entry.bufgs[0] == entry.bufg
+            for j, halos in enumerate(msg.halos):
+                sizes = entry.sizes[j*msg.ndist:(j+1)*msg.ndist]
+                assert (0 in sizes) == (peer not in halos)
+        msg._C_memfree()
+
     @pytest.mark.parallel(mode=[(1, 'full')])
     def test_poke_progress(self):
         grid = Grid(shape=(4, 4))
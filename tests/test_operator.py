@@ -1,3 +1,7 @@
+from pathlib import Path
+import json
+import os
+
 import numpy as np
 import pytest
 
@@ -5,11 +9,16 @@ from conftest import skipif, time, x, y, z
 from devito import (Grid, Eq, Operator, Constant, Function, TimeFunction,
                     SparseFunction, SparseTimeFunction, Dimension, error, SpaceDimension,
                     NODE, CELL, dimensions, configuration, TensorFunction,
-                    TensorTimeFunction, VectorFunction, VectorTimeFunction)
+                    TensorTimeFunction, VectorFunction, VectorTimeFunction,
+                    compile_all, switchconfig, ConditionalDimension)
+from devito.compiler import jit_cache
+from devito.exceptions import InvalidArgument
 from devito.ir.equations import ClusterizedEq
 from devito.ir.iet import (Callable, Conditional, Expression, Iteration, FindNodes,
                            IsPerfectIteration, retrieve_iteration_tree)
 from devito.ir.support import Any, Backward, Forward
+from devito.operator import MachinePeaks, Roofline, machine_peaks, roofline
+from devito.operator.profiling import perf_events
 from devito.symbolics import ListInitializer, indexify, retrieve_indexed
 from devito.targets.common import DataManager
 from devito.tools import flatten
@@ -965,6 +974,121 @@ class TestArguments(object):
         except:
             assert False
 
+    def test_arguments_reuse(self):
+        """
+        Test that repeated calls to `apply` reuse the argument-processing
+        metadata and the ctypes objects of unchanged data.
+        """
+        grid = Grid(shape=(4, 4))
+
+        u = TimeFunction(name='u', grid=grid)
+        u1 = TimeFunction(name='u', grid=grid)
+
+        op = Operator(Eq(u.forward, u + 1))
+
+        args0 = op.arguments(time_M=1)
+        args1 = op.arguments(time_M=2)
+        assert args0['u'] is args1['u']
+        assert len(op._args_plan.splits) == 1
+
+        # The ctypes object must be rebuilt as soon as the data changes
+        args2 = op.arguments(u=u1, time_M=2)
+        assert args2['u'] is not args1['u']
+        assert args2['u']._obj.data == u1._data_buffer.ctypes.data
+        assert len(op._args_plan.splits) == 2
+
+        op.apply(time_M=2)
+        op.apply(u=u1, time_M=0)
+        assert np.all(u.data[1] == 3.)
+        assert np.all(u1.data[1] == 1.)
+
+    def test_bind(self):
+        grid = Grid(shape=(4, 4))
+
+        u = TimeFunction(name='u', grid=grid, save=10)
+        u1 = TimeFunction(name='u', grid=grid, save=10)
+        op = Operator(Eq(u.forward, u + 1))
+
+        bound = op.bind(u=u1)
+
+        # Consecutive time windows
+        bound(time_m=0, time_M=3)
+        bound(time_m=4, time_M=8)
+        assert np.all(u1.data[9] == 9.)
+        assert np.all(u.data == 0.)
+
+        # Each call starts from the bound arguments
+        u1.data[:] = 0.
+        bound(time_M=3)
+        assert np.all(u1.data[4] == 4.)
+        assert np.all(u1.data[5] == 0.)
+
+        # Illegal updates
+        with pytest.raises(ValueError):
+            bound(u=u)
+        with pytest.raises(InvalidArgument):
+            bound(time_M=10)
+
+        summary = bound.apply(time_m=0, time_M=0)
+        assert len(summary) == 1
+
+        # With buffered TimeFunctions, `time_M` may be provided at call time
+        v = TimeFunction(name='v', grid=grid)
+        bound = Operator(Eq(v.forward, v + 1)).bind()
+        with pytest.raises(ValueError):
+            bound()
+        bound(time_M=2)
+        assert np.all(v.data[1] == 3.)
+
+    def test_bind_vs_apply(self):
+        grid = Grid(shape=(4, 4))
+
+        us = [TimeFunction(name='u', grid=grid, save=10) for _ in range(2)]
+        op = Operator(Eq(us[0].forward, us[0] + 1))
+
+        # The omitted bounds must be derived as in `apply`
+        op.bind(u=us[1])(time_m=4)
+        op.apply(time_m=4)
+        assert np.all(us[0].data[9] == 5.)
+        assert np.all(us[1].data == us[0].data)
+
+        # The bounds supplied to `bind` apply to each call, unless overridden
+        us[1].data[:] = 0.
+        bound = op.bind(u=us[1], time_M=5)
+        bound(time_m=4)
+        assert np.all(us[1].data[6] == 2.)
+        assert np.all(us[1].data[7] == 0.)
+        bound(time_m=6, time_M=6)
+        assert np.all(us[1].data[7] == 3.)
+
+    @pytest.mark.parametrize('nworkers', [1, 3])
+    def test_apply_batch(self, nworkers):
+        grid = Grid(shape=(11, 11))
+        nt = 5
+
+        f = Function(name='f', grid=grid)
+        f.data[:] = 2.
+        u = TimeFunction(name='u', grid=grid)
+        src = SparseTimeFunction(name='src', grid=grid, npoint=1, nt=nt)
+        op = Operator([Eq(u.forward, u + f)] + src.inject(field=u.forward, expr=src))
+
+        def shot(i):
+            u = TimeFunction(name='u', grid=grid)
+            src = SparseTimeFunction(name='src', grid=grid, npoint=1, nt=nt)
+            src.coordinates.data[:] = 0.1*i
+            src.data[:] = i + 1.
+            return {'u': u, 'src': src}
+
+        shots = [shot(i) for i in range(4)]
+        summaries = op.apply_batch(shots, nworkers=nworkers, f=f, time_M=nt-2)
+        assert len(summaries) == len(shots)
+
+        for i, v in enumerate(shots):
+            expected = shot(i)
+            op.apply(f=f, time_M=nt-2, **expected)
+            assert np.all(v['u'].data == expected['u'].data)
+            assert np.any(v['u'].data != u.data)
+
     @skipif('nompi')
     @pytest.mark.parallel(mode=1)
     def test_new_distributor(self):
@@ -991,6 +1115,320 @@ class TestArguments(object):
                 grid2.distributor._obj_neighborhood.value)
 
 
+class TestBuildCache(object):
+
+    @pytest.fixture
+    def build_cache(self, tmpdir, monkeypatch):
+        from devito.operator.cache import build_cache
+        monkeypatch.setattr(build_cache, '_path', Path(str(tmpdir)))
+        return build_cache
+
+    @switchconfig(build_cache=True)
+    def test_hit(self, build_cache):
+        grid = Grid(shape=(4, 4))
+
+        u0 = TimeFunction(name='u', grid=grid, space_order=2)
+        c0 = Constant(name='c', value=1.)
+        op0 = Operator(Eq(u0.forward, u0.laplace + c0))
+        assert '_lower_exprs' in op0._profiler.py_timers
+
+        # Same input, though different objects
+        u1 = TimeFunction(name='u', grid=grid, space_order=2)
+        c1 = Constant(name='c', value=1.)
+        op1 = Operator(Eq(u1.forward, u1.laplace + c1))
+        assert '_lower_exprs' not in op1._profiler.py_timers
+        assert str(op0) == str(op1)
+
+        # The user-provided objects must have been rebound
+        assert any(i is u1 for i in op1.input)
+        assert any(i is c1 for i in op1.input)
+
+        u0.data[:] = 1.
+        u1.data[:] = 1.
+        op0.apply(time_M=2)
+        op1.apply(time_M=2)
+        assert np.all(u0.data == u1.data)
+
+    @switchconfig(build_cache=True)
+    def test_miss(self, build_cache):
+        grid = Grid(shape=(4, 4))
+
+        u0 = TimeFunction(name='u', grid=grid, space_order=2)
+        Operator(Eq(u0.forward, u0.laplace + 1))
+
+        # Different metadata
+        u1 = TimeFunction(name='u', grid=grid, space_order=4)
+        op1 = Operator(Eq(u1.forward, u1.laplace + 1))
+        assert '_lower_exprs' in op1._profiler.py_timers
+
+        # Different Operator keyword arguments
+        op2 = Operator(Eq(u0.forward, u0.laplace + 1), dse='noop')
+        assert '_lower_exprs' in op2._profiler.py_timers
+
+    @switchconfig(build_cache=True)
+    def test_miss_dimensions(self, build_cache):
+        # The Dimensions may differ only in their metadata, not in their names
+        grid = Grid(shape=(4, 4))
+        time = grid.time_dim
+
+        for factor, hit in [(2, False), (4, False), (4, True)]:
+            ct = ConditionalDimension('ct', parent=time, factor=factor)
+            u = TimeFunction(name='u', grid=grid)
+            usave = TimeFunction(name='usave', grid=grid, save=3, time_dim=ct)
+
+            op = Operator([Eq(u.forward, u + 1), Eq(usave, u)])
+            assert ('_lower_exprs' not in op._profiler.py_timers) == hit
+            # Upon a hit, the Dimensions must have been rebound too
+            dims = (time, grid.stepping_dim) + grid.dimensions
+            assert all(any(i is j for j in dims) for i in op.dimensions)
+
+            op.apply(time_M=2*factor)
+            assert np.all(usave.data[:, 0, 0] == [0, factor, 2*factor])
+
+
+class TestBuildProfile(object):
+
+    def test_build_profile(self, tmpdir):
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+
+        op = Operator(Eq(u.forward, u.laplace + 1), dse='advanced')
+        op.cfunction
+
+        profile = op.build_profile.as_dict()
+        assert [i['name'] for i in profile] == ['op-compile', 'jit-compile']
+        passes = [i['name'] for i in profile[0]['children']]
+        for i in ['_lower_exprs', 'clusterize', 'st_build', 'iet_build']:
+            assert i in passes
+        # The DSE passes are nested within `clusterize`
+        clusterize = profile[0]['children'][passes.index('clusterize')]
+        assert len(clusterize['children']) > 0
+        assert all(i['start'] >= 0 for i in profile)
+
+        filename = Path(str(tmpdir)).joinpath('profile.json')
+        op.build_profile.to_json(filename)
+        assert json.loads(filename.read_text()) == json.loads(op.build_profile.to_json())
+
+        trace = json.loads(op.build_profile.to_chrome_trace())
+        assert len(trace['traceEvents']) >= len(passes) + 2
+        assert all(i['ph'] == 'X' for i in trace['traceEvents'])
+
+
+class TestTimelineProfile(object):
+
+    @pytest.mark.parametrize('size,windows', [(8, [0, 1, 2, 3, 4]), (3, [3, 4])])
+    def test_timeline(self, monkeypatch, tmpdir, size, windows):
+        monkeypatch.setitem(configuration, 'profiling-timeline', 2)
+        monkeypatch.setitem(configuration, 'profiling-timeline-size', size)
+
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+
+        op = Operator(Eq(u.forward, u + 1))
+        assert 'timeline' in str(op)
+        summary = op.apply(time_M=9)
+        assert np.all(u.data[0] == 10)
+
+        timeline = summary.timeline
+        sections = [i.name for i in op._profiler._sections]
+        assert timeline.dtype.names == tuple(['window'] + sections)
+        assert list(timeline['window']) == windows
+        for i in sections:
+            assert np.all(timeline[i] >= 0)
+            assert timeline[i].sum() <= sum(summary.timings.values()) + 1e-6
+
+        filename = str(tmpdir.join('timeline.csv'))
+        summary.save_timeline(filename)
+        data = np.genfromtxt(filename, delimiter=',', names=True)
+        assert np.allclose(data['window'], windows)
+
+    def test_timeline_batch(self, monkeypatch):
+        monkeypatch.setitem(configuration, 'profiling-timeline', 2)
+        monkeypatch.setitem(configuration, 'profiling-timeline-size', 8)
+
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+
+        op = Operator(Eq(u.forward, u + 1))
+        summaries = op.apply_batch([{'time_M': 9}, {'time_M': 5}])
+
+        # Each execution has its own ring buffer, alive throughout the batch
+        assert list(summaries[0].timeline['window']) == [0, 1, 2, 3, 4]
+        assert list(summaries[1].timeline['window']) == [0, 1, 2]
+        section = [i.name for i in op._profiler._sections][0]
+        for i in summaries:
+            assert np.all(i.timeline[section] >= 0)
+            assert i.timeline[section].sum() <= sum(i.timings.values()) + 1e-6
+
+    def test_timeline_off(self):
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+
+        op = Operator(Eq(u.forward, u + 1))
+        assert 'timeline' not in str(op)
+        summary = op.apply(time_M=1)
+        assert summary.timeline is None
+        with pytest.raises(ValueError):
+            summary.save_timeline('timeline.csv')
+
+
+class TestNoopProfile(object):
+
+    def test_profiling_off(self, monkeypatch):
+        monkeypatch.setitem(configuration, 'profiling', 'off')
+
+        grid = Grid(shape=(16, 16, 16))
+        u = TimeFunction(name='u', grid=grid)
+
+        op = Operator(Eq(u.forward, u + 1))
+        assert 'gettimeofday' not in str(op)
+        assert 'struct profiler' not in str(op)
+        assert op._profiler.name not in [i.name for i in op.parameters]
+
+        summary = op.apply(time_M=1, autotune=True)
+        assert np.all(u.data[0] == 2)
+        assert list(summary.timings) == [summary.PerfKey('apply', None)]
+        assert summary.timings[summary.PerfKey('apply', None)] > 0
+
+        summaries = op.apply_batch([{'time_m': 2, 'time_M': 2},
+                                    {'time_m': 3, 'time_M': 3}])
+        assert np.all(u.data[0] == 4)
+        assert all(len(i) == 1 for i in summaries)
+
+
+class TestPerfEventProfile(object):
+
+    def test_perf_counters(self, monkeypatch):
+        events = perf_events()
+        if not events:
+            pytest.skip("perf_event_open not available")
+        monkeypatch.setitem(configuration, 'profiling', 'perf')
+
+        grid = Grid(shape=(16, 16))
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+
+        op = Operator(Eq(u.forward, u.laplace + u))
+        summary = op.apply(time_M=4)
+
+        assert len(summary.counters) == len(summary)
+        for k, v in summary.counters.items():
+            assert list(v.events)[:len(events)] == [i.name for i in events]
+            assert all(i >= 0 for i in v.events.values())
+            if 'flops' in v.events and 'traffic' in v.events:
+                assert v.oi is not None
+
+        # Each run gets its own, freshly opened, counters
+        summaries = op.apply_batch([{'time_M': 4}, {'time_M': 4}])
+        assert all(len(i.counters) == len(summary) for i in summaries)
+
+        # ... which are closed once the batch is over
+        nfds = len(os.listdir('/proc/self/fd'))
+        for _ in range(3):
+            op.apply_batch([{'time_M': 4}, {'time_M': 4}])
+        assert len(os.listdir('/proc/self/fd')) == nfds
+
+
+class TestRoofline(object):
+
+    def test_roofline(self, tmpdir):
+        grid = Grid(shape=(16, 16, 16))
+        u = TimeFunction(name='u', grid=grid, space_order=4)
+
+        eq = Eq(u.forward, u.laplace + u)
+        op = switchconfig(profiling='advanced')(Operator)(eq)
+        summary = op.apply(time_M=2)
+
+        report = Roofline(summary, MachinePeaks(10., 100.))
+        assert report.ridge == 10.
+        assert len(report.entries) == len(summary)
+        for i in report.entries:
+            assert i.attainable == min(100., i.oi*10.)
+            assert i.headroom == i.attainable/i.gflopss
+            assert i.bound == ('memory' if i.oi < 10. else 'compute')
+            assert i.name in report.to_text()
+
+        filename = Path(str(tmpdir)).joinpath('roofline.json')
+        report.to_json(filename)
+        data = json.loads(filename.read_text())
+        assert data['peaks'] == {'bandwidth': 10., 'gflopss': 100.}
+        assert [i['name'] for i in data['sections']] == [i.name for i in report.entries]
+
+        # The basic profiler doesn't provide the operational intensity
+        with pytest.raises(ValueError):
+            Roofline(Operator(eq).apply(time_M=2), MachinePeaks(10., 100.))
+
+    def test_machine_peaks(self, monkeypatch, tmpdir):
+        path = Path(str(tmpdir)).joinpath('peaks.json')
+        monkeypatch.setattr(roofline, '_peaks_path', lambda: path)
+
+        peaks = machine_peaks(size=2**16, repeats=1)
+        assert peaks.bandwidth > 0 and peaks.gflopss > 0
+        assert path.is_file()
+        # Cached
+        assert machine_peaks() == peaks
+
+
+class TestJitCompilation(object):
+
+    def test_compile_all(self):
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+        v = TimeFunction(name='v', grid=grid)
+
+        ops = [Operator(Eq(u.forward, u + 1)),
+               Operator(Eq(v.forward, v + 2)),
+               Operator(Eq(u.forward, u + 1))]
+        compile_all(ops)
+
+        assert all(op._lib is not None for op in ops)
+        assert all('jit-compile' in op._profiler.py_timers for op in ops)
+        # Identical Operators share the same shared object
+        assert ops[0]._lib.name == ops[2]._lib.name
+
+        ops[0].apply(time_M=0)
+        ops[1].apply(time_M=0)
+        assert np.all(u.data[1] == 1)
+        assert np.all(v.data[1] == 2)
+
+    def test_compile_async(self):
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+
+        op = Operator(Eq(u.forward, u + 1))
+        future = op.compile_async()
+        assert op.compile_async() is future
+
+        u.data[:] = 1.
+        op.apply(time_M=0)
+        assert future.done()
+        assert 'jit-compile' in op._profiler.py_timers
+        assert np.all(u.data[1] == 2)
+
+    def test_shared_jit_cache(self, tmpdir, monkeypatch):
+        monkeypatch.setitem(configuration, 'jit-cache-dir', str(tmpdir))
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+
+        # Unique expression, so that the binary can't be in the shared cache yet
+        eq = Eq(u.forward, u + np.random.rand())
+        op = Operator(eq)
+        hits, misses = jit_cache.hits, jit_cache.misses
+        op.cfunction
+        assert jit_cache.misses == misses + 1
+        key = jit_cache.key(op._compiler, op._soname)
+        assert Path(str(tmpdir)).joinpath(key).is_file()
+
+        # Identical Operator, fetched from the shared cache
+        op = Operator(eq)
+        op.apply(time_M=0)
+        assert jit_cache.hits == hits + 1
+
+        # Size-bounded eviction
+        monkeypatch.setitem(configuration, 'jit-cache-size', 1e-9)
+        jit_cache.evict()
+        assert not Path(str(tmpdir)).joinpath(key).is_file()
+
+
 class TestDeclarator(object):
 
     def test_heap_1D_stencil(self):